@@ -1,3 +1,36 @@
-from .unity.engine_pipe_unity_impl import UnityEditorImpl as UEI
-from .unity.engine_pipe_unity_impl import UnityEngineImpl as UEGI
-from .engine_stub_interface import GRPCInterface as GI
+import importlib
+from typing import TYPE_CHECKING
+
+# Resolve the public aliases on first access (PEP 562). Importing the package
+# itself stays cheap: the engine implementations pull in grpclib, betterproto,
+# protobuf and compipe, and the server module pulls in grpcio, so short-lived
+# tools only pay for what they actually touch.
+_LAZY_ATTRIBUTES = {
+    'UEI': ('.unity.engine_pipe_unity_impl', 'UnityEditorImpl'),
+    'UEGI': ('.unity.engine_pipe_unity_impl', 'UnityEngineImpl'),
+    'GI': ('.engine_stub_interface', 'GRPCInterface'),
+    'get_engine': ('.engine_pipe_registry', 'get_engine'),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .unity.engine_pipe_unity_impl import UnityEditorImpl as UEI
+    from .unity.engine_pipe_unity_impl import UnityEngineImpl as UEGI
+    from .engine_stub_interface import GRPCInterface as GI
+    from .engine_pipe_registry import get_engine
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr_name = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attr_name)
+    # cache the resolved value to skip __getattr__ on subsequent lookups
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
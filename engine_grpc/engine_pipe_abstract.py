@@ -1,8 +1,6 @@
 from abc import ABC, abstractmethod
 from enum import Enum, auto
 
-from .utils.singleton import SingletonABCMeta
-
 
 class EnginePlatform(Enum):
     unknown = auto()
@@ -15,7 +13,6 @@ class EnginePlatform(Enum):
 
 
 class EngineAbstract(ABC):
-    __metaclass__ = SingletonABCMeta
 
     @property
     @abstractmethod
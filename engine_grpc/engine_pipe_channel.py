@@ -2,46 +2,336 @@ from __future__ import annotations
 import os
 import asyncio
 import atexit
+import itertools
+import socket
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from compipe.utils.singleton import Singleton
 from compipe.runtime_env import Environment as env
 from compipe.utils.logging import logger
 from grpclib.client import Channel
 from grpclib.config import Configuration
-from ugrpc_pipe import UGrpcPipeStub
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+from ugrpc_pipe import CommandParserReq, UGrpcPipeStub
 
 from .engine_pipe_abstract import EngineAbstract
+from .engine_stub_interface import BULK_INTERFACES
+from .utils.shared_memory import (LOCAL_HOSTS, SHARED_MEMORY_PROBE_METADATA, SHARED_MEMORY_PROBE_PAYLOAD,
+                                  SharedMemoryFullError, SharedMemoryRing)
+
+# scheme of the unix domain socket endpoints, e.g., unix:///tmp/unity_grpc.sock
+UNIX_SOCKET_SCHEME = 'unix:'
+
+
+def parse_unix_socket_path(endpoint: str) -> Optional[str]:
+    """Retrieve the socket path of a unix:///<path> (or unix:<path>) endpoint, None for TCP endpoints"""
+    if not endpoint.startswith(UNIX_SOCKET_SCHEME):
+        return None
+    path = endpoint[len(UNIX_SOCKET_SCHEME):]
+    return path[2:] if path.startswith('//') else path
+
+
+# time (seconds) to wait for the answer of the shared memory probe
+SHARED_MEMORY_PROBE_TIMEOUT = 5.0
+
+
+async def probe_shared_memory(stub: UGrpcPipeStub, ring: SharedMemoryRing) -> Optional[bool]:
+    """Check whether the server reads the client's ring: it should echo a token written into it.
+
+    Returns:
+        Optional[bool]: Represent the support, None if the server could not be reached
+    """
+    token = os.urandom(16).hex()
+    try:
+        handle = ring.write(token.encode('utf-8'), hold=True)
+    except SharedMemoryFullError:
+        return None
+    try:
+        resp = await stub.command_parser(CommandParserReq(payload=SHARED_MEMORY_PROBE_PAYLOAD),
+                                         timeout=SHARED_MEMORY_PROBE_TIMEOUT,
+                                         metadata={SHARED_MEMORY_PROBE_METADATA: handle.encode()})
+    except GRPCError:
+        # i.e., a server without CommandParser
+        return False
+    except (StreamTerminatedError, OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        ring.release(handle)
+    return resp.status.code == 0 and resp.status.message == token
+
+
+# generations of the connections, unique across the channels
+_connection_generations = itertools.count(1)
+
+
+class TrackedChannel(Channel):
+    """Channel numbering its connections.
+
+    grpclib reconnects transparently on the same Channel object, so a reconnect (i.e., to a
+    restarted editor) only shows up as a new connection: each one gets a new generation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 0 until connected
+        self.generation = 0
+        self._connection: Any = None
+
+    async def __connect__(self):
+        connection = await super().__connect__()
+        if connection is not self._connection:
+            self._connection = connection
+            self.generation = next(_connection_generations)
+        return connection
+
+
+def is_endpoint_listening(endpoint: str, timeout: float = 1.0) -> bool:
+    """Check whether a server accepts connections on the endpoint, i.e., 127.0.0.1:50061 or unix:///<path>"""
+    if (path := parse_unix_socket_path(endpoint)) is not None:
+        family, address = socket.AF_UNIX, path
+    else:
+        host, port = endpoint.rsplit(':', 1)
+        host = host.strip('[]')
+        family, address = (socket.AF_INET6 if ':' in host else socket.AF_INET), (host, int(port))
+    with socket.socket(family) as sock:
+        sock.settimeout(timeout)
+        try:
+            return sock.connect_ex(address) == 0
+        except OSError:
+            return False
+
+
+# lanes of the connections to an endpoint: the bulk lane keeps the large transfers away from the control calls
+CONTROL_LANE = 'control'
+BULK_LANE = 'bulk'
+
+# calls always moving large payloads, next to the commands of BULK_INTERFACES
+BULK_CALLS = frozenset(['RouteImageBytes'])
+
+
+def _payload_size(value: Any) -> int:
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(item) for item in value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return 0
+    try:
+        return memoryview(value).nbytes
+    except TypeError:
+        return 0
+
+
+def is_bulk_call(name: Optional[str], kwds: Optional[Dict[str, Any]], threshold: Optional[int] = None) -> bool:
+    """Check whether a call moves a large payload: image streaming, the commands of BULK_INTERFACES
+    or binary parameters of at least `threshold` bytes"""
+    kwds = kwds or {}
+    if name in BULK_CALLS or kwds.get('cmd') in BULK_INTERFACES:
+        return True
+    if threshold is None:
+        return False
+    params = kwds.get('params', kwds.get('params_list'))
+    return params is not None and _payload_size(params) >= threshold
+
+
+class ChannelGroup:
+    """Connections to an endpoint on an event loop, leased to the calls least-loaded first.
+
+    A connection shares its HTTP/2 flow-control window among its streams, so a large transfer
+    stalls the small calls behind it. The group opens up to `size` connections: a new one is
+    only opened once all of the open ones carry calls, idle calls stay on the first connection.
+    The group is bound to its event loop (thread), the leases need no lock.
+    """
+
+    def __init__(self, factory: Callable[[int], Channel], size: int = 1):
+        if size <= 0:
+            raise ValueError(f"The number of connections should be a positive number: {size}")
+        self.size = size
+        self._factory = factory
+        self.channels: List[Channel] = []
+        self._stubs: List[UGrpcPipeStub] = []
+        # number of calls leasing each connection
+        self.in_flight: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    @property
+    def primary(self) -> Channel:
+        """Represent the first connection, preferred by the calls while it is idle"""
+        if not self.channels:
+            self._open()
+        return self.channels[0]
+
+    def _open(self):
+        channel = self._factory(len(self.channels))
+        self.channels.append(channel)
+        self._stubs.append(UGrpcPipeStub(channel=channel))
+        self.in_flight.append(0)
+
+    def acquire(self) -> Tuple[Channel, UGrpcPipeStub]:
+        """Lease the least-loaded connection, release it with `release` once the call completed"""
+        for index, channel in enumerate(self.channels):
+            if getattr(channel, 'closed', False):
+                self.channels[index] = channel = self._factory(index)
+                self._stubs[index] = UGrpcPipeStub(channel=channel)
+        index = min(range(len(self.channels)), key=self.in_flight.__getitem__, default=None)
+        if index is None or (self.in_flight[index] > 0 and len(self.channels) < self.size):
+            self._open()
+            index = len(self.channels) - 1
+        self.in_flight[index] += 1
+        return self.channels[index], self._stubs[index]
+
+    @property
+    def generation(self) -> int:
+        """Represent the generation of the primary connection, 0 until connected"""
+        return getattr(self.primary, 'generation', 0)
+
+    async def connect(self) -> int:
+        """Connect the primary connection if required and retrieve its generation"""
+        # the loop only runs during the calls: process the pending connection events (i.e., a lost
+        # connection) first, so a reconnect is noticed before the next request
+        await asyncio.sleep(0)
+        await self.primary.__connect__()
+        return self.generation
+
+    def release(self, channel: Channel):
+        for index, leased in enumerate(self.channels):
+            if leased is channel:
+                self.in_flight[index] = max(self.in_flight[index] - 1, 0)
+                return
+
+    @contextmanager
+    def lease(self) -> Iterator[UGrpcPipeStub]:
+        """Lease a connection for a single request, i.e., one of the requests gathered on the loop"""
+        channel, stub = self.acquire()
+        try:
+            yield stub
+        finally:
+            self.release(channel)
+
+
+@dataclass
+class ChannelLanes:
+    """Represent the connection groups of an endpoint used by an engine's calls"""
+    control: ChannelGroup
+    # the control group itself unless the config dedicates connections to the bulk calls
+    bulk: ChannelGroup
+    bulk_threshold: Optional[int] = None
+
+    def group(self, bulk: bool) -> ChannelGroup:
+        return self.bulk if bulk else self.control
 
 
 class GrpcChannelPool(metaclass=Singleton):
-    """Singleton channel pool for efficient connection reuse"""
-    _channels: Dict[str, Channel] = {}
-    _stubs: Dict[str, UGrpcPipeStub] = {}
+    """Singleton channel pool for efficient connection reuse.
+
+    grpclib channels are bound to the event loop they were created on, so the channels
+    are pooled per endpoint and event loop (i.e., per thread using the endpoint). Each
+    endpoint and loop holds a group of connections per lane (see ChannelGroup). The groups
+    of a loop are dropped once it is closed or its thread ended.
+    """
+    # (endpoint, loop, lane, index) -> channel
+    _channels: Dict[Tuple[str, asyncio.AbstractEventLoop, str, int], Channel] = {}
+    _groups: Dict[Tuple[str, asyncio.AbstractEventLoop, str], ChannelGroup] = {}
+    _stubs: Dict[Channel, UGrpcPipeStub] = {}
+    # event loop -> thread using it, the groups are dropped once the loop is closed or the thread ended
+    _loop_threads: Dict[asyncio.AbstractEventLoop, threading.Thread] = {}
+    _shared_memory_rings: Dict[str, SharedMemoryRing] = {}
+    # endpoint -> whether the server advertised the shared memory support
+    _shared_memory_support: Dict[str, bool] = {}
     
     def __init__(self):
         atexit.register(self.cleanup_all)
     
-    def get_channel(self, host: str, port: int, config: Configuration, loop: asyncio.AbstractEventLoop) -> Channel:
-        """Get or create a channel for the given host:port"""
-        key = f"{host}:{port}"
-        
-        if key not in self._channels or self._is_channel_closed(self._channels[key]):
-            self._channels[key] = Channel(host=host, port=port, config=config, loop=loop)
-            logger.debug(f"Created new gRPC channel: {key}")
-        
-        return self._channels[key]
+    @staticmethod
+    def _channel_key(host: str, port: int, path: str = None) -> str:
+        return f"{UNIX_SOCKET_SCHEME}{path}" if path is not None else f"{host}:{port}"
+
+    def get_channel(self, host: str, port: int, config: Configuration, loop: asyncio.AbstractEventLoop,
+                    path: str = None) -> Channel:
+        """Get or create the (first control) channel for the given host:port or unix domain socket path"""
+        return self.get_group(host, port, config, loop, path=path).primary
+
+    def get_group(self, host: str, port: int, config: Configuration, loop: asyncio.AbstractEventLoop,
+                  path: str = None, lane: str = CONTROL_LANE, size: int = 1) -> ChannelGroup:
+        """Get or create the connection group of a lane for the given endpoint and event loop"""
+        endpoint = self._channel_key(host, port, path)
+        key = (endpoint, loop, lane)
+
+        if (group := self._groups.get(key)) is None:
+            # a new loop, i.e., of a new thread: drop the groups of the finished threads
+            self._prune_stale_loops()
+            self._loop_threads.setdefault(loop, threading.current_thread())
+
+            def _create(index: int) -> Channel:
+                if path is not None:
+                    channel = TrackedChannel(path=path, config=config, loop=loop)
+                else:
+                    channel = TrackedChannel(host=host, port=port, config=config, loop=loop)
+                self._channels[(endpoint, loop, lane, index)] = channel
+                logger.debug(f"Created new gRPC channel: {endpoint} ({lane} #{index})")
+                return channel
+
+            group = self._groups[key] = ChannelGroup(_create, size=size)
+        # follow the config changes, the extra connections stay until the group is closed
+        group.size = max(size, 1)
+        return group
     
+    def _prune_stale_loops(self):
+        """Drop the connections of the closed event loops and of the loops of the finished threads"""
+        stale = {loop for loop, thread in self._loop_threads.items() if loop.is_closed() or not thread.is_alive()}
+        if not stale:
+            return
+        for loop in stale:
+            self._loop_threads.pop(loop, None)
+        for key in [key for key in self._groups if key[1] in stale]:
+            del self._groups[key]
+        for key in [key for key in self._channels if key[1] in stale]:
+            channel = self._channels.pop(key)
+            self._stubs.pop(channel, None)
+            try:
+                channel.close()
+            except RuntimeError:
+                # the transport can not be closed on its closed loop anymore
+                pass
+            logger.debug(f"Dropped gRPC channel of a stale event loop: {key[0]} ({key[2]} #{key[3]})")
+
     def get_stub(self, channel: Channel) -> UGrpcPipeStub:
         """Get or create a stub for the given channel"""
-        channel_key = f"{channel._host}:{channel._port}"
+        if channel not in self._stubs or self._is_channel_closed(channel):
+            self._stubs[channel] = UGrpcPipeStub(channel=channel)
+            logger.debug(f"Created new gRPC stub: "
+                         f"{self._channel_key(channel._host, channel._port, getattr(channel, '_path', None))}")
         
-        if channel_key not in self._stubs or self._is_channel_closed(channel):
-            self._stubs[channel_key] = UGrpcPipeStub(channel=channel)
-            logger.debug(f"Created new gRPC stub: {channel_key}")
-        
-        return self._stubs[channel_key]
+        return self._stubs[channel]
     
+    def get_shared_memory_ring(self, host: str, port: int, size: int, path: str = None) -> SharedMemoryRing:
+        """Get or create the shared memory ring used to send large buffers to host:port"""
+        key = self._channel_key(host, port, path)
+
+        if key not in self._shared_memory_rings:
+            self._shared_memory_rings[key] = SharedMemoryRing(size=size)
+            logger.debug(f"Created shared memory ring for {key}: {self._shared_memory_rings[key].name}")
+
+        return self._shared_memory_rings[key]
+
+    def supports_shared_memory(self, host: str, port: int, stub: UGrpcPipeStub, ring: SharedMemoryRing,
+                               loop: asyncio.AbstractEventLoop, path: str = None) -> bool:
+        """Check whether the server advertised the shared memory support, probing it once per endpoint.
+
+        Until probed (i.e., called from a running loop or the server not reachable yet) the
+        buffers travel inline.
+        """
+        key = self._channel_key(host, port, path)
+
+        if key not in self._shared_memory_support and not loop.is_running():
+            if (supported := loop.run_until_complete(probe_shared_memory(stub, ring))) is not None:
+                self._shared_memory_support[key] = supported
+                logger.debug(f"Shared memory {'supported' if supported else 'not supported'} by {key}")
+
+        return self._shared_memory_support.get(key, False)
+
     def _is_channel_closed(self, channel: Channel) -> bool:
         """Check if a channel is closed, handling different grpclib versions"""
         try:
@@ -51,15 +341,20 @@ class GrpcChannelPool(metaclass=Singleton):
             # For older versions, assume channel is open if it exists
             return False
     
-    async def close_channel(self, host: str, port: int):
-        """Close a specific channel"""
-        key = f"{host}:{port}"
-        if key in self._channels and not self._is_channel_closed(self._channels[key]):
-            await self._channels[key].close()
-            del self._channels[key]
-            if key in self._stubs:
-                del self._stubs[key]
-            logger.debug(f"Closed gRPC channel: {key}")
+    async def close_channel(self, host: str, port: int, path: str = None):
+        """Close the channels of a specific endpoint"""
+        endpoint = self._channel_key(host, port, path)
+        self._shared_memory_support.pop(endpoint, None)
+        for key in [key for key in self._groups if key[0] == endpoint]:
+            del self._groups[key]
+        for key in [key for key in self._channels if key[0] == endpoint]:
+            channel = self._channels.pop(key)
+            self._stubs.pop(channel, None)
+            if not self._is_channel_closed(channel):
+                # grpclib's Channel.close is synchronous
+                if asyncio.iscoroutine(close_result := channel.close()):
+                    await close_result
+                logger.debug(f"Closed gRPC channel: {endpoint}")
     
     def cleanup_all(self):
         """Cleanup all channels (called on exit)"""
@@ -75,7 +370,13 @@ class GrpcChannelPool(metaclass=Singleton):
                 except Exception as e:
                     logger.warning(f"Error closing channel {key}: {e}")
         self._channels.clear()
+        self._groups.clear()
         self._stubs.clear()
+        self._loop_threads.clear()
+        for ring in self._shared_memory_rings.values():
+            ring.close()
+        self._shared_memory_rings.clear()
+        self._shared_memory_support.clear()
         logger.debug("Cleaned up all gRPC channels")
 
 
@@ -84,6 +385,22 @@ class GrpcChannelConfig:
     description: str = "message_length = 100*1024*1024"
     channel: str = None
     max_msg_length: int = 104857600
+    # accepted payload compression codecs: True (all available), False (disabled),
+    # 'zstd,gzip' or a list of codec names
+    compression: Any = True
+    # minimum payload size (bytes) to compress, defaults to the server's threshold
+    compression_threshold: Optional[int] = None
+    # opt-in same-host transport: large binary fields are passed through a shared memory ring
+    shared_memory: bool = False
+    shared_memory_size: int = 64 * 1024 * 1024
+    # minimum field size (bytes) to pass through the shared memory
+    shared_memory_threshold: int = 1024 * 1024
+    # maximum number of connections per endpoint (and thread), opened when the calls overlap
+    connections: int = 1
+    # number of connections dedicated to the bulk calls (see is_bulk_call), 0 shares the connections above
+    bulk_connections: int = 0
+    # minimum size (bytes) of the binary parameters routing a command to the bulk connections
+    bulk_threshold: int = 1024 * 1024
 
     @classmethod
     def retrieve_grpc_cfg(cls, engine: str) -> GrpcChannelConfig:
@@ -96,6 +413,28 @@ class GrpcChannelConfig:
         return GrpcChannelConfig(**grpc_cfg_json)
 
 
+def resolve_channel_address(engine_platform: str, channel: str = None, grpc_cfg: GrpcChannelConfig = None) -> str:
+    """Resolve the endpoint of the engine: the specified channel, the <PLATFORM>_GRPC_CHANNEL
+    environment variable or the channel of the runtime config, in that order.
+
+    Args:
+        engine_platform (str): Represent the engine platform name, i.e., unity_editor
+        channel (str, optional): Represent the channel specified by the engine. Defaults to None.
+        grpc_cfg (GrpcChannelConfig, optional): Represent the config of the platform. Defaults to the runtime config.
+
+    Returns:
+        str: Represent the endpoint, i.e., 127.0.0.1:50061 or unix:///tmp/unity_grpc.sock
+    """
+    if channel is not None:
+        return channel
+    if (channel := os.environ.get(f"{engine_platform.upper()}_GRPC_CHANNEL", None)) is not None:
+        return channel
+    if (channel := (grpc_cfg or GrpcChannelConfig.retrieve_grpc_cfg(engine=engine_platform)).channel) is None:
+        raise ValueError(f'Not found the channel of the engine platform: {engine_platform}. Specify the channel, '
+                         f'the {engine_platform.upper()}_GRPC_CHANNEL environment variable or the runtime config.')
+    return channel
+
+
 @dataclass
 class base_channel(object):
     """Base class for gRPC channel management with proper resource cleanup"""
@@ -108,20 +447,22 @@ class base_channel(object):
             engine=self.engine.engine_platform)
         
         # Determine channel address
-        if self.engine.channel is not None:
-            self.channel = self.engine.channel
-        elif (channel := os.environ.get(f"{self.engine.engine_platform.upper()}_GRPC_CHANNEL", None)) is not None:
-            self.channel = channel
-        else:
-            self.channel = self.grpc_cfg.channel
+        self.channel = resolve_channel_address(self.engine.engine_platform, self.engine.channel, self.grpc_cfg)
         
-        if ':' not in self.channel:
+        # Parse the unix domain socket path or host and port
+        self.host, self.port = None, None
+        if (path := parse_unix_socket_path(self.channel)) is not None:
+            if not path:
+                raise ValueError(f'The specified unix domain socket path is empty: {self.channel}')
+            self.path = path
+        elif ':' not in self.channel:
             raise ValueError(
-                'The specified channel content is invalid. Only accept format <ip>:<port> e.g., 127.0.0.1:50051')
-        
-        # Parse host and port
-        self.host, port_str = self.channel.split(':')
-        self.port = int(port_str)
+                'The specified channel content is invalid. Only accept format <ip>:<port> e.g., 127.0.0.1:50051 '
+                'or unix:///<path> e.g., unix:///tmp/unity_grpc.sock')
+        else:
+            self.path = None
+            self.host, port_str = self.channel.rsplit(':', 1)
+            self.port = int(port_str)
         
         # Create configuration
         self.cfg = Configuration(
@@ -132,6 +473,13 @@ class base_channel(object):
         self.pool = GrpcChannelPool()
         self.grpc_channel: Optional[Channel] = None
         self.stub: Optional[UGrpcPipeStub] = None
+        # represent whether the call holds the lease, see general_channel
+        self.active = False
+
+    @property
+    def is_local(self) -> bool:
+        """Check whether the engine runs on the same host"""
+        return self.path is not None or self.host in LOCAL_HOSTS
     
     def __enter__(self):
         raise NotImplementedError
@@ -142,9 +490,18 @@ class base_channel(object):
         pass
 
 
+@dataclass
 class general_channel(base_channel):
-    """Channel manager with proper asyncio event loop handling"""
-    
+    """Channel manager with proper asyncio event loop handling.
+
+    The call leases the least-loaded connection of its lane for its duration: the bulk lane
+    if the call moves a large payload (see is_bulk_call), the control lane otherwise. The calls
+    nested in a running call of the engine on the same lane share its lease.
+    """
+    # name and keyword arguments of the call, to route it to its lane
+    call: Optional[str] = None
+    kwds: Optional[Dict[str, Any]] = None
+
     def __post_init__(self):
         # Properly handle event loop creation and management
         self._setup_event_loop()
@@ -171,17 +528,60 @@ class general_channel(base_channel):
                 logger.debug("Created new event loop for gRPC channel")
     
     def __enter__(self):
-        # Get or create channel and stub from pool
-        self.grpc_channel = self.pool.get_channel(
-            self.host, self.port, self.cfg, self.engine.event_loop
-        )
-        self.stub = self.pool.get_stub(self.grpc_channel)
+        # Get or create the connection groups from pool and lease a connection of the call's lane
+        control = self.pool.get_group(self.host, self.port, self.cfg, self.engine.event_loop,
+                                      path=self.path, size=self.grpc_cfg.connections)
+        bulk = control
+        if self.grpc_cfg.bulk_connections > 0:
+            bulk = self.pool.get_group(self.host, self.port, self.cfg, self.engine.event_loop, path=self.path,
+                                       lane=BULK_LANE, size=self.grpc_cfg.bulk_connections)
+        lanes = ChannelLanes(control=control, bulk=bulk, bulk_threshold=self.grpc_cfg.bulk_threshold)
+
+        self._group = lanes.group(is_bulk_call(self.call, self.kwds, self.grpc_cfg.bulk_threshold))
+        # a call nested in a running call of the engine (i.e., command_parser in upload_blobs) shares its lease
+        # on the same lane: the outer call waits for it, its connection is not busy
+        self._outer = getattr(self.engine, 'channel_lease', None)
+        self._previous_stub = self.engine.stub
+        self._owns_lease = not (self._outer is not None and self._outer.active and self._outer._group is self._group
+                                and not self.engine.event_loop.is_running())
+        if self._owns_lease:
+            self.grpc_channel, self.stub = self._group.acquire()
+        else:
+            self.grpc_channel, self.stub = self._outer.grpc_channel, self._outer.stub
+        self.active = True
+        self.engine.channel_lease = self
         self.engine.stub = self.stub
+        # the first control connection represents the endpoint's connection state, i.e., to
+        # detect the reconnects, whichever connection carries the call
+        self.engine.grpc_channel = control.primary
+        self.engine.channel_lanes = lanes
+        self.engine.grpc_cfg = self.grpc_cfg
+
+        # the shared memory transport only applies to the editors on the same host advertising it
+        self.engine.shared_memory_ring = None
+        if self.grpc_cfg.shared_memory and self.is_local:
+            ring = self.pool.get_shared_memory_ring(self.host, self.port, self.grpc_cfg.shared_memory_size,
+                                                    path=self.path)
+            if self.pool.supports_shared_memory(self.host, self.port, self.stub, ring, self.engine.event_loop,
+                                                path=self.path):
+                self.engine.shared_memory_ring = ring
         
         logger.debug(f"Using gRPC channel: {self.channel}")
         return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # the channels stay in the pool for reuse, only the lease ends
+        self.active = False
+        if self.grpc_channel is not None and self._owns_lease:
+            self._group.release(self.grpc_channel)
+        # back to the lease of the outer call, if still running
+        if getattr(self.engine, 'channel_lease', None) is self:
+            outer = self._outer if self._outer is not None and self._outer.active else None
+            self.engine.channel_lease = outer
+            if outer is not None:
+                self.engine.stub = self._previous_stub
     
     async def aclose(self):
         """Async cleanup method for proper resource management"""
         if self.grpc_channel and not self.grpc_channel.closed:
-            await self.pool.close_channel(self.host, self.port)
+            await self.pool.close_channel(self.host, self.port, path=self.path)
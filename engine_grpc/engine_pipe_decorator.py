@@ -2,44 +2,126 @@
 
 import asyncio
 import functools
+import random
+import re
+import time
+from enum import Enum
 import wrapt
 from compipe.utils.logging import logger
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError
 
 from .engine_pipe_abstract import EngineAbstract
 from .engine_pipe_channel import general_channel
+from .engine_stub_interface import RETRY_AFTER_HINT
+from .utils.call_profiler import NULL_CALL_PROFILE
+from .utils.traffic_log import active_recorder
 
+RETRY_AFTER_PATTERN = re.compile(fr'{RETRY_AFTER_HINT}=(\d+)')
+# rejection of grpc's own maximum_concurrent_rpcs limit
+CONCURRENCY_LIMIT_MESSAGE = 'Concurrent RPC limit exceeded'
 
-def grpc_call_general(channel: str = None):
+
+def is_overload_rejection(error: GRPCError) -> bool:
+    """Check whether the call was rejected by an overloaded server.
+
+    RESOURCE_EXHAUSTED is also raised for oversized messages, which must not be retried.
+    """
+    message = error.message or ''
+    return (error.status == Status.RESOURCE_EXHAUSTED
+            and (RETRY_AFTER_PATTERN.search(message) is not None or CONCURRENCY_LIMIT_MESSAGE in message))
+
+
+def retry_after_seconds(error: GRPCError, attempt: int, base_delay: float = 0.1, max_delay: float = 10.0) -> float:
+    """Resolve the back-off delay of a rejected call.
+
+    Back off exponentially, waiting at least as long as the server's retry-after hint.
+    A small jitter avoids synchronized retries of the rejected clients.
+    """
+    delay = base_delay * (2 ** attempt)
+
+    if (matched := RETRY_AFTER_PATTERN.search(error.message or '')) is not None:
+        delay = max(delay, int(matched.group(1)) / 1000)
+
+    return min(delay, max_delay) * random.uniform(1.0, 1.2)
+
+
+def grpc_call_general(channel: str = None, max_retries: int = 3):
     """
     Enhanced gRPC call decorator with proper async handling and resource management
+
+    Calls rejected by an overloaded server (RESOURCE_EXHAUSTED) are retried up to
+    max_retries times after backing off. The stub calls are appended to the traffic log
+    while recording (see utils.traffic_log), and the call phases are measured while
+    profiling (see utils.call_profiler).
     """
+    def invoke(wrapped, engine_impl: EngineAbstract, kwds):
+        channel_manager = None
+        attempt = 0
+        profile = getattr(engine_impl, 'call_profile', NULL_CALL_PROFILE)
+        while True:
+            try:
+                # Create channel manager
+                channel_manager = general_channel(engine=engine_impl, channel=channel,
+                                                  call=wrapped.__name__, kwds=kwds)
+                
+                # Use context manager for proper resource management
+                with channel_manager:
+                    if (recorder := active_recorder()) is not None:
+                        engine_impl.stub = recorder.wrap(engine_impl.stub)
+                    profile.mark('channel')
+
+                    resp = wrapped(**kwds)
+                    
+                    # Check the status code if the resp is an instance of GenericResp
+                    if hasattr(resp, 'status') and resp.status.code != 0:
+                        logger.error(f"gRPC call failed: {resp.status.message}")
+                        logger.error(f"Call parameters: {kwds}")
+                    
+                    return resp
+
+            except GRPCError as e:
+                # nested decorated calls: only the innermost one retries
+                if (is_overload_rejection(e) and attempt < max_retries
+                        and not getattr(e, '_is_retry_exhausted', False)):
+                    delay = retry_after_seconds(e, attempt)
+                    attempt += 1
+                    logger.warning(
+                        f"Server overloaded, retry {wrapped.__name__} in {delay:.3f}s ({attempt}/{max_retries})")
+                    time.sleep(delay)
+                    profile.mark('retry')
+                    continue
+
+                e._is_retry_exhausted = True
+                logger.error(f"gRPC call error: {e}")
+                logger.error(f"Function: {wrapped.__name__}, Args: {kwds}")
+                raise
+                    
+            except Exception as e:
+                logger.error(f"gRPC call error: {e}")
+                logger.error(f"Function: {wrapped.__name__}, Args: {kwds}")
+                raise
+            finally:
+                # Cleanup is handled by the context manager and channel pool
+                pass
+
     @wrapt.decorator
     def wrapper(wrapped, engine_impl: EngineAbstract, args, kwds):
         """Simplifies the creation of grpc channels and facilitates the marking of grpc command interfaces
         """
-        channel_manager = None
+        if (profiler := getattr(engine_impl, 'profiler', None)) is None:
+            return invoke(wrapped, engine_impl, kwds)
+
+        # profile the call per command, nested calls are folded under the running one
+        parent = engine_impl.call_profile
+        command = cmd.name if isinstance(cmd := kwds.get('cmd'), Enum) else wrapped.__name__
+        engine_impl.call_profile = profiler.begin(command, parent if parent is not NULL_CALL_PROFILE else None)
         try:
-            # Create channel manager
-            channel_manager = general_channel(engine=engine_impl, channel=channel)
-            
-            # Use context manager for proper resource management
-            with channel_manager:
-                resp = wrapped(**kwds)
-                
-                # Check the status code if the resp is an instance of GenericResp
-                if hasattr(resp, 'status') and resp.status.code != 0:
-                    logger.error(f"gRPC call failed: {resp.status.message}")
-                    logger.error(f"Call parameters: {kwds}")
-                
-                return resp
-                
-        except Exception as e:
-            logger.error(f"gRPC call error: {e}")
-            logger.error(f"Function: {wrapped.__name__}, Args: {kwds}")
-            raise
+            return invoke(wrapped, engine_impl, kwds)
         finally:
-            # Cleanup is handled by the context manager and channel pool
-            pass
+            engine_impl.call_profile.finish()
+            engine_impl.call_profile = parent
+            parent.skip()
 
     return wrapper
 
@@ -51,10 +133,14 @@ def async_grpc_call(channel: str = None):
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(engine_impl: EngineAbstract, *args, **kwargs):
-            channel_manager = general_channel(engine=engine_impl, channel=channel)
+            channel_manager = general_channel(engine=engine_impl, channel=channel,
+                                              call=func.__name__, kwds=kwargs)
             
             try:
                 with channel_manager:
+                    if (recorder := active_recorder()) is not None:
+                        engine_impl.stub = recorder.wrap(engine_impl.stub)
+
                     result = await func(engine_impl, *args, **kwargs)
                     
                     if hasattr(result, 'status') and result.status.code != 0:
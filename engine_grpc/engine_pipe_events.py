@@ -0,0 +1,246 @@
+"""Subscription to the event stream of the engine, instead of polling its state.
+
+The engine pushes its state changes (asset imported, scene saved, compile finished, play
+mode changed) through the SubscribeEvents route served next to CommandParser:
+
+    with editor.subscribe_events([EngineEventType.compile_finished]) as events:
+        editor.refresh_asset_database()
+        compiled = events.wait(EngineEventType.compile_finished, timeout=120)
+
+The stream runs on a background thread with its own event loop and connection, the
+synchronous calls of the engine keep working next to it. The subscription reconnects when
+the connection is lost, i.e., while the editor restarts.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+from compipe.utils.logging import logger
+from grpclib.client import Channel
+from grpclib.const import Cardinality, Status
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+from ugrpc_pipe import CommandParserReq, GenericResp
+
+from .engine_pipe_abstract import EngineAbstract
+from .engine_pipe_channel import base_channel
+from .engine_stub_interface import EVENT_STREAM_ROUTE, EngineEventType
+from .utils.struct_decoder import decode_struct
+
+# end of the subscription, wakes up the blocked readers
+_CLOSED = object()
+
+
+class EngineEvent(NamedTuple):
+    """Represent an event pushed by the engine"""
+    # EngineEventType, or the event name if the engine sends an event unknown to the client
+    event: Union[EngineEventType, str]
+    data: Dict[str, Any]
+    # increasing number of the event on the server, gaps reveal dropped events
+    sequence: int
+    # publish time (seconds since the epoch) on the server
+    timestamp: float
+
+
+def decode_event(resp: GenericResp) -> EngineEvent:
+    """Convert a GenericResp of the event stream into an EngineEvent"""
+    message = decode_struct(resp.payload.value)
+    name = message.get('event', '')
+    return EngineEvent(event=EngineEventType[name] if name in EngineEventType.__members__ else name,
+                       data=message.get('data') or {},
+                       sequence=int(message.get('sequence', 0)),
+                       timestamp=message.get('timestamp', 0.0))
+
+
+def event_name(event: Union[EngineEventType, str]) -> str:
+    return event.name if isinstance(event, EngineEventType) else str(event)
+
+
+class EventSubscription:
+    """Receive the events of an engine on a background thread.
+
+    Args:
+        engine (EngineAbstract): Represent the engine whose endpoint is subscribed
+        events (Iterable, optional): Represent the subscribed events (EngineEventType or names). Defaults to all events.
+        callback (Callable[[EngineEvent], None], optional): Represent the handler called on the stream thread
+            for each event, instead of queueing the events. Defaults to None.
+        max_queue_size (int, optional): Represent the number of queued events, the oldest ones are dropped
+            once the queue is full. Defaults to 1024.
+        reconnect_interval (float, optional): Represent the initial delay (seconds) before reconnecting,
+            doubled up to max_reconnect_interval. Defaults to 0.5.
+        max_reconnect_interval (float, optional): Represent the maximum delay before reconnecting. Defaults to 5.0.
+    """
+
+    def __init__(self, engine: EngineAbstract,
+                 events: Optional[Iterable[Union[EngineEventType, str]]] = None,
+                 callback: Optional[Callable[[EngineEvent], None]] = None,
+                 max_queue_size: int = 1024,
+                 reconnect_interval: float = 0.5,
+                 max_reconnect_interval: float = 5.0):
+        self.engine = engine
+        self.events = [event_name(event) for event in events] if events else []
+        self.callback = callback
+        self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        # represent the error which ended the subscription, i.e., the engine does not serve the event stream
+        self.error: Optional[BaseException] = None
+        # number of events dropped because the queue was full
+        self.dropped: int = 0
+        self._messages: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._connected = threading.Event()
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> EventSubscription:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self) -> Iterator[EngineEvent]:
+        """Yield the events until the subscription is closed"""
+        while (event := self.get()) is not None:
+            yield event
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self) -> EventSubscription:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name='engine-events', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 5.0):
+        """Cancel the stream and wait for the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._cancel)
+            except RuntimeError:
+                # the stream already ended, i.e., on an unsupported engine
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._put(_CLOSED)
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the engine registered the subscription, events published afterwards are received"""
+        return self._connected.wait(timeout)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[EngineEvent]:
+        """Retrieve the next event, None on timeout or once the subscription is closed"""
+        try:
+            event = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if event is _CLOSED:
+            # keep waking up the other readers
+            self._put(_CLOSED)
+            return None
+        return event
+
+    def wait(self, event: Union[EngineEventType, str, None] = None, timeout: Optional[float] = None,
+             predicate: Optional[Callable[[EngineEvent], bool]] = None) -> Optional[EngineEvent]:
+        """Wait for the next event matching the type and the predicate, the other events are skipped.
+
+        Returns:
+            Optional[EngineEvent]: Represent the matched event, None on timeout or once the subscription is closed
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        name = event_name(event) if event is not None else None
+        while True:
+            remaining = max(deadline - time.monotonic(), 0) if deadline is not None else None
+            if (received := self.get(timeout=remaining)) is None:
+                return None
+            if ((name is None or event_name(received.event) == name)
+                    and (predicate is None or predicate(received))):
+                return received
+
+    def _put(self, item: Any):
+        while True:
+            try:
+                self._messages.put_nowait(item)
+                return
+            except queue.Full:
+                # drop the oldest event
+                try:
+                    self._messages.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _dispatch(self, event: EngineEvent):
+        if self.callback is None:
+            self._put(event)
+            return
+        try:
+            self.callback(event)
+        except Exception as e:
+            logger.error(f"Event callback failed on {event.event}: {e}")
+
+    def _cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._stream())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connected.clear()
+            self._loop.close()
+            self._put(_CLOSED)
+
+    def _open_channel(self) -> Channel:
+        # resolve the endpoint like the engine calls, the channel belongs to the stream thread
+        endpoint = base_channel(engine=self.engine)
+        if endpoint.path is not None:
+            return Channel(path=endpoint.path, config=endpoint.cfg)
+        return Channel(host=endpoint.host, port=endpoint.port, config=endpoint.cfg)
+
+    async def _stream(self):
+        request = CommandParserReq(payload=json.dumps({'events': self.events}))
+        delay = self.reconnect_interval
+        channel = self._open_channel()
+        try:
+            while not self._closed:
+                try:
+                    async with channel.request(EVENT_STREAM_ROUTE, Cardinality.UNARY_STREAM,
+                                               CommandParserReq, GenericResp) as stream:
+                        await stream.send_message(request, end=True)
+                        await stream.recv_initial_metadata()
+                        self._connected.set()
+                        delay = self.reconnect_interval
+                        async for resp in stream:
+                            self._dispatch(decode_event(resp))
+                except GRPCError as e:
+                    if e.status == Status.UNIMPLEMENTED:
+                        logger.warning(f"The engine ({self.engine.channel}) does not serve the event stream")
+                        self.error = e
+                        return
+                    logger.debug(f"Event stream ended: {e}")
+                except (OSError, StreamTerminatedError) as e:
+                    logger.debug(f"Event stream disconnected: {e}")
+                finally:
+                    self._connected.clear()
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_interval)
+        finally:
+            channel.close()
@@ -1,35 +1,88 @@
 
+import asyncio
 import json
 import os
 import re
+import weakref
 from asyncio import AbstractEventLoop
-from typing import Any, List, Optional
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
 
 from betterproto import Message
 from compipe.utils.logging import logger
 from google.protobuf import any_pb2
 from google.protobuf.struct_pb2 import ListValue
 from ugrpc_pipe import (CommandParserReq, GenericResp, ProjectInfoResp,
-                        UGrpcPipeStub)
+                        UGrpcPipeStub, ugrpc_pipe_pb2)
 
 from .engine_pipe_abstract import EngineAbstract, EnginePlatform
+from .engine_pipe_channel import ChannelLanes, is_bulk_call
 from .engine_pipe_decorator import grpc_call_general
+from .engine_pipe_events import EngineEvent, EventSubscription
+from .engine_pipe_scheduler import CommandGraph, CommandNode, ScheduleReport, run_graph
 from .engine_stub_interface import (GRPC_INTERFACE_METHOD_HEADER,
-                                    INTERFACE_MAPPINGS, GRPCInterface)
+                                    INTERFACE_MAPPINGS, EngineEventType,
+                                    GRPCInterface)
 from betterproto.lib.google import protobuf
 from google.protobuf import wrappers_pb2, struct_pb2
+from .utils.payload_compression import (CODECS, compression_metadata,
+                                        decompress_payload,
+                                        is_compressed_type_url, parse_codecs)
+from .utils.blob_cache import BLOB_NOT_FOUND_CODE, BlobDigestCache, BlobParameter, blob_digest
+from .utils.array_payload import (ARRAY_PARAMETER_PREFIX, ArrayDescriptor,
+                                  array_buffer, encode_array_fields,
+                                  is_array_parameter)
+from .utils.call_profiler import NULL_CALL_PROFILE, CallProfiler, default_profiler
+from .utils.shared_memory import SharedMemoryFullError, is_shared_memory_type_url, unpack_handle
+from .utils.struct_decoder import decode_list_value, decode_struct
+from .utils.struct_view import ListValueView, StructView
+from .utils.traffic_log import active_recorder
+
+
+class ArrayCommandParserReq(CommandParserReq):
+    """CommandParserReq carrying the binary array parameters next to the json envelope"""
+
+    def __init__(self, payload: str, array_fields: List[Any]):
+        super().__init__(payload=payload)
+        # chunks of the length-delimited array fields (see utils.array_payload)
+        self.array_fields = array_fields
+
+    def __bytes__(self) -> bytes:
+        # join the envelope and the (large) buffers with a single copy
+        return b''.join([super().__bytes__(), *self.array_fields])
 
 
 class BaseEngineImpl(EngineAbstract):
-    _event_loop: AbstractEventLoop = None
-    _stub: Any = None
+    """Represent the connection to one engine endpoint.
 
-    # represent the custom channel for establishing the connection
-    # if not specified, it will try to load channel from local runtime environment
-    _channel: str = None
+    The state (stub, event loop, channel config, caches) belongs to the instance, so several
+    engines, i.e., editors on different endpoints, can be used side by side. Use
+    `engine_pipe_registry.get_engine` to share a single instance per endpoint.
+    """
 
     def __init__(self, channel: str = None):
-        self._channel = channel
+        # represent the custom channel for establishing the connection
+        # if not specified, it will try to load channel from local runtime environment
+        self._channel: Optional[str] = channel
+
+        # assigned by the channel manager on every call
+        self._event_loop: Optional[AbstractEventLoop] = None
+        self._stub: Any = None
+        self._grpc_channel: Any = None
+        # represent the connection groups of the endpoint, to lease a connection per request
+        self._channel_lanes: Optional[ChannelLanes] = None
+        # represent the channel manager of the running call, shared by the nested calls
+        self._channel_lease: Any = None
+        # represent the config of the active channel
+        self._grpc_cfg: Any = None
+        # represent the ring passing large buffers to a same-host engine
+        self._shared_memory_ring: Any = None
+
+        # represent the profiler of the calls, None follows ENGINE_GRPC_PROFILE, False disables it
+        self._profiler: Any = None
+        # represent the profile of the running call (assigned by the decorator)
+        self._call_profile: Any = NULL_CALL_PROFILE
 
     @property
     def stub(self):
@@ -39,6 +92,55 @@ class BaseEngineImpl(EngineAbstract):
     def stub(self, value):
         self._stub = value
 
+    @property
+    def grpc_channel(self):
+        return self._grpc_channel
+
+    @grpc_channel.setter
+    def grpc_channel(self, value):
+        self._grpc_channel = value
+
+    @property
+    def channel_lanes(self) -> Optional[ChannelLanes]:
+        return self._channel_lanes
+
+    @channel_lanes.setter
+    def channel_lanes(self, value):
+        self._channel_lanes = value
+
+    @property
+    def channel_lease(self) -> Any:
+        return self._channel_lease
+
+    @channel_lease.setter
+    def channel_lease(self, value):
+        self._channel_lease = value
+
+    @contextmanager
+    def lease_stub(self, cmd: Optional[GRPCInterface] = None, params: Any = None) -> Iterator[Any]:
+        """Lease the least-loaded connection of the command's lane for a single request.
+
+        The requests gathered on the event loop of a call (i.e., command_parser_batch) are spread
+        over the connections of the endpoint instead of queueing on the connection of the call.
+        """
+        if self._channel_lanes is None:
+            yield self.stub
+            return
+        lanes = self._channel_lanes
+        with lanes.group(is_bulk_call(None, {'cmd': cmd, 'params': params}, lanes.bulk_threshold)).lease() as stub:
+            yield recorder.wrap(stub) if (recorder := active_recorder()) is not None else stub
+
+    def connection_generation(self) -> int:
+        """Retrieve the generation of the connection to the endpoint, connecting if required.
+
+        It changes on reconnect, i.e., the engine was restarted or another one took the endpoint,
+        so the state cached per connection compares it with the generation it was retrieved through.
+        Only valid within the decorated calls.
+        """
+        if self._channel_lanes is None:
+            return 0
+        return self.event_loop.run_until_complete(self._channel_lanes.control.connect())
+
     @property
     def channel(self):
         return self._channel
@@ -47,6 +149,52 @@ class BaseEngineImpl(EngineAbstract):
     def channel(self, value):
         self._channel = value
 
+    @property
+    def grpc_cfg(self):
+        return self._grpc_cfg
+
+    @grpc_cfg.setter
+    def grpc_cfg(self, value):
+        self._grpc_cfg = value
+
+    @property
+    def shared_memory_ring(self):
+        return self._shared_memory_ring
+
+    @shared_memory_ring.setter
+    def shared_memory_ring(self, value):
+        self._shared_memory_ring = value
+
+    @property
+    def profiler(self) -> Optional[CallProfiler]:
+        if self._profiler is None:
+            return default_profiler()
+        return self._profiler or None
+
+    @property
+    def call_profile(self):
+        return self._call_profile
+
+    @call_profile.setter
+    def call_profile(self, value):
+        self._call_profile = value
+
+    def enable_profiling(self, profiler: CallProfiler = None) -> CallProfiler:
+        """Break the calls of the engine down into phases (see utils.call_profiler).
+
+        Args:
+            profiler (CallProfiler, optional): Represent the profiler aggregating the calls,
+                i.e., shared by several engines. Defaults to a new profiler.
+
+        Returns:
+            CallProfiler: Represent the profiler to export the results from
+        """
+        self._profiler = profiler or CallProfiler()
+        return self._profiler
+
+    def disable_profiling(self):
+        self._profiler = False
+
     @property
     def event_loop(self) -> AbstractEventLoop:
         return self._event_loop
@@ -60,7 +208,31 @@ class BaseEngineImpl(EngineAbstract):
         raise NotImplementedError
 
     @classmethod
-    def unpack(cls, data: protobuf.Any) -> Any:
+    def decompress(cls, data: protobuf.Any) -> protobuf.Any:
+        """Restore the original payload if it was compressed by the server"""
+        if not is_compressed_type_url(data.type_url):
+            return data
+        type_url, value = decompress_payload(data.type_url, data.value)
+        return protobuf.Any(type_url=type_url, value=value)
+
+    @classmethod
+    def unpack(cls, data: protobuf.Any, lazy: bool = False) -> Any:
+        """Convert the Any payload into a Python object.
+
+        Args:
+            data (protobuf.Any): Represent the response payload
+            lazy (bool, optional): Represent the flag of returning Struct / ListValue payloads
+                as views converting only the accessed nodes. Defaults to False.
+
+        Returns:
+            Any: Represent the unpacked value
+        """
+        data = cls.decompress(data)
+
+        if is_shared_memory_type_url(data.type_url):
+            # large buffer left in the engine's shared memory, copied before the engine overwrites it
+            return unpack_handle(data.value)
+
         any_obj = any_pb2.Any()
         any_obj.type_url = data.type_url
         any_obj.value = data.value
@@ -70,27 +242,10 @@ class BaseEngineImpl(EngineAbstract):
             any_obj.Unpack(unpacked_str_value)
             return unpacked_str_value.value
         elif any_obj.Is(struct_pb2.Struct.DESCRIPTOR):
-            # Handle struct_pb2.Struct payload (JSON-like data)
-            unpacked_struct = struct_pb2.Struct()
-            any_obj.Unpack(unpacked_struct)
-            return cls._struct_to_dict(unpacked_struct)
+            # Handle struct_pb2.Struct payload (JSON-like data) straight from the wire format
+            return StructView.from_bytes(any_obj.value) if lazy else decode_struct(any_obj.value)
         elif any_obj.Is(struct_pb2.ListValue.DESCRIPTOR):
-            results = []
-            unpacked_list_value = struct_pb2.ListValue()
-            any_obj.Unpack(unpacked_list_value)
-            for value in unpacked_list_value.values:
-                field = value.WhichOneof('kind')
-                if field == 'number_value':
-                    results.append(value.number_value)
-                elif field == 'string_value':
-                    results.append(value.string_value)
-                elif field == 'bool_value':
-                    results.append(value.bool_value)
-                elif field == 'struct_value':
-                    results.append(cls._struct_to_dict(value.struct_value))
-                elif field == 'list_value':
-                    results.append(cls._list_value_to_list(value.list_value))
-            return results
+            return ListValueView.from_bytes(any_obj.value) if lazy else decode_list_value(any_obj.value)
         elif any_obj.Is(wrappers_pb2.Int32Value.DESCRIPTOR):
             unpacked_int_value = wrappers_pb2.Int32Value()
             any_obj.Unpack(unpacked_int_value)
@@ -123,50 +278,35 @@ class BaseEngineImpl(EngineAbstract):
             unpacked_bytes_value = wrappers_pb2.BytesValue()
             any_obj.Unpack(unpacked_bytes_value)
             return unpacked_bytes_value.value
+        elif any_obj.Is(ugrpc_pipe_pb2.FloatArrayRep.DESCRIPTOR):
+            unpacked_float_array = ugrpc_pipe_pb2.FloatArrayRep()
+            any_obj.Unpack(unpacked_float_array)
+            return list(unpacked_float_array.values)
+        elif any_obj.Is(ugrpc_pipe_pb2.IntArrayRep.DESCRIPTOR):
+            unpacked_int_array = ugrpc_pipe_pb2.IntArrayRep()
+            any_obj.Unpack(unpacked_int_array)
+            return list(unpacked_int_array.values)
+        elif any_obj.Is(ugrpc_pipe_pb2.StringArrayRep.DESCRIPTOR):
+            unpacked_string_array = ugrpc_pipe_pb2.StringArrayRep()
+            any_obj.Unpack(unpacked_string_array)
+            return list(unpacked_string_array.values)
         else:
             logger.warning(
                 f"Not found matched data type to unpack: {any_obj.type_url}")
             return None
 
-    @classmethod
-    def _struct_to_dict(cls, struct: struct_pb2.Struct) -> dict:
-        """Convert protobuf Struct to Python dict"""
-        result = {}
-        for key, value in struct.fields.items():
-            result[key] = cls._value_to_python(value)
-        return result
-
-    @classmethod
-    def _list_value_to_list(cls, list_value: struct_pb2.ListValue) -> list:
-        """Convert protobuf ListValue to Python list"""
-        result = []
-        for value in list_value.values:
-            result.append(cls._value_to_python(value))
-        return result
-
-    @classmethod
-    def _value_to_python(cls, value: struct_pb2.Value) -> Any:
-        """Convert protobuf Value to Python object"""
-        field = value.WhichOneof('kind')
-        if field == 'null_value':
-            return None
-        elif field == 'number_value':
-            return value.number_value
-        elif field == 'string_value':
-            return value.string_value
-        elif field == 'bool_value':
-            return value.bool_value
-        elif field == 'struct_value':
-            return cls._struct_to_dict(value.struct_value)
-        elif field == 'list_value':
-            return cls._list_value_to_list(value.list_value)
-        else:
-            logger.warning(f"Unknown protobuf Value field: {field}")
-            return None
-
 
 class SimulationEngineImpl(BaseEngineImpl):
 
+    def __init__(self, channel: str = None):
+        super().__init__(channel=channel)
+        # keep a copy of the cached project info and the connection generation it was retrieved through
+        self._project_info: Optional[ProjectInfoResp] = None
+        self._project_info_generation: int = 0
+        # represent the digests of the blobs stored by the engine, valid for the connection generation they were uploaded through
+        self._blob_cache = BlobDigestCache()
+        self._blob_cache_generation: int = 0
+
     @property
     def stub(self) -> UGrpcPipeStub:
         return self._stub
@@ -179,9 +319,6 @@ class SimulationEngineImpl(BaseEngineImpl):
     def asset_root_folder_name(self) -> str:
         pass
 
-    # keep a copy of the cached project info
-    _project_info: ProjectInfoResp = None
-
     # retrieve full command chains from the specified name
     def resolve_command_name(self, cmd: GRPCInterface):
         if cmd not in INTERFACE_MAPPINGS:
@@ -198,11 +335,17 @@ class SimulationEngineImpl(BaseEngineImpl):
             'parameters': params
         }))
 
-    @grpc_call_general()
-    def command_parser(self, cmd: GRPCInterface, params: List = [], return_type: Any = None, verbose: bool = False, timeout: Optional[float] = None) -> GenericResp:
+    def build_command_parser_req(self, cmd: GRPCInterface, params: List = []) -> CommandParserReq:
+        """Build the reflection envelope sent through the CommandParser interface.
 
-        logger.debug(f"Execute command: {cmd.name} : {params}")
+        Args:
+            cmd (GRPCInterface): Represent the command interface
+            params (List, optional): Represent the command parameters. numpy arrays and
+                buffer-protocol objects are sent as packed binary fields. Defaults to [].
 
+        Returns:
+            CommandParserReq: Represent the request carrying the json payload
+        """
         # parse full command str from the specific engine platform
         cmd_str = self.resolve_command_name(cmd=cmd)
 
@@ -217,34 +360,74 @@ class SimulationEngineImpl(BaseEngineImpl):
         # -> method: GetProjectInfo
         # The method can be resolved through the reflection / delegate on the specific engine platform
         type_name, method_name = os.path.splitext(cmd_str)
+        profile = self.call_profile
+        profile.mark('resolve')
+
+        # numpy arrays and buffer-protocol objects are sent as binary fields instead of text
+        arrays: List[ArrayDescriptor] = []
+        buffers = []
+        ring = self.shared_memory_ring
+        handles = []
+
+        def encode_parameter(value):
+            if is_array_parameter(value):
+                buffer, descriptor = array_buffer(value)
+                # pass large arrays through the shared memory when the engine runs on the same host,
+                # inline if the ring is full of the buffers of the calls in flight
+                if ring is not None and descriptor.nbytes >= self.grpc_cfg.shared_memory_threshold:
+                    try:
+                        handles.append(ring.write(buffer, hold=True))
+                        descriptor = replace(descriptor, shm=handles[-1].encode())
+                    except SharedMemoryFullError:
+                        buffers.append(buffer)
+                else:
+                    buffers.append(buffer)
+                arrays.append(descriptor)
+                return f"{ARRAY_PARAMETER_PREFIX}{len(arrays) - 1}"
+            if isinstance(value, List):
+                return '%@%'.join([str(v) for v in value])
+            return value
 
         payload = {
             'type': type_name,
             'isMethod': is_method,
             # remove the '.' from method name segment
             'method': method_name[1:],
-            'parameters': [value for value in map(lambda n: '%@%'.join([str(v) for v in n]) if isinstance(n, List) else n, params)]
+            'parameters': [encode_parameter(value) for value in params]
         }
 
-        command_parser_req = CommandParserReq(payload=json.dumps(payload))
-
-        if verbose:
-            logger.debug(f"Command command: {cmd}")
-            logger.debug(f"Command payload: {command_parser_req.payload}")
-
-        resp = self.event_loop.run_until_complete(
-            self.stub.command_parser(command_parser_req, timeout=timeout))
-
+        if not arrays:
+            req = CommandParserReq(payload=json.dumps(payload))
+        else:
+            payload['arrays'] = [descriptor.to_json() for descriptor in arrays]
+            req = ArrayCommandParserReq(payload=json.dumps(payload), array_fields=encode_array_fields(buffers))
+        # the buffers stay in the ring as long as the request is alive, i.e., until answered
+        for handle in handles:
+            weakref.finalize(req, ring.release, handle)
+
+        profile.mark('serialize')
+        return req
+
+    @staticmethod
+    def parse_command_parser_resp(resp: GenericResp, return_type: Any = None, lazy: bool = False,
+                                  profile: Any = NULL_CALL_PROFILE) -> Any:
+        """Unpack the Any payload of the response or cast it into the specified message type"""
         return_resp = None
 
+        if isinstance(resp.payload, protobuf.Any):
+            resp.payload = BaseEngineImpl.decompress(resp.payload)
+
         if not return_type and isinstance(resp.payload, protobuf.Any):
-            resp.payload = BaseEngineImpl.unpack(resp.payload)
+            profile.mark('deserialize')
+            resp.payload = BaseEngineImpl.unpack(resp.payload, lazy=lazy)
+            profile.mark('unpack')
             return_resp = resp
         else:
             try:
                 return_resp = return_type().parse(resp.payload.value)
             except:
                 pass
+            profile.mark('deserialize')
 
             # # try to cast payload into the specific type
             # caller_code_obj = inspect.stack()[2].frame.f_code
@@ -255,6 +438,128 @@ class SimulationEngineImpl(BaseEngineImpl):
         # support casting into the message object
         return return_resp
 
+    def compression_metadata(self, compression: Any = None) -> Optional[dict]:
+        """Build the request metadata advertising the accepted payload codecs.
+
+        Args:
+            compression (Any, optional): Represent the per-command override of the channel's
+                compression setting (True, False, 'zstd,gzip' or a list). Defaults to None.
+
+        Returns:
+            Optional[dict]: Represent the metadata, None if compression is disabled
+        """
+        if compression is None and self.grpc_cfg is not None:
+            compression = self.grpc_cfg.compression
+
+        codecs = [codec for codec in parse_codecs(compression) if codec in CODECS]
+        threshold = self.grpc_cfg.compression_threshold if self.grpc_cfg is not None else None
+
+        return compression_metadata(codecs, threshold) or None
+
+    @grpc_call_general()
+    def command_parser(self, cmd: GRPCInterface, params: List = [], return_type: Any = None, verbose: bool = False, timeout: Optional[float] = None, compression: Any = None, lazy: bool = False) -> GenericResp:
+
+        logger.debug(f"Execute command: {cmd.name} : {params}")
+
+        command_parser_req = self.build_command_parser_req(cmd=cmd, params=params)
+
+        if verbose:
+            logger.debug(f"Command command: {cmd}")
+            logger.debug(f"Command payload: {command_parser_req.payload}")
+
+        resp = self.event_loop.run_until_complete(
+            self.stub.command_parser(command_parser_req, timeout=timeout,
+                                     metadata=self.compression_metadata(compression)))
+        if resp.status.code == BLOB_NOT_FOUND_CODE and self.restore_blobs(params=params, resp=resp):
+            resp = self.event_loop.run_until_complete(
+                self.stub.command_parser(self.build_command_parser_req(cmd=cmd, params=params), timeout=timeout,
+                                         metadata=self.compression_metadata(compression)))
+        self.call_profile.mark('rpc')
+
+        return self.parse_command_parser_resp(resp=resp, return_type=return_type, lazy=lazy,
+                                              profile=self.call_profile)
+
+    @grpc_call_general()
+    def command_parser_batch(self, cmd: GRPCInterface, params_list: List[List], return_type: Any = None, timeout: Optional[float] = None, compression: Any = None, lazy: bool = False) -> List[GenericResp]:
+        """Dispatch the same command with several parameter sets concurrently over the shared channel.
+
+        All requests are multiplexed onto one HTTP/2 connection and awaited together,
+        so a batch costs roughly one round trip instead of one per entry.
+
+        Args:
+            cmd (GRPCInterface): Represent the command interface
+            params_list (List[List]): Represent the parameters of each individual call
+            return_type (Any, optional): Represent the message type to cast payloads into. Defaults to None.
+            timeout (Optional[float], optional): Represent the timeout of each call. Defaults to None.
+            compression (Any, optional): Represent the accepted payload codecs override. Defaults to None.
+            lazy (bool, optional): Represent the flag of unpacking Struct payloads as lazy views. Defaults to False.
+
+        Returns:
+            List[GenericResp]: Represent the responses in the same order as params_list
+        """
+        logger.debug(f"Execute command batch: {cmd.name} : {len(params_list)} calls")
+
+        requests = [self.build_command_parser_req(cmd=cmd, params=params)
+                    for params in params_list]
+
+        metadata = self.compression_metadata(compression)
+
+        async def _send(req: CommandParserReq, params: List):
+            with self.lease_stub(cmd=cmd, params=params) as stub:
+                return await stub.command_parser(req, timeout=timeout, metadata=metadata)
+
+        async def _gather():
+            return await asyncio.gather(*[_send(req, params) for req, params in zip(requests, params_list)])
+
+        resps = self.event_loop.run_until_complete(_gather())
+        # resend the requests referencing evicted blobs once uploaded again
+        for index, (resp, params) in enumerate(zip(resps, params_list)):
+            if resp.status.code == BLOB_NOT_FOUND_CODE and self.restore_blobs(params=params, resp=resp):
+                resps[index] = self.event_loop.run_until_complete(
+                    _send(self.build_command_parser_req(cmd=cmd, params=params), params))
+        self.call_profile.mark('rpc')
+
+        return [self.parse_command_parser_resp(resp=resp, return_type=return_type, lazy=lazy,
+                                               profile=self.call_profile) for resp in resps]
+
+    @grpc_call_general(max_retries=0)
+    def run_command_graph(self, graph: CommandGraph, max_concurrency: int = 8, timeout: Optional[float] = None,
+                          compression: Any = None, lazy: bool = False) -> ScheduleReport:
+        """Run a DAG of commands, the independent branches concurrently over the shared channel.
+
+        A command is sent once the commands it depends on succeeded, with the references to
+        their responses resolved (see engine_pipe_scheduler). The commands are not retried as
+        a whole: they are not idempotent, i.e., creating objects.
+
+        Args:
+            graph (CommandGraph): Represent the commands and their dependencies
+            max_concurrency (int, optional): Represent the maximum number of commands in flight. Defaults to 8.
+            timeout (Optional[float], optional): Represent the timeout of each call. Defaults to None.
+            compression (Any, optional): Represent the accepted payload codecs override. Defaults to None.
+            lazy (bool, optional): Represent the flag of unpacking Struct payloads as lazy views. Defaults to False.
+
+        Returns:
+            ScheduleReport: Represent the responses, failures, timings and critical path of the run
+        """
+        logger.debug(f"Execute command graph: {len(graph)} commands, {max_concurrency} concurrent")
+
+        metadata = self.compression_metadata(compression)
+
+        async def _execute(node: CommandNode, params: List[Any]):
+            req = self.build_command_parser_req(cmd=node.cmd, params=params)
+            with self.lease_stub(cmd=node.cmd, params=params) as stub:
+                resp = await stub.command_parser(req, timeout=timeout, metadata=metadata)
+            return self.parse_command_parser_resp(resp=resp, return_type=node.return_type, lazy=lazy)
+
+        report = self.event_loop.run_until_complete(
+            run_graph(graph, _execute, max_concurrency=max_concurrency,
+                      is_failure=lambda resp: hasattr(resp, 'status') and resp.status.code != 0))
+        self.call_profile.mark('rpc')
+
+        logger.debug(f"Command graph finished in {report.elapsed * 1000:.1f}ms, "
+                     f"critical path {report.critical_path_time * 1000:.1f}ms: {report.critical_path}")
+        return report
+
     @grpc_call_general()
     def get_project_info(self, is_reload: bool = False) -> ProjectInfoResp:
         """Retrieve the current project context of the connected engine.
@@ -265,14 +570,95 @@ class SimulationEngineImpl(BaseEngineImpl):
         Returns:
             ProjectInfoResp: Represent the returned project context
         """
-        if not self._project_info or is_reload:
+        # the cache is dropped on reconnect, i.e., the editor was restarted or another one took the endpoint
+        if (not self._project_info or is_reload
+                or self._project_info_generation != self.connection_generation()):
 
             # retrieve the project info from the engine / platform
             self._project_info = self.command_parser(
                 cmd=GRPCInterface.method_system_get_projectinfo, return_type=ProjectInfoResp)
+            self._project_info_generation = self.connection_generation()
 
         return self._project_info
 
+    @property
+    def blob_cache(self) -> BlobDigestCache:
+        return self._blob_cache
+
+    @grpc_call_general()
+    def upload_blobs(self, buffers: Iterable[Any], verify: bool = False) -> List[str]:
+        """Make the buffers available to the engine's commands, uploading only the content it does not store yet.
+
+        The buffers are identified by their sha256 digest. The digests known to be stored by
+        the engine are memoized, so the repeated content skips the round trips entirely.
+
+        Args:
+            buffers (Iterable[Any]): Represent the buffer-protocol objects, i.e., bytes or numpy arrays
+            verify (bool, optional): Represent the flag of asking the engine instead of trusting the memoized
+                digests, i.e., after the engine evicted blobs. Defaults to False.
+
+        Raises:
+            RuntimeError: Raise if the engine rejected an upload
+
+        Returns:
+            List[str]: Represent the '%@blob:<sha256>' parameters referencing the buffers, in the same order.
+                They keep their buffer (BlobParameter), so the commands upload it again if the engine evicted it.
+        """
+        buffers = list(buffers)
+        digests = [blob_digest(buffer) for buffer in buffers]
+
+        # the blob store does not survive an engine restart: drop the digests of a previous connection
+        if self._blob_cache_generation != self.connection_generation():
+            self._blob_cache.clear()
+
+        unknown = list(dict.fromkeys(digest for digest in digests if verify or digest not in self._blob_cache))
+        if unknown:
+            missing = set(self.command_parser(cmd=GRPCInterface.method_blob_find_missing, params=[unknown]).payload or [])
+            uploads = {digest: buffer for digest, buffer in zip(digests, buffers) if digest in missing}
+            if uploads:
+                resps = self.command_parser_batch(cmd=GRPCInterface.method_blob_upload,
+                                                  params_list=[[digest, buffer] for digest, buffer in uploads.items()])
+                # memoize the stored digests, even if another upload failed
+                failed = {digest: resp.status.message for digest, resp in zip(uploads, resps) if resp.status.code != 0}
+                self._blob_cache.add(digest for digest in unknown if digest not in failed)
+                if failed:
+                    raise RuntimeError(f"The engine rejected the blobs: {failed}")
+            else:
+                self._blob_cache.add(unknown)
+            self._blob_cache_generation = self.connection_generation()
+
+        return [BlobParameter(digest, buffer) for digest, buffer in zip(digests, buffers)]
+
+    def restore_blobs(self, params: List, resp: GenericResp) -> bool:
+        """Upload again the blobs the engine answered missing (BLOB_NOT_FOUND_CODE), True to resend the command"""
+        # the engine evicted the blobs since they were memoized: upload the buffers kept by the parameters again
+        missing = (set(self.unpack(self.decompress(resp.payload)) or [])
+                   if isinstance(resp.payload, protobuf.Any) else set())
+        self._blob_cache.discard(missing)
+        buffers = {param.digest: param.data for param in params
+                   if isinstance(param, BlobParameter) and param.digest in missing and param.data is not None}
+        if not missing or set(buffers) != missing:
+            return False
+        logger.debug(f"Upload the evicted blobs again: {sorted(missing)}")
+        self.upload_blobs(buffers=list(buffers.values()))
+        return True
+
+    def subscribe_events(self, events: Optional[Iterable[Union[EngineEventType, str]]] = None,
+                         callback: Optional[Callable[[EngineEvent], None]] = None,
+                         **kwargs) -> EventSubscription:
+        """Subscribe to the state changes pushed by the engine, instead of polling its state.
+
+        Args:
+            events (Iterable, optional): Represent the subscribed events (EngineEventType or names). Defaults to all events.
+            callback (Callable[[EngineEvent], None], optional): Represent the handler called on the stream thread
+                for each event. Defaults to None: the events are queued, see EventSubscription.get / wait.
+            kwargs: Represent the queue and reconnect settings of EventSubscription
+
+        Returns:
+            EventSubscription: Represent the started subscription, close it (or use it as context manager) when done
+        """
+        return EventSubscription(engine=self, events=events, callback=callback, **kwargs).start()
+
     @grpc_call_general()
     def get_service_status(self) -> bool:
         try:
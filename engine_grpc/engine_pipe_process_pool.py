@@ -0,0 +1,246 @@
+"""Pool of pre-launched, pre-warmed editor processes leased to jobs.
+
+Booting an editor and waiting for its gRPC service takes minutes. The pool launches one
+editor per port up front, waits until each one answers and retrieves its project info,
+then leases the ready editors to the jobs:
+
+    pool = EditorProcessPool(['Unity', '-projectPath', project, '-grpcPort', '{port}'],
+                             ports=[50061, 50062], max_memory=8 * 1024 ** 3)
+    with pool:
+        with pool.lease() as editor:
+            editor.refresh_asset_database()
+
+Editors are tracked by PID. An editor which exited (crashed) or grew beyond `max_memory`
+is killed and relaunched on its port in the background, the other editors keep serving.
+"""
+from __future__ import annotations
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+
+import psutil
+from compipe.utils.logging import logger
+
+from .engine_pipe_channel import is_endpoint_listening
+from .engine_pipe_impl import SimulationEngineImpl
+from .engine_pipe_registry import get_engine
+from .unity.engine_pipe_unity_impl import UnityEditorImpl
+from .utils.sys_process import kill_process_tree, process_tree_memory
+
+
+class EditorState(Enum):
+    starting = auto()
+    idle = auto()
+    leased = auto()
+    failed = auto()
+
+
+@dataclass
+class PooledEditor:
+    """Represent an editor process of the pool"""
+    port: int
+    engine: SimulationEngineImpl
+    process: Optional[psutil.Popen] = None
+    state: EditorState = EditorState.starting
+    # number of completed leases since the editor was launched
+    jobs: int = 0
+    launches: int = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+@dataclass
+class EditorProcessPool:
+    """Keep editors running on known ports and lease them to jobs.
+
+    Args:
+        command (List[str]): Represent the launch command, '{port}' in the arguments is replaced by the port
+        ports (Iterable[int]): Represent the ports, one editor per port
+        engine_type (Type[SimulationEngineImpl], optional): Represent the engine implementation. Defaults to UnityEditorImpl.
+        host (str, optional): Represent the host the editors listen on. Defaults to 127.0.0.1.
+        max_memory (int, optional): Represent the resident memory (bytes) beyond which an editor is recycled. Defaults to None.
+        max_jobs (int, optional): Represent the number of leases after which an editor is recycled. Defaults to None.
+        ready_timeout (float, optional): Represent the timeout (seconds) of an editor boot. Defaults to 600.
+        check_interval (float, optional): Represent the interval (seconds) of the readiness checks. Defaults to 0.5.
+        env (Dict[str, str], optional): Represent extra environment variables of the editors. Defaults to None.
+    """
+    command: List[str]
+    ports: Iterable[int]
+    engine_type: Type[SimulationEngineImpl] = UnityEditorImpl
+    host: str = '127.0.0.1'
+    max_memory: Optional[int] = None
+    max_jobs: Optional[int] = None
+    ready_timeout: float = 600.0
+    check_interval: float = 0.5
+    env: Optional[Dict[str, str]] = None
+    editors: List[PooledEditor] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        self.ports = list(self.ports)
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __enter__(self) -> EditorProcessPool:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self, wait: bool = True):
+        """Launch the editors, wait until all of them are ready unless `wait` is False"""
+        self.editors = [PooledEditor(port=port, engine=get_engine(self.engine_type, f"{self.host}:{port}"))
+                        for port in self.ports]
+        threads = [threading.Thread(target=self._launch, args=(editor,), daemon=True) for editor in self.editors]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for editor in self.editors:
+            if editor.process is not None:
+                kill_process_tree(editor.pid)
+
+    def _launch(self, editor: PooledEditor):
+        command = [argument.replace('{port}', str(editor.port)) for argument in self.command]
+        env = {**os.environ, **self.env} if self.env else None
+        try:
+            process = psutil.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            # i.e., a missing binary: report it to the waiting jobs instead of starting forever
+            logger.error(f"Failed to launch the editor on port {editor.port}: {e}")
+            with self._condition:
+                editor.state = EditorState.failed
+                self._condition.notify_all()
+            return
+
+        with self._condition:
+            editor.process = process
+            closed = self._closed
+        if closed:
+            # the pool was closed during the launch, its editors are already killed
+            kill_process_tree(process.pid)
+            return
+        editor.launches += 1
+        editor.jobs = 0
+        if isinstance(editor.engine, UnityEditorImpl):
+            editor.engine.pid = editor.pid
+        logger.debug(f"Launched editor on port {editor.port}: pid {editor.pid}")
+
+        state = EditorState.idle if self._warm_up(editor) else EditorState.failed
+        if state == EditorState.failed:
+            logger.error(f"Editor on port {editor.port} did not become ready (pid {editor.pid})")
+            kill_process_tree(editor.pid)
+        with self._condition:
+            editor.state = state
+            self._condition.notify_all()
+
+    def _warm_up(self, editor: PooledEditor) -> bool:
+        """Wait for the gRPC service and fill the caches of the engine, i.e., the project info"""
+        deadline = time.time() + self.ready_timeout
+        while time.time() < deadline and not self._closed:
+            if not editor.is_alive:
+                return False
+            # wait for the listening port before the (logged) gRPC checks
+            if self._is_listening(editor.port) and editor.engine.get_service_status():
+                try:
+                    editor.engine.get_project_info(is_reload=True)
+                    return True
+                except Exception as e:
+                    logger.warning(f"Editor on port {editor.port} did not answer the project info: {e}")
+            time.sleep(self.check_interval)
+        return False
+
+    def _is_listening(self, port: int) -> bool:
+        return is_endpoint_listening(f"{self.host}:{port}", timeout=self.check_interval)
+
+    def _needs_recycle(self, editor: PooledEditor) -> Optional[str]:
+        if not editor.is_alive:
+            return 'exited'
+        if self.max_memory is not None and (memory := process_tree_memory(editor.pid)) > self.max_memory:
+            return f"uses {memory / 1024 ** 2:.0f}MiB"
+        if self.max_jobs is not None and editor.jobs >= self.max_jobs:
+            return f"served {editor.jobs} jobs"
+        return None
+
+    def _recycle(self, editor: PooledEditor, reason: str):
+        """Relaunch the editor in the background (the caller holds the condition)"""
+        logger.warning(f"Recycle editor on port {editor.port} (pid {editor.pid}): {reason}")
+        editor.state = EditorState.starting
+
+        def relaunch():
+            if editor.process is not None:
+                kill_process_tree(editor.pid)
+            if not self._closed:
+                self._launch(editor)
+
+        threading.Thread(target=relaunch, daemon=True).start()
+
+    def acquire(self, timeout: Optional[float] = None) -> SimulationEngineImpl:
+        """Lease a ready editor, wait until one is released.
+
+        Raises:
+            TimeoutError: Raise if no editor became available within the timeout
+            RuntimeError: Raise if the pool is closed or all editors failed to start
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The editor pool is closed")
+                for editor in self.editors:
+                    if editor.state != EditorState.idle:
+                        continue
+                    # crashed while idle, the memory is checked when the jobs release the editors
+                    if not editor.is_alive:
+                        self._recycle(editor, 'exited')
+                        continue
+                    editor.state = EditorState.leased
+                    return editor.engine
+                if self.editors and all(editor.state == EditorState.failed for editor in self.editors):
+                    raise RuntimeError("None of the editors of the pool started")
+
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No editor available within {timeout}s")
+                self._condition.wait(remaining)
+
+    def release(self, engine: SimulationEngineImpl):
+        """Return the leased editor, recycle it if it crashed or bloated"""
+        with self._condition:
+            editor = next(editor for editor in self.editors if editor.engine is engine)
+            editor.jobs += 1
+            if (reason := self._needs_recycle(editor)) is not None and not self._closed:
+                self._recycle(editor, reason)
+            else:
+                editor.state = EditorState.idle
+            self._condition.notify_all()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[SimulationEngineImpl]:
+        engine = self.acquire(timeout=timeout)
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    def status(self) -> List[dict]:
+        with self._condition:
+            return [{'port': editor.port, 'pid': editor.pid, 'state': editor.state.name,
+                     'jobs': editor.jobs, 'launches': editor.launches} for editor in self.editors]
@@ -0,0 +1,57 @@
+"""Registry of the engine instances keyed by endpoint.
+
+Engine objects keep their own stub, event loop and caches (i.e., the project info), so
+each live editor connection is a separate instance. The registry hands out one shared
+instance per engine type and endpoint, resolved the same way as the channel manager
+(explicit channel, <PLATFORM>_GRPC_CHANNEL environment variable, runtime config).
+"""
+import threading
+from typing import Dict, List, Tuple, Type, TypeVar
+
+from .engine_pipe_channel import resolve_channel_address
+from .engine_pipe_impl import BaseEngineImpl
+
+EngineType = TypeVar('EngineType', bound=BaseEngineImpl)
+
+_engines: Dict[Tuple[Type[BaseEngineImpl], str], BaseEngineImpl] = {}
+_engines_lock = threading.Lock()
+
+
+def _endpoint_key(engine_type: Type[BaseEngineImpl], channel: str = None) -> Tuple[Type[BaseEngineImpl], str]:
+    # the platform name is an instance property, constructing an engine does not connect
+    return engine_type, resolve_channel_address(engine_type().engine_platform, channel)
+
+
+def get_engine(engine_type: Type[EngineType], channel: str = None) -> EngineType:
+    """Retrieve the engine connected to the endpoint, created on first use.
+
+    Args:
+        engine_type (Type[EngineType]): Represent the engine implementation, i.e., UnityEditorImpl
+        channel (str, optional): Represent the endpoint, i.e., 127.0.0.1:50061 or unix:///tmp/unity_grpc.sock.
+            Defaults to the endpoint of the environment / runtime config.
+
+    Returns:
+        EngineType: Represent the engine instance shared by the callers of the endpoint
+    """
+    key = _endpoint_key(engine_type, channel)
+    with _engines_lock:
+        if (engine := _engines.get(key)) is None:
+            engine = _engines[key] = engine_type(channel=key[1])
+        return engine
+
+
+def registered_engines() -> List[BaseEngineImpl]:
+    with _engines_lock:
+        return list(_engines.values())
+
+
+def release_engine(engine_type: Type[BaseEngineImpl], channel: str = None) -> bool:
+    """Remove the engine of the endpoint from the registry, return False if it was not registered"""
+    key = _endpoint_key(engine_type, channel)
+    with _engines_lock:
+        return _engines.pop(key, None) is not None
+
+
+def clear_engines():
+    with _engines_lock:
+        _engines.clear()
@@ -0,0 +1,112 @@
+"""Replay a recorded traffic log (see utils.traffic_log) against a gRPC server.
+
+The recorded requests are sent as is (raw wire bytes) at their original pace, scaled by
+`speed`, so the load of an editor session can be reproduced against a local
+`run_grpc_server` stand-in for load testing and profiling, without the editor.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Collection, List, Optional
+
+import grpc
+from grpc import aio
+
+from .engine_pipe_server import GrpcServerConfig
+from .utils.traffic_log import TrafficRecord, read_traffic_log
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+@dataclass
+class ReplayReport:
+    """Represent the outcome of a replay"""
+    # latency (seconds) and grpc status code of the replayed calls, in the log order
+    latencies: List[float] = field(default_factory=list)
+    statuses: List[int] = field(default_factory=list)
+    # successful calls whose response differs from the recorded one
+    mismatches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def calls(self) -> int:
+        return len(self.statuses)
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for status in self.statuses if status != 0)
+
+    @property
+    def throughput(self) -> float:
+        """Represent the replayed calls per second"""
+        return self.calls / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+
+async def replay_records(records: List[TrafficRecord], channel: str, speed: Optional[float] = 1.0,
+                         timeout: Optional[float] = None, max_in_flight: int = 64) -> ReplayReport:
+    """Replay the records over a new channel, see replay_traffic"""
+    report = ReplayReport(latencies=[0.0] * len(records), statuses=[0] * len(records))
+    if not records:
+        return report
+
+    max_msg_length = GrpcServerConfig.max_msg_length
+    options = [('grpc.max_receive_message_length', max_msg_length),
+               ('grpc.max_send_message_length', max_msg_length)]
+    semaphore = asyncio.Semaphore(max_in_flight)
+    first_started = records[0].started
+
+    async with aio.insecure_channel(channel, options=options) as grpc_channel:
+        methods = {route: grpc_channel.unary_unary(route, request_serializer=_identity,
+                                                   response_deserializer=_identity)
+                   for route in {record.route for record in records}}
+        replay_started = time.perf_counter()
+
+        async def replay(index: int, record: TrafficRecord):
+            if speed:
+                delay = (record.started - first_started) / speed - (time.perf_counter() - replay_started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await methods[record.route](record.request, timeout=timeout,
+                                                           metadata=tuple(record.metadata.items()) or None)
+                    if record.status == 0 and response != record.response:
+                        report.mismatches += 1
+                except aio.AioRpcError as e:
+                    report.statuses[index] = e.code().value[0]
+                report.latencies[index] = time.perf_counter() - started
+
+        await asyncio.gather(*[replay(index, record) for index, record in enumerate(records)])
+        report.elapsed = time.perf_counter() - replay_started
+
+    return report
+
+
+def replay_traffic(path: str, channel: str, speed: Optional[float] = 1.0, routes: Collection[str] = None,
+                   timeout: Optional[float] = None, max_in_flight: int = 64) -> ReplayReport:
+    """Replay the traffic log against the server.
+
+    Args:
+        path (str): Represent the path of the traffic log
+        channel (str): Represent the server address, i.e., 127.0.0.1:50061 or unix:///tmp/unity_grpc.sock
+        speed (Optional[float], optional): Represent the rate relative to the recording, i.e., 2.0 replays
+            twice as fast. None sends the requests back-to-back. Defaults to 1.0.
+        routes (Collection[str], optional): Represent the routes to replay, i.e.,
+            /ugrpc_pipe.UGrpcPipe/CommandParser. Defaults to all routes.
+        timeout (Optional[float], optional): Represent the timeout (seconds) of each call. Defaults to None.
+        max_in_flight (int, optional): Represent the maximum number of concurrent calls. Defaults to 64.
+
+    Returns:
+        ReplayReport: Represent the latencies and status codes of the replayed calls
+    """
+    records = [record for record in read_traffic_log(path) if routes is None or record.route in routes]
+    return asyncio.run(replay_records(records, channel, speed=speed, timeout=timeout, max_in_flight=max_in_flight))
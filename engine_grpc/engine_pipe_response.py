@@ -0,0 +1,216 @@
+"""Build GenericResp messages and their Any payloads on the Python server.
+
+`pack_payload` picks the payload type from the Python value:
+
+    None                      -> empty payload
+    str / bytes / bool        -> StringValue / BytesValue / BoolValue
+    int / float               -> Int64Value (UInt64Value above the signed range) / DoubleValue
+    dict / list / tuple       -> Struct / ListValue
+    numpy array, array.array  -> FloatArrayRep (float32) / IntArrayRep (int32) packed fields,
+                                 ListValue for integers beyond int32 (OverflowError beyond 2^53)
+    protobuf message          -> packed as is
+
+Type urls are computed once per message type. Wrappers, Struct / ListValue and float
+arrays are encoded directly into the wire format instead of filling intermediate
+messages: with the upb runtime, building and reusing (pooling) message objects costs
+more than the encoding.
+"""
+import array
+import struct
+from functools import lru_cache
+from numbers import Integral, Real
+from typing import Any
+
+from google.protobuf import any_pb2, struct_pb2, wrappers_pb2
+from google.protobuf.message import Message
+from ugrpc_pipe import ugrpc_pipe_pb2
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TYPE_URL_PREFIX = 'type.googleapis.com/'
+
+_pack_double = struct.Struct('<d').pack
+_INT32_RANGE = range(-2 ** 31, 2 ** 31)
+_INT64_RANGE = range(-2 ** 63, 2 ** 63)
+# integers represented exactly by the double numbers of ListValue
+_EXACT_DOUBLE_RANGE = range(-2 ** 53, 2 ** 53 + 1)
+_UINT64_MAX = 2 ** 64 - 1
+
+_FLOAT_TYPECODES = frozenset('fd')
+_INT_TYPECODES = frozenset('bBhHiIlLqQ')
+
+
+@lru_cache(maxsize=None)
+def type_url_of(descriptor) -> str:
+    """Retrieve the Any type_url of the message descriptor"""
+    return f"{TYPE_URL_PREFIX}{descriptor.full_name}"
+
+
+_STRING_VALUE_URL = type_url_of(wrappers_pb2.StringValue.DESCRIPTOR)
+_BYTES_VALUE_URL = type_url_of(wrappers_pb2.BytesValue.DESCRIPTOR)
+_BOOL_VALUE_URL = type_url_of(wrappers_pb2.BoolValue.DESCRIPTOR)
+_INT64_VALUE_URL = type_url_of(wrappers_pb2.Int64Value.DESCRIPTOR)
+_UINT64_VALUE_URL = type_url_of(wrappers_pb2.UInt64Value.DESCRIPTOR)
+_DOUBLE_VALUE_URL = type_url_of(wrappers_pb2.DoubleValue.DESCRIPTOR)
+_STRUCT_URL = type_url_of(struct_pb2.Struct.DESCRIPTOR)
+_LIST_VALUE_URL = type_url_of(struct_pb2.ListValue.DESCRIPTOR)
+_FLOAT_ARRAY_URL = type_url_of(ugrpc_pipe_pb2.FloatArrayRep.DESCRIPTOR)
+_INT_ARRAY_URL = type_url_of(ugrpc_pipe_pb2.IntArrayRep.DESCRIPTOR)
+
+# shared by all successful responses, assigning it to a response copies it
+OK_STATUS = ugrpc_pipe_pb2.Status(code=0, message="OK")
+
+# single byte tags and lengths
+_SINGLE_BYTES = [bytes((value,)) for value in range(0x80)]
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _length_delimited(field_tag: int, data: bytes) -> bytes:
+    length = len(data)
+    return b''.join([_SINGLE_BYTES[field_tag], _SINGLE_BYTES[length] if length < 0x80 else _encode_varint(length), data])
+
+
+def _encode_struct_value(value: Any) -> bytes:
+    # google.protobuf.Value: null 0x08, number 0x11, string 0x1A, bool 0x20, struct 0x2A, list 0x32
+    if value is None:
+        return b'\x08\x00'
+    if value is True:
+        return b'\x20\x01'
+    if value is False:
+        return b'\x20\x00'
+    value_type = type(value)
+    if value_type is float or value_type is int:
+        return b'\x11' + _pack_double(value)
+    if value_type is str:
+        return _length_delimited(0x1A, value.encode('utf-8'))
+    if isinstance(value, dict):
+        return _length_delimited(0x2A, encode_struct(value))
+    if isinstance(value, (list, tuple)):
+        return _length_delimited(0x32, encode_list_value(value))
+    if isinstance(value, Real):
+        return b'\x11' + _pack_double(float(value))
+    raise TypeError(f"Unsupported Struct value type: {value_type}")
+
+
+def encode_struct(data: dict) -> bytes:
+    """Serialize the dict as google.protobuf.Struct"""
+    entries = []
+    for key, value in data.items():
+        if not isinstance(key, str):
+            raise TypeError(f"Struct keys should be strings: {key!r}")
+        # map entry: key 0x0A, value 0x12
+        entry = _length_delimited(0x0A, key.encode('utf-8')) + _length_delimited(0x12, _encode_struct_value(value))
+        entries.append(_length_delimited(0x0A, entry))
+    return b''.join(entries)
+
+
+def encode_list_value(values) -> bytes:
+    """Serialize the list as google.protobuf.ListValue"""
+    return b''.join([_length_delimited(0x0A, _encode_struct_value(value)) for value in values])
+
+
+def _pack_float_array(values) -> any_pb2.Any:
+    # packed float32 values are the raw little-endian buffer: no per-item conversion
+    data = numpy.asarray(values, dtype='<f4').tobytes() if numpy is not None else _float32_bytes(values)
+    return any_pb2.Any(type_url=_FLOAT_ARRAY_URL, value=_length_delimited(0x0A, data) if data else b'')
+
+
+def _float32_bytes(values) -> bytes:
+    data = array.array('f', values)
+    if struct.pack('=f', 1.0) != struct.pack('<f', 1.0):
+        data.byteswap()
+    return data.tobytes()
+
+
+def _pack_int_array(values) -> any_pb2.Any:
+    values = values.tolist()
+    if not values or (min(values) in _INT32_RANGE and max(values) in _INT32_RANGE):
+        message = ugrpc_pipe_pb2.IntArrayRep()
+        message.values.extend(values)
+        return any_pb2.Any(type_url=_INT_ARRAY_URL, value=message.SerializeToString())
+
+    # IntArrayRep holds int32 values, the wider ones are sent as ListValue numbers when exact
+    if min(values) not in _EXACT_DOUBLE_RANGE or max(values) not in _EXACT_DOUBLE_RANGE:
+        raise OverflowError(f"The integer array payload exceeds the exact double range: "
+                            f"[{min(values)}, {max(values)}]")
+    return any_pb2.Any(type_url=_LIST_VALUE_URL, value=encode_list_value(values))
+
+
+def _pack_ndarray(value) -> any_pb2.Any:
+    if value.dtype.kind == 'f':
+        return _pack_float_array(value.ravel())
+    if value.dtype.kind == 'b':
+        return _pack_int_array(value.ravel().astype('i4'))
+    if value.dtype.kind in 'iu':
+        return _pack_int_array(value.ravel())
+    raise TypeError(f"Unsupported array dtype of payload: {value.dtype}")
+
+
+def pack_payload(value: Any) -> any_pb2.Any:
+    """Pack the Python value into the Any payload of a response"""
+    if value is None:
+        return any_pb2.Any()
+    if isinstance(value, any_pb2.Any):
+        return value
+    if isinstance(value, Message):
+        return any_pb2.Any(type_url=type_url_of(value.DESCRIPTOR), value=value.SerializeToString())
+    if numpy is not None:
+        if isinstance(value, numpy.ndarray):
+            return _pack_ndarray(value)
+        if isinstance(value, numpy.generic):
+            value = value.item()
+
+    if isinstance(value, str):
+        return any_pb2.Any(type_url=_STRING_VALUE_URL, value=_length_delimited(0x0A, value.encode('utf-8')))
+    if isinstance(value, (bytes, bytearray)):
+        return any_pb2.Any(type_url=_BYTES_VALUE_URL, value=_length_delimited(0x0A, bytes(value)))
+    if isinstance(value, bool):
+        return any_pb2.Any(type_url=_BOOL_VALUE_URL, value=b'\x08\x01' if value else b'')
+    if isinstance(value, Integral):
+        if value in _INT64_RANGE:
+            # negative numbers are encoded as 64-bit two's complement varints
+            return any_pb2.Any(type_url=_INT64_VALUE_URL,
+                               value=b'\x08' + _encode_varint(int(value) & _UINT64_MAX) if value else b'')
+        if value <= _UINT64_MAX:
+            return any_pb2.Any(type_url=_UINT64_VALUE_URL, value=b'\x08' + _encode_varint(int(value)))
+        raise OverflowError(f"The integer payload exceeds 64 bits: {value}")
+    if isinstance(value, Real):
+        return any_pb2.Any(type_url=_DOUBLE_VALUE_URL, value=b'\x09' + _pack_double(float(value)))
+
+    if isinstance(value, dict):
+        return any_pb2.Any(type_url=_STRUCT_URL, value=encode_struct(value))
+    if isinstance(value, (list, tuple)):
+        return any_pb2.Any(type_url=_LIST_VALUE_URL, value=encode_list_value(value))
+    if isinstance(value, array.array):
+        if value.typecode in _FLOAT_TYPECODES:
+            return _pack_float_array(value)
+        if value.typecode in _INT_TYPECODES:
+            return _pack_int_array(value)
+
+    raise TypeError(f"Unsupported payload type: {type(value)}")
+
+
+def build_response(payload: Any = None, code: int = 0, message: str = "OK") -> ugrpc_pipe_pb2.GenericResp:
+    """Build the GenericResp of a handler.
+
+    Args:
+        payload (Any, optional): Represent the value packed by `pack_payload`. Defaults to None.
+        code (int, optional): Represent the status code, 0 on success. Defaults to 0.
+        message (str, optional): Represent the status message. Defaults to "OK".
+
+    Returns:
+        ugrpc_pipe_pb2.GenericResp: Represent the response
+    """
+    status = OK_STATUS if code == 0 and message == "OK" else ugrpc_pipe_pb2.Status(code=code, message=message)
+    return ugrpc_pipe_pb2.GenericResp(status=status, payload=pack_payload(payload))
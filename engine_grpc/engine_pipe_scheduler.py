@@ -0,0 +1,288 @@
+"""Dependency-aware scheduling of command graphs.
+
+Prefab pipelines are chains of commands (create, add component, set reference, set value)
+where a step needs the result of the previous one, while the chains themselves are
+independent. A `CommandGraph` declares the commands and their dependencies, the engine
+runs the independent branches concurrently over its channel:
+
+    graph = CommandGraph()
+    player = graph.add('player', GRPCInterface.method_object_create, params=['Player'])
+    body = graph.add('body', GRPCInterface.method_object_add_component, params=[player.ref('id'), 'Rigidbody'])
+    graph.add('mass', GRPCInterface.method_object_set_value, params=[body.ref('id'), 'mass', 2.0])
+
+    report = engine.run_command_graph(graph=graph, max_concurrency=8)
+    report.results['body'].payload, report.critical_path, report.critical_path_time
+
+Parameters referencing another node (`CommandNode.ref`) are replaced by the payload of its
+response, or by a value inside of it, before the command is sent. A referenced node is an
+implicit dependency; `after` declares the dependencies without data flow.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from compipe.utils.logging import logger
+
+from .engine_stub_interface import GRPCInterface
+
+
+@dataclass(frozen=True)
+class NodeRef:
+    """Represent a parameter taken from the response payload of another node"""
+    node: str
+    # keys / indices walked into the payload, the whole payload if empty
+    path: Tuple[Any, ...] = ()
+
+    def resolve(self, results: Dict[str, Any]) -> Any:
+        value = results[self.node]
+        value = getattr(value, 'payload', value)
+        for key in self.path:
+            value = value[key] if isinstance(value, (Mapping, list, tuple)) else getattr(value, key)
+        return value
+
+
+@dataclass
+class CommandNode:
+    """Represent a command of the graph and the nodes it depends on"""
+    name: str
+    cmd: GRPCInterface
+    params: List[Any] = field(default_factory=list)
+    after: List[str] = field(default_factory=list)
+    return_type: Any = None
+
+    def ref(self, *path: Any) -> NodeRef:
+        """Reference the response payload of this node, or the value at `path` inside of it"""
+        return NodeRef(self.name, tuple(path))
+
+    @property
+    def dependencies(self) -> List[str]:
+        return list(dict.fromkeys([*self.after, *(ref.node for ref in _iter_refs(self.params))]))
+
+
+def _iter_refs(value: Any) -> Iterable[NodeRef]:
+    if isinstance(value, NodeRef):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_refs(item)
+
+
+def resolve_refs(value: Any, results: Dict[str, Any]) -> Any:
+    """Replace the node references of the (nested) parameters by the values of the results"""
+    if isinstance(value, NodeRef):
+        return value.resolve(results)
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve_refs(item, results) for item in value)
+    return value
+
+
+class CommandGraph:
+    """Represent a DAG of commands, see the module documentation"""
+
+    def __init__(self):
+        self.nodes: Dict[str, CommandNode] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.nodes
+
+    def __getitem__(self, name: str) -> CommandNode:
+        return self.nodes[name]
+
+    def add(self, name: str, cmd: GRPCInterface, params: List[Any] = None,
+            after: Iterable[str] = (), return_type: Any = None) -> CommandNode:
+        """Add a command to the graph.
+
+        Args:
+            name (str): Represent the unique name of the node, used by the references and the report
+            cmd (GRPCInterface): Represent the command interface
+            params (List[Any], optional): Represent the parameters, may contain `NodeRef`s. Defaults to None.
+            after (Iterable[str], optional): Represent the names of the nodes to complete first. Defaults to ().
+            return_type (Any, optional): Represent the message type to cast the payload into. Defaults to None.
+
+        Raises:
+            ValueError: Raise if the name is already used
+
+        Returns:
+            CommandNode: Represent the added node
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicated command node: {name}")
+        node = CommandNode(name=name, cmd=cmd, params=list(params or []), after=list(after),
+                           return_type=return_type)
+        self.nodes[name] = node
+        return node
+
+    def dependents(self) -> Dict[str, List[str]]:
+        dependents = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for dependency in node.dependencies:
+                dependents[dependency].append(node.name)
+        return dependents
+
+    def validate(self):
+        """Check that the dependencies exist and do not form a cycle.
+
+        Raises:
+            ValueError: Raise if a dependency is unknown or cyclic
+        """
+        for node in self.nodes.values():
+            if unknown := [name for name in node.dependencies if name not in self.nodes]:
+                raise ValueError(f"Unknown dependencies of the command node '{node.name}': {unknown}")
+        if len(ordered := self.topological_order()) != len(self.nodes):
+            cyclic = [name for name in self.nodes if name not in set(ordered)]
+            raise ValueError(f"Found cyclic command dependencies: {cyclic}")
+
+    def topological_order(self) -> List[str]:
+        """Sort the nodes after their dependencies (Kahn's algorithm), the cyclic ones are left out"""
+        pending = {name: len(node.dependencies) for name, node in self.nodes.items()}
+        dependents = self.dependents()
+        order = [name for name, count in pending.items() if count == 0]
+        for name in order:
+            for dependent in dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    order.append(dependent)
+        return order
+
+    def heights(self) -> Dict[str, int]:
+        """Represent the number of commands on the longest chain starting at every node"""
+        dependents = self.dependents()
+        heights = {}
+        for name in reversed(self.topological_order()):
+            heights[name] = 1 + max((heights[dependent] for dependent in dependents[name]), default=0)
+        return heights
+
+
+@dataclass
+class NodeTiming:
+    """Represent the execution of a node, in seconds since the start of the graph"""
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class ScheduleReport:
+    """Represent the outcome of a command graph run.
+
+    The critical path is the chain of dependent commands with the longest measured duration,
+    it bounds the run time however many commands are executed concurrently.
+    """
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    # nodes not executed because a dependency failed
+    skipped: List[str] = field(default_factory=list)
+    timings: Dict[str, NodeTiming] = field(default_factory=dict)
+    elapsed: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_time: float = 0.0
+    max_concurrency: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.errors and not self.skipped
+
+    @property
+    def sequential_time(self) -> float:
+        """Represent the summed command durations, i.e., the time of running them one after another"""
+        return sum(timing.duration for timing in self.timings.values())
+
+
+def critical_path(graph: CommandGraph, timings: Dict[str, NodeTiming]) -> Tuple[List[str], float]:
+    """Find the chain of executed nodes with the longest total duration"""
+    longest: Dict[str, Tuple[float, Optional[str]]] = {}
+    for name in graph.topological_order():
+        if name not in timings:
+            continue
+        previous = max(((longest[dependency][0], dependency) for dependency in graph[name].dependencies
+                        if dependency in longest), default=(0.0, None))
+        longest[name] = (previous[0] + timings[name].duration, previous[1])
+
+    if not longest:
+        return [], 0.0
+    name = max(longest, key=lambda key: longest[key][0])
+    total = longest[name][0]
+    path = []
+    while name is not None:
+        path.append(name)
+        name = longest[name][1]
+    return path[::-1], total
+
+
+async def run_graph(graph: CommandGraph, execute: Callable[[CommandNode, List[Any]], Awaitable[Any]],
+                    max_concurrency: int = 8, is_failure: Callable[[Any], bool] = None) -> ScheduleReport:
+    """Run the commands as soon as their dependencies completed, up to `max_concurrency` at once.
+
+    The ready commands heading the longest remaining chains start first. The dependents of a
+    failed command are skipped, the independent branches keep running.
+
+    Args:
+        graph (CommandGraph): Represent the commands
+        execute (Callable): Represent the coroutine function sending a node with its resolved parameters
+        max_concurrency (int, optional): Represent the maximum number of commands in flight. Defaults to 8.
+        is_failure (Callable[[Any], bool], optional): Represent the check of the failed results,
+            i.e., a non-zero status. Defaults to None.
+
+    Raises:
+        ValueError: Raise if the graph is invalid or max_concurrency is not positive
+
+    Returns:
+        ScheduleReport: Represent the results, errors and timings of the nodes
+    """
+    if max_concurrency <= 0:
+        raise ValueError(f"max_concurrency should be a positive number: {max_concurrency}")
+    graph.validate()
+
+    report = ScheduleReport()
+    heights = graph.heights()
+    dependents = graph.dependents()
+    pending = {name: len(node.dependencies) for name, node in graph.nodes.items()}
+    order = {name: index for index, name in enumerate(graph.nodes)}
+    ready = [(-heights[name], order[name], name) for name, count in pending.items() if count == 0]
+    heapq.heapify(ready)
+    running: Dict[asyncio.Task, str] = {}
+    started = time.perf_counter()
+
+    async def _run(node: CommandNode):
+        return await execute(node, resolve_refs(node.params, report.results))
+
+    while ready or running:
+        while ready and len(running) < max_concurrency:
+            name = heapq.heappop(ready)[2]
+            report.timings[name] = NodeTiming(started=time.perf_counter() - started, finished=0.0)
+            running[asyncio.ensure_future(_run(graph[name]))] = name
+        report.max_concurrency = max(report.max_concurrency, len(running))
+
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = running.pop(task)
+            report.timings[name].finished = time.perf_counter() - started
+            if (error := task.exception()) is not None:
+                report.errors[name] = error
+                logger.error(f"Command node '{name}' failed: {error}")
+                continue
+            report.results[name] = result = task.result()
+            if is_failure is not None and is_failure(result):
+                report.errors[name] = RuntimeError(f"Command node '{name}' returned a failure: {result}")
+                continue
+            for dependent in dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    heapq.heappush(ready, (-heights[dependent], order[dependent], dependent))
+
+    report.elapsed = time.perf_counter() - started
+    report.skipped = [name for name in graph.nodes if name not in report.timings]
+    if report.skipped:
+        logger.warning(f"Skipped the command nodes depending on failed ones: {report.skipped}")
+    report.critical_path, report.critical_path_time = critical_path(graph, report.timings)
+    return report
@@ -1,104 +1,941 @@
+from __future__ import annotations
 import asyncio
+import functools
+import json
+import multiprocessing
+import os
 import signal
+import socket
 import sys
+import threading
+import time
+from collections import OrderedDict, deque
 from concurrent import futures
-from typing import Optional, Type
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, Hashable, Iterator, List, Optional, Tuple, Type
 import grpc
 from grpc import aio
+from google.protobuf import any_pb2
 from ugrpc_pipe import ugrpc_pipe_pb2
 from ugrpc_pipe import ugrpc_pipe_pb2_grpc
 from compipe.utils.logging import logger
 
+from .engine_pipe_response import build_response, pack_payload
+from .engine_stub_interface import (EVENT_STREAM_METHOD, EVENT_STREAM_SERVICE, FRAME_SEQUENCE_METADATA,
+                                    INTERFACE_MAPPINGS, READ_ONLY_INTERFACES,
+                                    RETRY_AFTER_HINT, GRPCInterface)
+from .utils.blob_cache import BLOB_NOT_FOUND_CODE, BLOB_PARAMETER_PREFIX, BlobNotFoundError, blob_digest, is_blob_parameter
+from .utils.payload_compression import (ACCEPT_ENCODING_METADATA,
+                                        COMPRESSION_THRESHOLD_METADATA,
+                                        DEFAULT_COMPRESSION_THRESHOLD,
+                                        compress_payload,
+                                        is_compressed_type_url,
+                                        negotiate_codec, parse_codecs)
+from .utils.array_payload import (ARRAY_PARAMETER_PREFIX, ArrayDescriptor,
+                                  as_array, decode_array_fields)
+from .utils.shared_memory import (SHARED_MEMORY_PROBE_METADATA, SharedMemoryHandle,
+                                  SharedMemoryRing, pack_handle, read_shared_memory,
+                                  restore_fields)
+
+# full command strings (i.e., UGrpc.SystemUtils.GetProjectInfo) of the read-only interfaces
+READ_ONLY_COMMANDS = frozenset(command_str
+                               for interface in READ_ONLY_INTERFACES
+                               for command_str in INTERFACE_MAPPINGS[interface].values())
+
+# full command strings of the blob store interfaces
+BLOB_FIND_MISSING_COMMANDS = frozenset(INTERFACE_MAPPINGS[GRPCInterface.method_blob_find_missing].values())
+BLOB_UPLOAD_COMMANDS = frozenset(INTERFACE_MAPPINGS[GRPCInterface.method_blob_upload].values())
+
+
+def is_read_only_request(request) -> bool:
+    """Check whether the CommandParser envelope targets a command without side effects"""
+    try:
+        payload = json.loads(request.payload)
+        return f"{payload['type']}.{payload['method']}" in READ_ONLY_COMMANDS
+    except (ValueError, TypeError, KeyError):
+        return False
+
+
+@dataclass
+class _InFlightCall:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Merge identical in-flight calls into one execution whose result fans out to every waiter"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+        # number of calls served by another caller's execution
+        self.coalesced: int = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InFlightCall()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        # the async server runs all handlers on one event loop, no lock is required
+        if (future := self._async_calls.get(key)) is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[key]
+
+
+def single_flight(predicate: Callable[[Any], bool] = is_read_only_request):
+    """Coalesce identical concurrent requests of a servicer method, keyed by the servicer instance and
+    the serialized request: the payload envelope and the binary array fields traveling next to it.
+    Servicers hosted in the same process (i.e., with their own blob stores) never share a response.
+
+    Only requests accepted by the predicate (read-only commands by default) are merged;
+    the handler runs once with the first caller's context and every waiter receives the
+    same response. Supports both sync and async servicer methods.
+    """
+    def decorator(func):
+        flight = SingleFlight()
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, request, context):
+                if not predicate(request):
+                    return await func(self, request, context)
+                return await flight.do_async((id(self), request.SerializeToString()),
+                                             lambda: func(self, request, context))
+            async_wrapper.single_flight = flight
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, request, context):
+            if not predicate(request):
+                return func(self, request, context)
+            return flight.do((id(self), request.SerializeToString()), lambda: func(self, request, context))
+        wrapper.single_flight = flight
+        return wrapper
+
+    return decorator
+
+
+# image fields of RenderBytesReply
+IMAGE_BYTES_FIELDS = ['main_image_data', 'stereo_left_image_data', 'stereo_right_image_data']
+
+
+def resolve_image_buffers(request, context) -> Dict[str, Any]:
+    """Retrieve the image buffers of a RouteImageBytes request.
+
+    Buffers sent through the same-host shared memory are copied out of the client's ring,
+    the others are the bytes of the message.
+    """
+    buffers = restore_fields(context.invocation_metadata())
+    for field_name in IMAGE_BYTES_FIELDS:
+        if field_name not in buffers:
+            buffers[field_name] = getattr(request, field_name)
+    return buffers
+
+
+def resolve_frame_sequence(context) -> Optional[int]:
+    """Retrieve the sequence number of a frame streamed by a FramePipeline, None for the single calls.
+
+    With several frames in flight, a later frame can arrive first: skip the frames older than
+    the last one displayed.
+    """
+    for key, value in context.invocation_metadata():
+        if key == FRAME_SEQUENCE_METADATA:
+            return int(value)
+    return None
+
+
+def resolve_command_parameters(request, blobs: Optional[BlobStore] = None) -> List[Any]:
+    """Retrieve the parameters of a CommandParser request with the array placeholders resolved.
+
+    Binary array parameters are returned as numpy arrays (typed memoryviews without numpy)
+    viewing the request bytes or the buffers copied out of the client's shared memory, without
+    conversion to text.
+    The '%@blob:<sha256>' parameters are resolved into the bytes of the blob store, if specified,
+    BlobNotFoundError is raised with every digest missing from the store (see `blob_not_found_response`).
+    """
+    payload = json.loads(request.payload)
+    parameters = payload.get('parameters', [])
+    if blobs is not None:
+        if missing := blobs.missing([value[len(BLOB_PARAMETER_PREFIX):] for value in parameters
+                                     if is_blob_parameter(value)]):
+            raise BlobNotFoundError(missing)
+        parameters = [blobs.resolve(value) for value in parameters]
+    if not (descriptors := payload.get('arrays')):
+        return parameters
+
+    # the array fields are unknown to the generated message, read them from its wire format
+    fields = iter(decode_array_fields(request.SerializeToString()))
+    arrays = []
+    for descriptor in map(ArrayDescriptor.from_json, descriptors):
+        buffer = (read_shared_memory(SharedMemoryHandle.decode(descriptor.shm))
+                  if descriptor.shm is not None else next(fields))
+        arrays.append(as_array(buffer, descriptor))
+
+    return [arrays[int(value[len(ARRAY_PARAMETER_PREFIX):])]
+            if isinstance(value, str) and value.startswith(ARRAY_PARAMETER_PREFIX) else value
+            for value in parameters]
+
+
+class BlobStore:
+    """Content-addressed buffers uploaded by the clients and referenced by '%@blob:<sha256>' parameters.
+
+    Serves the FindMissing / Upload commands of utils.blob_cache. The least recently used
+    blobs are evicted beyond max_bytes; a command referencing an evicted blob fails with
+    BlobNotFoundError, answered by `blob_not_found_response` so the client uploads it again.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._blobs: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._blobs
+
+    def put(self, digest: str, data: Any):
+        # copy the buffer, it views the request bytes
+        data = memoryview(data).cast('B').tobytes() if not isinstance(data, bytes) else data
+        if blob_digest(data) != digest:
+            raise ValueError(f"The blob content does not match its digest: {digest}")
+        with self._lock:
+            if digest in self._blobs:
+                self._blobs.move_to_end(digest)
+                return
+            self._blobs[digest] = data
+            self.nbytes += len(data)
+            while self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._blobs) > 1:
+                self.nbytes -= len(self._blobs.popitem(last=False)[1])
+
+    def get(self, digest: str) -> memoryview:
+        with self._lock:
+            if (data := self._blobs.get(digest)) is None:
+                raise BlobNotFoundError([digest])
+            self._blobs.move_to_end(digest)
+        return memoryview(data)
+
+    def missing(self, digests: List[str]) -> List[str]:
+        return list(dict.fromkeys(digest for digest in digests if digest not in self._blobs))
+
+    def resolve(self, value: Any) -> Any:
+        return self.get(value[len(BLOB_PARAMETER_PREFIX):]) if is_blob_parameter(value) else value
+
+    def handle_command(self, request) -> Optional[Any]:
+        """Answer the blob store commands, None for the other commands"""
+        try:
+            payload = json.loads(request.payload)
+            command = f"{payload['type']}.{payload['method']}"
+        except (ValueError, TypeError, KeyError):
+            return None
+
+        if command in BLOB_FIND_MISSING_COMMANDS:
+            digests, = resolve_command_parameters(request)
+            # list parameters are joined by the client
+            return build_response(self.missing(digests.split('%@%') if digests else []))
+        if command in BLOB_UPLOAD_COMMANDS:
+            digest, data = resolve_command_parameters(request)
+            try:
+                self.put(digest, data)
+            except ValueError as e:
+                return build_response(code=1, message=str(e))
+            return build_response()
+        return None
+
+
+def blob_not_found_response(error: BlobNotFoundError) -> ugrpc_pipe_pb2.GenericResp:
+    """Answer a command referencing missing blobs, the client uploads them again and resends the command"""
+    return build_response(error.digests, code=BLOB_NOT_FOUND_CODE, message=str(error))
+
+
+def pack_shared_memory_payload(ring: SharedMemoryRing, data) -> any_pb2.Any:
+    """Write a large buffer into the server's ring and pack its handle as response payload"""
+    type_url, value = pack_handle(ring.write(data))
+    return any_pb2.Any(type_url=type_url, value=value)
+
+
+def parse_event_filter(request) -> Optional[FrozenSet[str]]:
+    """Retrieve the event names subscribed by a SubscribeEvents request, None for all events"""
+    try:
+        events = json.loads(request.payload or '{}').get('events')
+    except (ValueError, AttributeError):
+        return None
+    return frozenset(events) if events else None
+
+
+class _EventSubscriber:
+    """Represent the pending events of one stream, the oldest ones are dropped once the queue is full"""
+
+    def __init__(self, events: Optional[FrozenSet[str]], max_queue_size: int,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.events = events
+        self.closed = False
+        self.dropped = 0
+        self._messages = deque(maxlen=max_queue_size)
+        self._loop = loop
+        self._ready = asyncio.Event() if loop is not None else threading.Event()
+
+    def push(self, message):
+        if len(self._messages) == self._messages.maxlen:
+            self.dropped += 1
+        self._messages.append(message)
+        self._notify()
+
+    def close(self):
+        self.closed = True
+        self._notify()
+
+    def _notify(self):
+        if self._loop is None:
+            self._ready.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # the loop of the stream was closed
+            pass
+
+    def drain(self) -> List[Any]:
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        return messages
+
+    def wait(self, timeout: float):
+        self._ready.wait(timeout)
+        self._ready.clear()
+
+    async def wait_async(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._ready.clear()
+
+
+class EventBroadcaster:
+    """Push the engine events to the clients subscribed through the SubscribeEvents stream.
+
+    Each event is encoded once as a GenericResp carrying a Struct payload
+    {event, sequence, timestamp, data} and queued for every stream subscribed to it.
+    A slow client loses its oldest events instead of blocking the publisher, the gap
+    shows in the sequence numbers. Publishing is thread-safe.
+
+    The sync server runs each stream on a worker thread for its whole lifetime, use the
+    async server for many subscribers.
+    """
+
+    def __init__(self, max_queue_size: int = 1024, heartbeat: float = 1.0):
+        self.max_queue_size = max_queue_size
+        # interval (seconds) of the liveness checks of idle streams
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._subscribers: List[_EventSubscriber] = []
+        self._sequence = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: Any, **data) -> int:
+        """Send the event to its subscribers.
+
+        Args:
+            event (Any): Represent the event, an EngineEventType or its name
+            data: Represent the event details, i.e., the imported asset paths
+
+        Returns:
+            int: Represent the number of subscribers the event was queued for
+        """
+        name = event.name if isinstance(event, Enum) else str(event)
+        with self._lock:
+            self._sequence += 1
+            message = build_response({'event': name, 'sequence': self._sequence,
+                                      'timestamp': time.time(), 'data': data})
+            subscribers = [subscriber for subscriber in self._subscribers
+                           if subscriber.events is None or name in subscriber.events]
+        for subscriber in subscribers:
+            subscriber.push(message)
+        return len(subscribers)
+
+    def subscribe(self, events: Optional[FrozenSet[str]] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> _EventSubscriber:
+        subscriber = _EventSubscriber(events, self.max_queue_size, loop)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _EventSubscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        if subscriber.dropped:
+            logger.warning(f"Event subscriber dropped {subscriber.dropped} events, the client was too slow")
+
+    def stream(self, request, context) -> Iterator[Any]:
+        """Serve a SubscribeEvents call of the sync server until the client cancels it"""
+        subscriber = self.subscribe(parse_event_filter(request))
+        context.add_callback(subscriber.close)
+        try:
+            # the headers tell the client that the subscription is registered
+            context.send_initial_metadata(())
+            while not subscriber.closed and context.is_active():
+                subscriber.wait(self.heartbeat)
+                yield from subscriber.drain()
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def stream_async(self, request, context) -> AsyncIterator[Any]:
+        """Serve a SubscribeEvents call of the async server until the client cancels it"""
+        subscriber = self.subscribe(parse_event_filter(request), loop=asyncio.get_running_loop())
+        try:
+            await context.send_initial_metadata(())
+            while not subscriber.closed and not context.done():
+                await subscriber.wait_async(self.heartbeat)
+                for message in subscriber.drain():
+                    yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def add_event_stream_to_server(servicer, server):
+    """Register the SubscribeEvents route of the servicer next to the generated UGrpcPipe routes"""
+    if (behavior := getattr(servicer, EVENT_STREAM_METHOD, None)) is None:
+        return
+    handler = grpc.unary_stream_rpc_method_handler(
+        behavior,
+        request_deserializer=ugrpc_pipe_pb2.CommandParserReq.FromString,
+        response_serializer=ugrpc_pipe_pb2.GenericResp.SerializeToString)
+    server.add_generic_rpc_handlers(
+        (grpc.method_handlers_generic_handler(EVENT_STREAM_SERVICE, {EVENT_STREAM_METHOD: handler}),))
+
 
 class UGrpcPipeImpl(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
     """Enhanced gRPC service implementation with better error handling"""
+
+    def __init__(self):
+        # represent the editor state changes streamed to the clients, published by the handlers
+        self.events = EventBroadcaster()
+        # represent the content-addressed buffers referenced by the commands
+        self.blobs = BlobStore()
+
+    def SubscribeEvents(self, request, context):
+        yield from self.events.stream(request, context)
     
+    @single_flight()
     def CommandParser(self, request, context):
         try:
             logger.debug(f"CommandParser called with payload: {request.payload}")
+
+            if (resp := self.blobs.handle_command(request)) is not None:
+                return resp
             
             # Process the request here
             # This is where you would implement your actual command parsing logic
             
-            status = ugrpc_pipe_pb2.Status(code=0, message="OK")
-            return ugrpc_pipe_pb2.GenericResp(status=status, payload={})
+            return build_response()
             
+        except BlobNotFoundError as e:
+            return blob_not_found_response(e)
         except Exception as e:
             logger.error(f"CommandParser error: {e}")
-            status = ugrpc_pipe_pb2.Status(code=1, message=str(e))
-            return ugrpc_pipe_pb2.GenericResp(status=status, payload={})
+            return build_response(code=1, message=str(e))
+
+    def RouteImageBytes(self, request, context):
+        try:
+            buffers = resolve_image_buffers(request, context)
+            logger.debug(f"RouteImageBytes called with images: { {name: len(data) for name, data in buffers.items()} }")
+
+            return build_response()
+
+        except Exception as e:
+            logger.error(f"RouteImageBytes error: {e}")
+            return build_response(code=1, message=str(e))
 
 
 class AsyncUGrpcPipeImpl(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
     """Async version of gRPC service implementation"""
+
+    def __init__(self):
+        self.events = EventBroadcaster()
+        self.blobs = BlobStore()
+
+    async def SubscribeEvents(self, request, context):
+        async for message in self.events.stream_async(request, context):
+            yield message
     
+    @single_flight()
     async def CommandParser(self, request, context):
         try:
             logger.debug(f"Async CommandParser called with payload: {request.payload}")
+
+            if (resp := self.blobs.handle_command(request)) is not None:
+                return resp
             
             # Process the request asynchronously
             # Add your async command parsing logic here
             
-            status = ugrpc_pipe_pb2.Status(code=0, message="OK")
-            return ugrpc_pipe_pb2.GenericResp(status=status, payload={})
+            return build_response()
             
+        except BlobNotFoundError as e:
+            return blob_not_found_response(e)
         except Exception as e:
             logger.error(f"Async CommandParser error: {e}")
-            status = ugrpc_pipe_pb2.Status(code=1, message=str(e))
-            return ugrpc_pipe_pb2.GenericResp(status=status, payload={})
+            return build_response(code=1, message=str(e))
+
+    async def RouteImageBytes(self, request, context):
+        try:
+            buffers = resolve_image_buffers(request, context)
+            logger.debug(f"Async RouteImageBytes called with images: { {name: len(data) for name, data in buffers.items()} }")
+
+            return build_response()
+
+        except Exception as e:
+            logger.error(f"Async RouteImageBytes error: {e}")
+            return build_response(code=1, message=str(e))
+
+
+# keepalive tuning shared by the sync and async servers
+SERVER_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.keepalive_permit_without_calls', True),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.http2.min_time_between_pings_ms', 10000),
+    ('grpc.http2.min_ping_interval_without_data_ms', 300000)
+]
+
+
+@dataclass
+class GrpcServerConfig:
+    """Represent the tuning of a single server process"""
+    port: Optional[int] = 50061
+    # path of the unix domain socket served next to (or instead of, with port=None) the TCP port
+    unix_socket: Optional[str] = None
+    max_workers: int = 10
+    use_async: bool = False
+    # bind the port with SO_REUSEPORT, required when several processes share the port
+    reuse_port: bool = False
+    # maximum number of handlers executing at once, defaults to max_workers
+    max_concurrent_rpcs: Optional[int] = None
+    # maximum number of admitted requests waiting for a free handler slot.
+    # Requests beyond the queue are rejected with RESOURCE_EXHAUSTED. None: unbounded
+    max_queue_size: Optional[int] = None
+    # payload codecs offered to the clients: True (all available), False, 'zstd,gzip' or a list
+    compression: Any = True
+    # minimum payload size (bytes) to compress, clients may request another threshold
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
+    # maximum message size (bytes), matches the client's GrpcChannelConfig.max_msg_length
+    max_msg_length: int = 100 * 1024 * 1024
+    # answer the clients probing the same-host shared memory support
+    shared_memory: bool = True
+
+    @property
+    def addresses(self) -> List[str]:
+        """Represent the listening addresses in the grpc format, e.g., [::]:50061 or unix:/tmp/unity.sock"""
+        addresses = []
+        if self.port is not None:
+            addresses.append(f'[::]:{self.port}')
+        if self.unix_socket is not None:
+            addresses.append(self.unix_socket if self.unix_socket.startswith('unix:')
+                             else f'unix:{os.path.abspath(self.unix_socket)}')
+        return addresses
+
+    @property
+    def codecs(self) -> List[str]:
+        return parse_codecs(self.compression)
+
+    @property
+    def concurrency(self) -> int:
+        return self.max_concurrent_rpcs or self.max_workers
+
+    @property
+    def options(self) -> List[Tuple[str, Any]]:
+        return SERVER_OPTIONS + [('grpc.so_reuseport', 1 if self.reuse_port else 0),
+                                 ('grpc.max_receive_message_length', self.max_msg_length),
+                                 ('grpc.max_send_message_length', self.max_msg_length)]
+
+
+class AdmissionThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """Thread pool keeping track of the executing / queued handlers and their latency"""
+
+    # smoothing factor of the handler latency moving average
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, max_workers: int, **kwargs):
+        super().__init__(max_workers=max_workers, **kwargs)
+        self.concurrency = max_workers
+        self.active = 0
+        self.queued = 0
+        self.latency_ms = 0.0
+        self._counter_lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self.active + self.queued
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._counter_lock:
+            self.queued += 1
+
+        def run():
+            with self._counter_lock:
+                self.queued -= 1
+                self.active += 1
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._counter_lock:
+                    self.active -= 1
+                    self.latency_ms += (elapsed_ms - self.latency_ms) * self.LATENCY_SMOOTHING
+
+        try:
+            return super().submit(run)
+        except BaseException:
+            with self._counter_lock:
+                self.queued -= 1
+            raise
+
+    def retry_after_ms(self, min_ms: int = 10, max_ms: int = 5000) -> int:
+        """Estimate how long a rejected client should wait until the queue drained"""
+        estimate = self.latency_ms * (self.queued + 1) / self.concurrency
+        return int(min(max(estimate, min_ms), max_ms))
+
+
+class AdmissionControlInterceptor(grpc.ServerInterceptor):
+    """Reject requests with RESOURCE_EXHAUSTED once the executing handlers and the queue are full.
+
+    The decision runs on the server's polling thread before the request enters the
+    thread pool. Rejections are executed on a dedicated small pool, so they stay fast
+    even when every worker is busy.
+    """
+
+    def __init__(self, executor: AdmissionThreadPoolExecutor, max_queue_size: int):
+        self._executor = executor
+        self._max_in_flight = executor.concurrency + max_queue_size
+        self._rejection_pool = futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='grpc-admission')
+        self.rejected: int = 0
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or self._executor.in_flight < self._max_in_flight:
+            return handler
+
+        self.rejected += 1
+        message = f"Server overloaded: {RETRY_AFTER_HINT}={self._executor.retry_after_ms()}"
+
+        def reject(request_or_iterator, context):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, message)
+
+        # picked up by grpc instead of the default thread pool
+        reject.experimental_thread_pool = self._rejection_pool
+
+        behavior_name = {(False, False): 'unary_unary', (False, True): 'unary_stream',
+                         (True, False): 'stream_unary', (True, True): 'stream_stream'}[
+            (handler.request_streaming, handler.response_streaming)]
+
+        return handler._replace(**{behavior_name: reject})
+
+
+class _PayloadCompression:
+    """Compress large GenericResp payloads for the clients advertising a supported codec"""
+
+    def __init__(self, codecs: List[str], threshold: int):
+        self._codecs = codecs
+        self._threshold = threshold
+
+    def _negotiate(self, handler_call_details) -> Tuple[Optional[str], int]:
+        metadata = dict(handler_call_details.invocation_metadata or ())
+        if (accepted := metadata.get(ACCEPT_ENCODING_METADATA)) is None:
+            return None, self._threshold
+        try:
+            threshold = int(metadata.get(COMPRESSION_THRESHOLD_METADATA, self._threshold))
+        except ValueError:
+            threshold = self._threshold
+        return negotiate_codec(parse_codecs(accepted), self._codecs), threshold
+
+    @staticmethod
+    def _compress(resp, codec: str, threshold: int):
+        payload = getattr(resp, 'payload', None)
+        if (not isinstance(payload, any_pb2.Any) or len(payload.value) < threshold
+                or is_compressed_type_url(payload.type_url)):
+            return resp
+
+        type_url, value = compress_payload(payload.type_url, payload.value, codec)
+        # build a new response, the original may be shared (i.e., coalesced requests)
+        return type(resp)(status=resp.status, payload=any_pb2.Any(type_url=type_url, value=value))
+
+    def wrap_handler(self, handler, handler_call_details):
+        if handler is None or handler.request_streaming or handler.response_streaming:
+            return handler
+
+        codec, threshold = self._negotiate(handler_call_details)
+        if codec is None:
+            return handler
+
+        behavior = handler.unary_unary
+        if asyncio.iscoroutinefunction(behavior):
+            async def compressed_behavior(request, context):
+                return self._compress(await behavior(request, context), codec, threshold)
+        else:
+            def compressed_behavior(request, context):
+                return self._compress(behavior(request, context), codec, threshold)
+
+        return handler._replace(unary_unary=compressed_behavior)
+
+
+class PayloadCompressionInterceptor(grpc.ServerInterceptor):
+    def __init__(self, codecs: List[str], threshold: int):
+        self._compression = _PayloadCompression(codecs, threshold)
+
+    def intercept_service(self, continuation, handler_call_details):
+        return self._compression.wrap_handler(continuation(handler_call_details), handler_call_details)
+
+
+class AsyncPayloadCompressionInterceptor(aio.ServerInterceptor):
+    def __init__(self, codecs: List[str], threshold: int):
+        self._compression = _PayloadCompression(codecs, threshold)
+
+    async def intercept_service(self, continuation, handler_call_details):
+        return self._compression.wrap_handler(await continuation(handler_call_details), handler_call_details)
+
+
+def answer_shared_memory_probe(value: str) -> ugrpc_pipe_pb2.GenericResp:
+    """Echo the token of a client's probe, read from its shared memory ring"""
+    try:
+        token = read_shared_memory(SharedMemoryHandle.decode(value))
+    except (OSError, ValueError) as e:
+        # i.e., the server runs in another container: the ring does not exist here
+        return build_response(code=1, message=f"The shared memory is not accessible: {e}")
+    return build_response(message=bytes(token).decode('utf-8'))
+
+
+def _wrap_shared_memory_probe(handler, handler_call_details):
+    """Answer the shared memory probes instead of the servicer, the other calls are unchanged"""
+    if handler is None or handler.request_streaming or handler.response_streaming:
+        return handler
+    metadata = dict(handler_call_details.invocation_metadata or ())
+    if (value := metadata.get(SHARED_MEMORY_PROBE_METADATA)) is None:
+        return handler
+    return handler._replace(unary_unary=lambda request, context: answer_shared_memory_probe(value))
+
+
+class SharedMemoryProbeInterceptor(grpc.ServerInterceptor):
+    """Advertise the same-host shared memory support to the clients probing it"""
+
+    def intercept_service(self, continuation, handler_call_details):
+        return _wrap_shared_memory_probe(continuation(handler_call_details), handler_call_details)
+
+
+class AsyncSharedMemoryProbeInterceptor(aio.ServerInterceptor):
+    async def intercept_service(self, continuation, handler_call_details):
+        return _wrap_shared_memory_probe(await continuation(handler_call_details), handler_call_details)
 
 
 def run_grpc_server(
     service_impl: Type = UGrpcPipeImpl, 
-    port: int = 50061, 
+    port: Optional[int] = 50061, 
     max_workers: int = 10,
-    use_async: bool = False
+    use_async: bool = False,
+    processes: int = 1,
+    max_concurrent_rpcs: Optional[int] = None,
+    max_queue_size: Optional[int] = None,
+    compression: Any = True,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    unix_socket: Optional[str] = None,
+    shared_memory: bool = True
 ) -> None:
     """
     Run gRPC server with enhanced configuration and proper shutdown handling
     
     Args:
         service_impl: Service implementation class
-        port: Port to listen on
-        max_workers: Maximum number of worker threads
+        port: Port to listen on, None to only listen on the unix domain socket
+        max_workers: Maximum number of worker threads (per process). In async mode
+            it sizes the pool running synchronous handlers.
         use_async: Whether to use async server (experimental)
+        processes: Number of server processes sharing the port through SO_REUSEPORT.
+            Use it to scale CPU-bound handlers beyond the GIL (Linux only).
+        max_concurrent_rpcs: Maximum number of handlers executing at once (per process).
+            Defaults to max_workers.
+        max_queue_size: Maximum number of requests waiting for a handler slot (per process).
+            Overflowing requests are rejected with RESOURCE_EXHAUSTED and a retry-after
+            hint. Defaults to None (unbounded queue).
+        compression: Payload codecs offered to the clients advertising compression support
+            (True: all available codecs, False: disabled, 'zstd,gzip' or a list).
+        compression_threshold: Minimum payload size in bytes to compress.
+        unix_socket: Path (or unix:///<path> endpoint) of a unix domain socket to listen on.
+            Same-host clients connecting through it avoid the TCP loopback overhead.
+        shared_memory: Whether to advertise the same-host shared memory transport to the
+            clients probing it. The handlers resolve the offloaded buffers with
+            resolve_image_buffers / resolve_command_parameters.
     """
     
     if not issubclass(service_impl, ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
         raise TypeError(
             f"service_impl must be a subclass of {ugrpc_pipe_pb2_grpc.UGrpcPipeServicer}")
 
-    if use_async:
-        return _run_async_server(service_impl, port)
+    if max_workers < 1 or processes < 1 or (max_concurrent_rpcs is not None and max_concurrent_rpcs < 1):
+        raise ValueError(
+            f"max_workers, processes and max_concurrent_rpcs should be positive numbers: "
+            f"{max_workers}, {processes}, {max_concurrent_rpcs}")
+
+    if max_queue_size is not None and max_queue_size < 0:
+        raise ValueError(f"max_queue_size should not be negative: {max_queue_size}")
+
+    if port is None and unix_socket is None:
+        raise ValueError("Either port or unix_socket should be specified")
+
+    if unix_socket is not None and processes > 1:
+        # every process would rebind (and take over) the socket path, only ports can be shared
+        raise ValueError("unix_socket is not supported by the multi-process server")
+
+    cfg = GrpcServerConfig(port=port,
+                           unix_socket=unix_socket,
+                           max_workers=max_workers,
+                           use_async=use_async,
+                           max_concurrent_rpcs=max_concurrent_rpcs,
+                           max_queue_size=max_queue_size,
+                           compression=compression,
+                           compression_threshold=compression_threshold,
+                           shared_memory=shared_memory)
+
+    if processes > 1:
+        return _run_multiprocess_server(service_impl, cfg, processes)
+
+    return _run_server_process(service_impl, cfg)
+
+
+def _run_server_process(service_impl: Type, cfg: GrpcServerConfig) -> None:
+    """Run a single server in the current process (entry point of the worker processes)"""
+    if cfg.use_async:
+        return asyncio.run(_run_async_server(service_impl, cfg))
     else:
-        return _run_sync_server(service_impl, port, max_workers)
+        return _run_sync_server(service_impl, cfg)
+
+
+def _run_multiprocess_server(service_impl: Type, cfg: GrpcServerConfig, processes: int) -> None:
+    """Run several server processes bound to the same port, the kernel balances the connections"""
+
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise RuntimeError(
+            f"Multi-process server requires SO_REUSEPORT which is not supported on {sys.platform}")
+
+    cfg = replace(cfg, reuse_port=True)
+
+    # spawn fresh interpreters, grpc does not support forking after its threads started
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_run_server_process,
+                               args=(service_impl, cfg),
+                               name=f"grpc-server-{index}",
+                               daemon=True)
+               for index in range(processes)]
+
+    for worker in workers:
+        worker.start()
+
+    logger.info(f"gRPC server started on port {cfg.port} with {processes} processes")
 
+    def stop_workers(*_):
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
 
-def _run_sync_server(service_impl: Type, port: int, max_workers: int) -> None:
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, stop_workers)
+        signal.signal(signal.SIGTERM, stop_workers)
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        logger.info("Server interrupted by user")
+        stop_workers()
+    finally:
+        for worker in workers:
+            worker.join(timeout=5.0)
+
+
+def _run_sync_server(service_impl: Type, cfg: GrpcServerConfig) -> None:
     """Run synchronous gRPC server with proper shutdown handling"""
     
+    interceptors = []
+
     # Create server with optimized thread pool
+    if cfg.max_queue_size is not None:
+        executor = AdmissionThreadPoolExecutor(max_workers=cfg.concurrency)
+        interceptors.append(AdmissionControlInterceptor(executor, cfg.max_queue_size))
+    else:
+        executor = futures.ThreadPoolExecutor(max_workers=cfg.concurrency)
+
+    if cfg.codecs:
+        interceptors.append(PayloadCompressionInterceptor(cfg.codecs, cfg.compression_threshold))
+    if cfg.shared_memory:
+        interceptors.append(SharedMemoryProbeInterceptor())
+
     server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=max_workers),
-        options=[
-            ('grpc.keepalive_time_ms', 30000),
-            ('grpc.keepalive_timeout_ms', 5000),
-            ('grpc.keepalive_permit_without_calls', True),
-            ('grpc.http2.max_pings_without_data', 0),
-            ('grpc.http2.min_time_between_pings_ms', 10000),
-            ('grpc.http2.min_ping_interval_without_data_ms', 300000)
-        ]
+        executor,
+        interceptors=interceptors,
+        options=cfg.options
     )
     
     # Add service to server
-    ugrpc_pipe_pb2_grpc.add_UGrpcPipeServicer_to_server(
-        service_impl(), server)
+    servicer = service_impl()
+    ugrpc_pipe_pb2_grpc.add_UGrpcPipeServicer_to_server(servicer, server)
+    add_event_stream_to_server(servicer, server)
     
     # Add port and start server
-    server.add_insecure_port(f'[::]:{port}')
+    for address in cfg.addresses:
+        server.add_insecure_port(address)
     server.start()
     
-    logger.info(f"gRPC server started on port {port} with {max_workers} workers")
+    logger.info(f"gRPC server started on {', '.join(cfg.addresses)} with {cfg.concurrency} workers")
     
     def signal_handler(signum, frame):
         logger.info("Received shutdown signal, stopping server...")
@@ -106,8 +943,10 @@ def _run_sync_server(service_impl: Type, port: int, max_workers: int) -> None:
         sys.exit(0)
     
     # Register signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # (only possible from the main thread, e.g., not when hosted by a test thread)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
     
     try:
         server.wait_for_termination()
@@ -116,27 +955,42 @@ def _run_sync_server(service_impl: Type, port: int, max_workers: int) -> None:
         server.stop(grace=5.0)
 
 
-async def _run_async_server(service_impl: Type, port: int) -> None:
+async def _run_async_server(service_impl: Type, cfg: GrpcServerConfig) -> None:
     """Run asynchronous gRPC server (experimental)"""
     
-    server = aio.server(options=[
-        ('grpc.keepalive_time_ms', 30000),
-        ('grpc.keepalive_timeout_ms', 5000),
-        ('grpc.keepalive_permit_without_calls', True),
-    ])
+    # grpc.aio rejects the overflow natively (without retry-after hint), clients fall back
+    # to exponential backoff
+    maximum_concurrent_rpcs = None
+    if cfg.max_queue_size is not None:
+        maximum_concurrent_rpcs = cfg.concurrency + cfg.max_queue_size
+
+    interceptors = []
+    if cfg.codecs:
+        interceptors.append(AsyncPayloadCompressionInterceptor(cfg.codecs, cfg.compression_threshold))
+    if cfg.shared_memory:
+        interceptors.append(AsyncSharedMemoryProbeInterceptor())
+
+    server = aio.server(
+        # synchronous handlers are executed on this pool instead of blocking the event loop
+        migration_thread_pool=futures.ThreadPoolExecutor(max_workers=cfg.concurrency),
+        maximum_concurrent_rpcs=maximum_concurrent_rpcs,
+        interceptors=interceptors or None,
+        options=cfg.options)
     
-    ugrpc_pipe_pb2_grpc.add_UGrpcPipeServicer_to_server(service_impl(), server)
+    servicer = service_impl()
+    ugrpc_pipe_pb2_grpc.add_UGrpcPipeServicer_to_server(servicer, server)
+    add_event_stream_to_server(servicer, server)
     
-    listen_addr = f'[::]:{port}'
-    server.add_insecure_port(listen_addr)
+    for address in cfg.addresses:
+        server.add_insecure_port(address)
     
-    logger.info(f"Starting async gRPC server on {listen_addr}")
+    logger.info(f"Starting async gRPC server on {', '.join(cfg.addresses)}")
     await server.start()
     
     async def serve():
         try:
             await server.wait_for_termination()
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             logger.info("Server interrupted by user")
         finally:
             await server.stop(grace=5.0)
@@ -145,6 +999,6 @@ async def _run_async_server(service_impl: Type, port: int) -> None:
 
 
 # Convenience function for running async server
-def run_async_grpc_server(service_impl: Type = AsyncUGrpcPipeImpl, port: int = 50061):
+def run_async_grpc_server(service_impl: Type = AsyncUGrpcPipeImpl, port: int = 50061, **kwargs):
     """Run async gRPC server using asyncio.run()"""
-    asyncio.run(_run_async_server(service_impl, port))
+    run_grpc_server(service_impl=service_impl, port=port, use_async=True, **kwargs)
@@ -4,11 +4,33 @@ from .engine_pipe_abstract import EnginePlatform
 GRPC_INTERFACE_METHOD_HEADER = 'method'
 GRPC_INTERFACE_PROPERTY_HEADER = 'property'
 
+# key of the back-off hint (milliseconds) carried by RESOURCE_EXHAUSTED status messages
+RETRY_AFTER_HINT = 'retry-after-ms'
+
+# metadata key of the sequence number of a streamed frame (see unity.frame_pipeline), the frames
+# in flight at once can arrive out of order
+FRAME_SEQUENCE_METADATA = 'frame-sequence'
+
+# server-streaming route next to CommandParser, reusing its messages: the CommandParserReq
+# payload lists the subscribed events, each GenericResp carries one event (see EngineEventType)
+EVENT_STREAM_SERVICE = 'ugrpc_pipe.UGrpcPipe'
+EVENT_STREAM_METHOD = 'SubscribeEvents'
+EVENT_STREAM_ROUTE = f'/{EVENT_STREAM_SERVICE}/{EVENT_STREAM_METHOD}'
+
+
+class EngineEventType(Enum):
+    """Represent the editor state changes pushed through the event stream"""
+    asset_imported = auto()
+    scene_saved = auto()
+    compile_finished = auto()
+    play_mode_changed = auto()
+
 
 class GRPCInterface(Enum):
 
     # unity runtime method
     method_runtime_fetch_scene_hierarchy = auto()
+    method_runtime_fetch_scene_hierarchy_delta = auto()
     # declare method interface
     method_system_quit_without_saving = auto()
     method_system_get_service_status = auto()
@@ -23,6 +45,8 @@ class GRPCInterface(Enum):
     method_editor_assetdatabase_find_assets = auto()
     method_editor_assetdatabase_get_dependencies = auto()
     method_editor_assetdatabase_import_assets = auto()
+    method_editor_assetdatabase_start_asset_editing = auto()
+    method_editor_assetdatabase_stop_asset_editing = auto()
 
     method_editor_gameobjectutils_exists = auto()
 
@@ -71,6 +95,10 @@ class GRPCInterface(Enum):
     # material utilities
     method_material_update_textures = auto()
 
+    # content-addressed blob store (see utils.blob_cache)
+    method_blob_find_missing = auto()
+    method_blob_upload = auto()
+
     method_unittest_get_float_array_data = auto()
 
 
@@ -81,6 +109,10 @@ INTERFACE_MAPPINGS = {
         EnginePlatform.unity: "UGrpc.AppSceneUtils.FetchSceneHierarchy",
         EnginePlatform.unity_editor: "UGrpc.AppSceneUtils.FetchSceneHierarchy"
     },
+    GRPCInterface.method_runtime_fetch_scene_hierarchy_delta: {
+        EnginePlatform.unity: "UGrpc.AppSceneUtils.FetchSceneHierarchyDelta",
+        EnginePlatform.unity_editor: "UGrpc.AppSceneUtils.FetchSceneHierarchyDelta"
+    },
 
     # ================================== unity editor method
     GRPCInterface.method_system_quit_without_saving: {
@@ -118,6 +150,12 @@ INTERFACE_MAPPINGS = {
     GRPCInterface.method_editor_assetdatabase_import_assets: {
         EnginePlatform.unity_editor: "UnityEditor.AssetDatabase.ImportAsset"
     },
+    GRPCInterface.method_editor_assetdatabase_start_asset_editing: {
+        EnginePlatform.unity_editor: "UnityEditor.AssetDatabase.StartAssetEditing"
+    },
+    GRPCInterface.method_editor_assetdatabase_stop_asset_editing: {
+        EnginePlatform.unity_editor: "UnityEditor.AssetDatabase.StopAssetEditing"
+    },
     GRPCInterface.method_editor_gameobjectutils_exists: {
         EnginePlatform.unity_editor: "UGrpc.GameObjectUtils.AssetExists"
     },
@@ -167,8 +205,59 @@ INTERFACE_MAPPINGS = {
         EnginePlatform.unity_editor: "UGrpc.MaterialUtils.UpdateTextures"
     },
 
+    # Blob store
+    GRPCInterface.method_blob_find_missing: {
+        EnginePlatform.unity: "UGrpc.BlobStore.FindMissing",
+        EnginePlatform.unity_editor: "UGrpc.BlobStore.FindMissing"
+    },
+    GRPCInterface.method_blob_upload: {
+        EnginePlatform.unity: "UGrpc.BlobStore.Upload",
+        EnginePlatform.unity_editor: "UGrpc.BlobStore.Upload"
+    },
+
     # UnitTest utilities
     GRPCInterface.method_unittest_get_float_array_data: {
         EnginePlatform.unity_editor: "UGrpc.UnitTestUtils.GetFloatArrayData"
     }
 }
+
+# Represent the commands without side effects on the engine. Identical concurrent
+# calls of these commands can share one execution (see engine_pipe_server.single_flight)
+READ_ONLY_INTERFACES = frozenset([
+    GRPCInterface.method_runtime_fetch_scene_hierarchy,
+    GRPCInterface.method_runtime_fetch_scene_hierarchy_delta,
+    GRPCInterface.method_system_get_service_status,
+    GRPCInterface.method_system_get_projectinfo,
+    GRPCInterface.method_editor_assetdatabase_guid_to_path,
+    GRPCInterface.method_editor_assetdatabase_find_assets,
+    GRPCInterface.method_editor_assetdatabase_get_dependencies,
+    GRPCInterface.method_editor_gameobjectutils_exists,
+    GRPCInterface.method_unittest_get_float_array_data,
+    GRPCInterface.method_blob_find_missing,
+])
+
+# Represent the asset mutations deferred by UnityEditorImpl.asset_editing_batch, the engine
+# imports their results once when the batch ends instead of after every single command
+ASSET_EDITING_INTERFACES = frozenset([
+    GRPCInterface.method_editor_assetdatabase_move_asset,
+    GRPCInterface.method_editor_assetdatabase_copy_asset,
+    GRPCInterface.method_editor_assetdatabase_import_assets,
+    GRPCInterface.method_object_create,
+    GRPCInterface.method_object_merge,
+    GRPCInterface.method_object_add_component,
+    GRPCInterface.method_object_change_activate,
+    GRPCInterface.method_object_set_value,
+    GRPCInterface.method_object_set_reference_value,
+    GRPCInterface.method_object_create_mesh_collider_object,
+    GRPCInterface.method_object_create_variant,
+    GRPCInterface.method_object_set_active,
+    GRPCInterface.method_object_trim,
+])
+
+# Represent the commands moving large payloads (textures, hierarchies, uploads). They are
+# routed to the dedicated bulk connections if configured (see engine_pipe_channel.is_bulk_call)
+BULK_INTERFACES = frozenset([
+    GRPCInterface.method_runtime_fetch_scene_hierarchy,
+    GRPCInterface.method_material_update_textures,
+    GRPCInterface.method_blob_upload,
+])
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List
+
+from compipe.utils.logging import logger
+
+
+@dataclass
+class AssetDependencyGraph:
+    """Represent the shared dependency DAG of a set of root assets.
+
+    `edges` maps every visited asset path to its direct dependencies. Nodes are
+    shared across roots, so overlapping dependency trees are only stored once.
+    """
+    roots: List[str] = field(default_factory=list)
+    edges: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self.edges.keys())
+
+    def dependencies(self, path: str, recursive: bool = False) -> List[str]:
+        """Retrieve the dependencies of the specified asset from the graph.
+
+        Args:
+            path (str): Represent the asset path
+            recursive (bool, optional): Represent the flag of collecting the transitive dependencies. Defaults to False.
+
+        Returns:
+            List[str]: Represent the dependency paths (excluding the asset itself)
+        """
+        if not recursive:
+            return list(self.edges.get(path, []))
+
+        visited = {path}
+        results = []
+        queue = deque(self.edges.get(path, []))
+        while queue:
+            node = queue.popleft()
+            if node in visited:
+                continue
+            visited.add(node)
+            results.append(node)
+            queue.extend(self.edges.get(node, []))
+        return results
+
+    def topological_order(self) -> List[str]:
+        """Sort the nodes so that every asset comes after all of its dependencies.
+
+        Nodes involved in a dependency cycle cannot be ordered; they are appended
+        at the end in discovery order and reported through the logger.
+
+        Returns:
+            List[str]: Represent the sorted asset paths
+        """
+        # count the unresolved dependencies of every node (Kahn's algorithm)
+        pending = {node: len(set(deps)) for node, deps in self.edges.items()}
+        dependents: Dict[str, List[str]] = {node: [] for node in self.edges}
+        for node, deps in self.edges.items():
+            for dep in set(deps):
+                dependents.setdefault(dep, []).append(node)
+                pending.setdefault(dep, 0)
+
+        queue = deque(node for node, count in pending.items() if count == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for dependent in dependents.get(node, []):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(order) != len(pending):
+            ordered = set(order)
+            cyclic = [node for node in pending if node not in ordered]
+            logger.warning(f"Found cyclic asset dependencies: {cyclic}")
+            order.extend(cyclic)
+
+        return order
+
+
+def build_dependency_graph(roots: Iterable[str],
+                           fetch_direct_dependencies: Callable[[List[str]], Dict[str, List[str]]],
+                           cache: Dict[str, List[str]] = None,
+                           batch_size: int = 64) -> AssetDependencyGraph:
+    """Expand the roots breadth-first and assemble their shared dependency graph.
+
+    Args:
+        roots (Iterable[str]): Represent the root asset paths
+        fetch_direct_dependencies (Callable): Represent the callback resolving the direct
+            dependencies of a batch of assets, i.e., {path: [dependency, ...]}
+        cache (Dict[str, List[str]], optional): Represent the memoized direct dependencies.
+            Newly fetched nodes are written back. Defaults to None.
+        batch_size (int, optional): Represent the maximum number of assets per fetch. Defaults to 64.
+
+    Returns:
+        AssetDependencyGraph: Represent the resolved graph
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size should be a positive number: {batch_size}")
+
+    cache = {} if cache is None else cache
+    graph = AssetDependencyGraph(roots=list(dict.fromkeys(roots)))
+
+    frontier = list(graph.roots)
+    while frontier:
+        # only ask the engine about the nodes which were never resolved in this session
+        missing = [path for path in frontier if path not in cache]
+        for index in range(0, len(missing), batch_size):
+            cache.update(fetch_direct_dependencies(missing[index:index + batch_size]))
+
+        next_frontier = []
+        for path in frontier:
+            deps = [dep for dep in cache.get(path, []) if dep != path]
+            graph.edges[path] = deps
+            next_frontier.extend(deps)
+
+        frontier = [path for path in dict.fromkeys(next_frontier) if path not in graph.edges]
+
+    return graph
@@ -1,33 +1,232 @@
+from __future__ import annotations
 import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from ..engine_pipe_impl import SimulationEngineImpl
 from ..engine_pipe_abstract import EnginePlatform
-from typing import List
-from ..engine_stub_interface import GRPCInterface
-from ugrpc_pipe import ProjectInfoResp, GenericResp, RenderBytesReply
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from ..engine_stub_interface import ASSET_EDITING_INTERFACES, GRPCInterface
+from ugrpc_pipe import CommandParserReq, GenericResp, RenderBytesReply
 import os
 import re
 from re import Pattern
 import grpclib
 from ..engine_pipe_decorator import grpc_call_general
+from .asset_dependency_graph import AssetDependencyGraph, build_dependency_graph
+from .frame_pipeline import FramePipeline
+from .scene_hierarchy import SceneHierarchyMirror
+from ..engine_pipe_channel import is_endpoint_listening, parse_unix_socket_path, resolve_channel_address
+from ..utils.shared_memory import LOCAL_HOSTS, offload_fields, release_fields
+from ..utils.sys_process import find_listening_pid, kill_process_tree, wait_process_exit
+from compipe.utils.logging import logger
+
+
+# image fields of RenderBytesReply
+IMAGE_BYTES_FIELDS = ['main_image_data', 'stereo_left_image_data', 'stereo_right_image_data']
 
 
 class UnityEngineImpl(SimulationEngineImpl):
+    def __init__(self, channel: str = None):
+        super().__init__(channel=channel)
+        # represent the local copy of the scene hierarchy, kept up to date by sync_scene_hierarchy
+        self._scene_hierarchy: Optional[SceneHierarchyMirror] = None
+
     @property
     def engine_platform(self) -> str:
         return EnginePlatform.unity.name
 
+    def fetch_scene_hierarchy_delta(self, since_version: Optional[int] = None, epoch: Optional[str] = None) -> dict:
+        """Retrieve the hierarchy changes since the specified version (see scene_hierarchy.VersionedSceneHierarchy).
+
+        Args:
+            since_version (Optional[int], optional): Represent the version of the client copy. Defaults to None (full hierarchy).
+            epoch (Optional[str], optional): Represent the epoch of the client copy. Defaults to None.
+
+        Returns:
+            dict: Represent the delta payload, the full hierarchy if the version is unknown to the engine
+        """
+        return self.command_parser(cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy_delta,
+                                   params=[-1 if since_version is None else since_version, epoch or '']).payload
+
+    def sync_scene_hierarchy(self, is_reload: bool = False) -> SceneHierarchyMirror:
+        """Bring the local copy of the scene hierarchy up to date, transferring only the changed nodes.
+
+        Args:
+            is_reload (bool, optional): Represent the flag of retrieving the full hierarchy. Defaults to False.
+
+        Returns:
+            SceneHierarchyMirror: Represent the local copy, the same instance until reloaded
+        """
+        if is_reload or self._scene_hierarchy is None:
+            self._scene_hierarchy = SceneHierarchyMirror()
+
+        mirror = self._scene_hierarchy
+        mirror.apply(self.fetch_scene_hierarchy_delta(since_version=mirror.version, epoch=mirror.epoch))
+        return mirror
+
     @grpc_call_general()
     def RouteImageBytes(self, render_bytes_reply: RenderBytesReply, timeout: float = None) -> GenericResp:
-        resp = self.event_loop.run_until_complete(
-            self.stub.route_image_bytes(render_bytes_reply, timeout=timeout))
+        metadata = None
+        images = {field: getattr(render_bytes_reply, field) for field in IMAGE_BYTES_FIELDS}
+
+        # pass large images through the shared memory when the engine runs on the same host
+        ring = self.shared_memory_ring
+        if ring is not None:
+            metadata = offload_fields(render_bytes_reply, IMAGE_BYTES_FIELDS, ring,
+                                      threshold=self.grpc_cfg.shared_memory_threshold) or None
+        self.call_profile.mark('serialize')
+
+        try:
+            resp = self.event_loop.run_until_complete(
+                self.stub.route_image_bytes(render_bytes_reply, timeout=timeout, metadata=metadata))
+            self.call_profile.mark('rpc')
+        finally:
+            # the engine read the images, the ring can overwrite them
+            if ring is not None:
+                release_fields(ring, metadata)
+            # hand the message back to the caller unchanged
+            for field, data in images.items():
+                setattr(render_bytes_reply, field, data)
 
         return resp
 
+    def frame_pipeline(self, encode: Optional[Callable[[Any], Any]] = None,
+                       max_in_flight: int = 2, **kwargs) -> FramePipeline:
+        """Stream frames through RouteImageBytes with the encoding and the sends overlapping the capture.
+
+        Args:
+            encode (Callable[[Any], Any], optional): Represent the encoder of a captured frame, returning a
+                RenderBytesReply, a dict of its fields or the image bytes. Defaults to None (frames are encoded).
+            max_in_flight (int, optional): Represent the number of frames encoded or sent at once. Defaults to 2.
+            kwargs: Represent the queue, executor and callback settings of FramePipeline
+
+        Returns:
+            FramePipeline: Represent the started pipeline, close it (or use it as context manager) when done
+        """
+        return FramePipeline(engine=self, encode=encode, max_in_flight=max_in_flight, **kwargs).start()
+
 
 class UnityEditorImpl(SimulationEngineImpl):
 
     asset_root_folder_name: str = "Assets"
 
+    def __init__(self, channel: str = None, pid: int = None):
+        super().__init__(channel=channel)
+        # represent the editor process, i.e., launched by the caller or the editor process pool
+        self.pid = pid
+        # represent the asset mutations deferred by the active asset editing batch
+        self._asset_editing_queue: Optional[List[Tuple[GRPCInterface, List, dict, Future]]] = None
+        # represent the memoized direct dependencies of the visited assets, see get_dependency_graph
+        self._dependency_cache: Dict[str, List[str]] = {}
+
+    def command_parser(self, cmd: GRPCInterface, params: List = [], **kwargs) -> Union[GenericResp, Future]:
+        """Execute the command, or defer it while an asset editing batch is active.
+
+        Within `asset_editing_batch`, the asset mutations (ASSET_EDITING_INTERFACES) return a
+        Future instead of the response, resolved with it when the batch is sent. Any other
+        command sends the queued mutations first, so it observes their results.
+
+        Returns:
+            Union[GenericResp, Future]: Represent the response, or its Future for a deferred mutation
+        """
+        if self._asset_editing_queue is not None:
+            if cmd in ASSET_EDITING_INTERFACES:
+                future = Future()
+                self._asset_editing_queue.append((cmd, params, kwargs, future))
+                return future
+            self.flush_asset_editing()
+
+        return super().command_parser(cmd=cmd, params=params, **kwargs)
+
+    @contextmanager
+    def asset_editing_batch(self) -> Iterator[UnityEditorImpl]:
+        """Defer the asset mutations and send them between StartAssetEditing / StopAssetEditing.
+
+        The engine imports the changed assets once per batch instead of after every command, and
+        the assets are refreshed once when the batch ends. Nested batches join the outer one. The
+        queued commands are discarded (their futures cancelled) if the block raises.
+
+            with editor.asset_editing_batch():
+                for source, target in moves:
+                    editor.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_move_asset,
+                                          params=[source, target])
+        """
+        if self._asset_editing_queue is not None:
+            yield self
+            return
+
+        self._asset_editing_queue = []
+        try:
+            yield self
+        except BaseException:
+            for *_, future in self._asset_editing_queue:
+                future.cancel()
+            raise
+        else:
+            self.flush_asset_editing()
+            self.refresh_asset_database()
+        finally:
+            self._asset_editing_queue = None
+
+    def flush_asset_editing(self):
+        """Send the queued asset mutations of the active batch in order and resolve their futures"""
+        if not self._asset_editing_queue:
+            return
+        queue, self._asset_editing_queue[:] = list(self._asset_editing_queue), []
+        resps = []
+        try:
+            requests = []
+            for cmd, params, kwargs, _ in queue:
+                req = self.build_command_parser_req(cmd=cmd, params=params)
+                if kwargs.get('verbose'):
+                    logger.debug(f"Command command: {cmd}")
+                    logger.debug(f"Command payload: {req.payload}")
+                requests.append((cmd, params, req, kwargs))
+            self._send_asset_editing(requests=requests, resps=resps)
+        except Exception as e:
+            # the commands sent before the failure were applied
+            for *_, future in queue[len(resps):]:
+                future.set_exception(e)
+            raise
+        finally:
+            # settle every sent command, even if another response can not be parsed
+            for (_, _, kwargs, future), resp in zip(queue, resps):
+                try:
+                    future.set_result(self.parse_command_parser_resp(
+                        resp=resp, return_type=kwargs.get('return_type'), lazy=kwargs.get('lazy', False)))
+                except Exception as e:
+                    future.set_exception(e)
+
+    # the mutations are not idempotent, a rejected batch is not sent again
+    @grpc_call_general(max_retries=0)
+    def _send_asset_editing(self, requests: List[Tuple[GRPCInterface, List, CommandParserReq, dict]],
+                            resps: List[GenericResp]):
+        start_cmd = GRPCInterface.method_editor_assetdatabase_start_asset_editing
+        stop_cmd = GRPCInterface.method_editor_assetdatabase_stop_asset_editing
+        start, stop = self.build_command_parser_req(cmd=start_cmd), self.build_command_parser_req(cmd=stop_cmd)
+        metadata = self.compression_metadata()
+
+        async def _send(cmd: GRPCInterface, req: CommandParserReq, params: List = None, **kwargs) -> GenericResp:
+            with self.lease_stub(cmd=cmd, params=params) as stub:
+                return await stub.command_parser(req, **kwargs)
+
+        async def _send_in_order():
+            resps.clear()
+            # the commands depend on each other (i.e., import after move), send them one after the other
+            resp = await _send(start_cmd, start, metadata=metadata)
+            if resp.status.code != 0:
+                raise RuntimeError(f"The engine did not enter the asset editing mode: {resp.status.message}")
+            try:
+                for cmd, params, req, kwargs in requests:
+                    resps.append(await _send(cmd, req, params, timeout=kwargs.get('timeout'),
+                                             metadata=self.compression_metadata(kwargs.get('compression'))))
+            finally:
+                # always leave the asset editing mode, the editor stops importing assets otherwise
+                await _send(stop_cmd, stop, metadata=metadata)
+
+        self.event_loop.run_until_complete(_send_in_order())
+        self.call_profile.mark('rpc')
+
     @property
     def engine_platform(self) -> str:
 
@@ -66,9 +265,44 @@ class UnityEditorImpl(SimulationEngineImpl):
 
         return self.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_get_dependencies, params=[path, recursive]).payload
 
-    def get_project_info(self) -> ProjectInfoResp:
+    def get_direct_dependencies(self, paths: List[str]) -> Dict[str, List[str]]:
+        """Resolve the direct dependencies of several assets with one concurrent batch of calls.
+
+        Raises:
+            RuntimeError: Raise if the engine failed to resolve any of the assets, none of them is memoized
+        """
+        resps = self.command_parser_batch(cmd=GRPCInterface.method_editor_assetdatabase_get_dependencies,
+                                          params_list=[[path, False] for path in paths])
+
+        if failed := {path: resp.status.message for path, resp in zip(paths, resps) if resp.status.code != 0}:
+            raise RuntimeError(f"The engine failed to resolve the dependencies: {failed}")
+
+        return {path: (resp.payload or []) for path, resp in zip(paths, resps)}
+
+    def get_dependency_graph(self, roots: Iterable[str], batch_size: int = 64, is_reload: bool = False) -> AssetDependencyGraph:
+        """Retrieve the shared dependency graph of many root assets.
+
+        The direct dependencies of every visited asset are memoized on the editor
+        instance, so each asset is only requested once per session.
+
+        Args:
+            roots (Iterable[str]): Represent the root asset paths
+            batch_size (int, optional): Represent the maximum number of concurrent calls per batch. Defaults to 64.
+            is_reload (bool, optional): Represent the flag of dropping the memoized dependencies. Defaults to False.
+
+        Raises:
+            RuntimeError: Raise if the engine failed to resolve the dependencies of a visited asset
+
+        Returns:
+            AssetDependencyGraph: Represent the dependency DAG with topological ordering support
+        """
+        if is_reload:
+            self._dependency_cache.clear()
 
-        return self.command_parser(cmd=GRPCInterface.method_system_get_projectinfo, return_type=ProjectInfoResp)
+        return build_dependency_graph(roots=roots,
+                                      fetch_direct_dependencies=self.get_direct_dependencies,
+                                      cache=self._dependency_cache,
+                                      batch_size=batch_size)
 
     def fetch_full_path(self, path: str) -> str:
         if not path.startswith(self.asset_root_folder_name):
@@ -77,14 +311,67 @@ class UnityEditorImpl(SimulationEngineImpl):
 
         return os.path.join(self.get_project_info().project_root, path)
 
-    def quit_without_saving(self, waiting_time: int = 10) -> None:
+    def fetch_full_paths(self, paths: Iterable[str]) -> List[str]:
+        """Resolve the full paths of the asset paths with a single project info lookup.
+
+        Args:
+            paths (Iterable[str]): Represent the asset paths, i.e., Assets/Models/cube.fbx
+
+        Raises:
+            ValueError: Raise if any path does not start with the asset root folder
+
+        Returns:
+            List[str]: Represent the full paths in the same order
+        """
+        paths = list(paths)
+        if invalid := [path for path in paths if not path.startswith(self.asset_root_folder_name)]:
+            raise ValueError(f"The specified paths are invalid: {invalid[:10]} ({len(invalid)} in total). "
+                             f"Path should start with '{self.asset_root_folder_name}'")
+
+        project_root = self.get_project_info().project_root
+        return [os.path.join(project_root, path) for path in paths]
+
+    def quit_without_saving(self, waiting_time: float = 10, pid: int = None) -> bool:
+        """Quit the editor without saving and wait until it exited.
+
+        Args:
+            waiting_time (float, optional): Represent the maximum time (seconds) to wait for the exit,
+                the editor process is killed afterwards. Defaults to 10.
+            pid (int, optional): Represent the editor process. Defaults to the pid of the engine, or the
+                process listening on the local port.
+
+        Returns:
+            bool: Represent whether the editor exited by itself within the waiting time
+        """
+        endpoint = resolve_channel_address(self.engine_platform, self.channel)
+        if (pid := pid or self.pid) is None and parse_unix_socket_path(endpoint) is None:
+            host, port = endpoint.rsplit(':', 1)
+            if host in LOCAL_HOSTS and (pid := find_listening_pid(int(port))) == os.getpid():
+                # never kill the calling process, i.e., a server running in-process
+                pid = None
 
         try:
             self.command_parser(
                 cmd=GRPCInterface.method_system_quit_without_saving)
-            time.sleep(waiting_time)
-        except grpclib.exceptions.StreamTerminatedError as e:
-            print(e)
+        except (grpclib.exceptions.StreamTerminatedError, grpclib.exceptions.GRPCError, ConnectionError) as e:
+            # the editor may exit before answering
+            logger.debug(f"Quit without saving: {e}")
+
+        if pid is not None:
+            if wait_process_exit(pid, timeout=waiting_time):
+                return True
+            logger.warning(f"The editor (pid {pid}) did not quit within {waiting_time}s, kill it")
+            kill_process_tree(pid)
+            return False
+
+        # unknown process: wait until the endpoint stops accepting connections
+        deadline = time.time() + waiting_time
+        while time.time() < deadline:
+            if not is_endpoint_listening(endpoint):
+                return True
+            time.sleep(0.05)
+        logger.warning(f"The editor ({endpoint}) did not quit within {waiting_time}s")
+        return False
 
     def wait_for_grpc_ready(
         self,
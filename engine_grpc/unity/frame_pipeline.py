@@ -0,0 +1,353 @@
+"""Pipelined streaming of rendered frames through RouteImageBytes.
+
+Calling `UnityEngineImpl.RouteImageBytes` per frame serializes capture, encoding and the
+round trip, the frame rate is bound to 1 / (capture + encode + rtt). A `FramePipeline`
+overlaps them: the caller keeps capturing while the previous frames are encoded on an
+executor and sent on a background event loop, several frames in flight at once.
+
+    with engine.frame_pipeline(encode=encode_frame, max_in_flight=2) as frames:
+        while streaming:
+            started = time.perf_counter()
+            frames.submit(capture(), captured_at=started)
+    frames.stats.summary()  # {'capture': {...}, 'queue': {...}, 'encode': {...}, 'send': {...}, 'total': {...}}
+
+`submit` never blocks: once `max_queue_size` frames wait for a free slot, the oldest
+waiting frame is dropped, a live stream prefers the latest frame over a complete one.
+
+The frames are started in order, but with `max_in_flight` > 1 a later frame can reach the
+engine (and complete) first. Each frame carries its sequence number in the 'frame-sequence'
+metadata, read by `engine_pipe_server.resolve_frame_sequence` to skip the stale frames.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, NamedTuple, Optional
+
+from compipe.utils.logging import logger
+from grpclib.client import Channel
+from ugrpc_pipe import GenericResp, RenderBytesReply, UGrpcPipeStub
+
+from ..engine_pipe_abstract import EngineAbstract
+from ..engine_pipe_channel import base_channel
+from ..engine_stub_interface import FRAME_SEQUENCE_METADATA
+
+# time between the capture start and the submit, in-queue wait, encoding, round trip, submit to response
+FRAME_STAGES = ('capture', 'queue', 'encode', 'send', 'total')
+
+
+class FrameResult(NamedTuple):
+    """Represent a frame sent (or failed) by the pipeline"""
+    sequence: int
+    resp: Optional[GenericResp]
+    error: Optional[BaseException]
+    # stage -> seconds
+    latencies: Dict[str, float]
+
+
+class FrameStats:
+    """Aggregate the stage latencies of the recent frames"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {stage: deque(maxlen=window) for stage in FRAME_STAGES}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        # frames replaced by newer ones while waiting in the queue
+        self.dropped = 0
+        self._first_submit: Optional[float] = None
+        self._last_completion: Optional[float] = None
+
+    def add_submitted(self, submitted: float, dropped: bool = False):
+        with self._lock:
+            self.submitted += 1
+            self.dropped += int(dropped)
+            if self._first_submit is None:
+                self._first_submit = submitted
+
+    def add(self, latencies: Dict[str, float], failed: bool):
+        with self._lock:
+            for stage, latency in latencies.items():
+                self._latencies[stage].append(latency)
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._last_completion = time.perf_counter()
+
+    @property
+    def fps(self) -> float:
+        """Represent the rate of the completed frames since the first submit"""
+        with self._lock:
+            if self._first_submit is None or self._last_completion is None:
+                return 0.0
+            elapsed = self._last_completion - self._first_submit
+            return self.completed / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, dict]:
+        """Represent the latency statistics (milliseconds) of each stage, i.e.,
+
+            {'send': {'frames': 120, 'mean_ms': 4.1, 'p50_ms': 3.9, 'p95_ms': 6.2, 'max_ms': 9.8}}
+        """
+        with self._lock:
+            summary = {}
+            for stage, latencies in self._latencies.items():
+                if not latencies:
+                    continue
+                ordered = sorted(latencies)
+                summary[stage] = {'frames': len(ordered),
+                                  'mean_ms': sum(ordered) / len(ordered) * 1000,
+                                  'p50_ms': ordered[len(ordered) // 2] * 1000,
+                                  'p95_ms': ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000,
+                                  'max_ms': ordered[-1] * 1000}
+            return summary
+
+
+@dataclass
+class _Frame:
+    sequence: int
+    data: Any
+    submitted: float
+    captured_at: Optional[float]
+
+
+def as_render_bytes_reply(data: Any) -> RenderBytesReply:
+    """Convert an encoded frame: a RenderBytesReply, a dict of its fields or the main image bytes"""
+    if isinstance(data, RenderBytesReply):
+        return data
+    if isinstance(data, dict):
+        return RenderBytesReply(**data)
+    return RenderBytesReply(main_image_data=bytes(data))
+
+
+class FramePipeline:
+    """Encode and send the submitted frames in the background, see the module documentation.
+
+    Args:
+        engine (EngineAbstract): Represent the engine whose endpoint receives the frames
+        encode (Callable[[Any], Any], optional): Represent the encoder of a captured frame, run on the executor.
+            It returns a RenderBytesReply, a dict of its fields or the main image bytes (the messages do not
+            survive the pickling of a process pool). Defaults to None: frames are already encoded.
+        max_in_flight (int, optional): Represent the number of frames encoded or sent at once. Defaults to 2.
+        max_queue_size (int, optional): Represent the number of frames waiting for a slot, the oldest one is
+            dropped once the queue is full. Defaults to 2.
+        executor (Executor, optional): Represent the executor of the encoder, i.e., a ProcessPoolExecutor for
+            encoders holding the GIL (the encoder and the frames have to be picklable). Defaults to None:
+            a thread pool of max_in_flight workers owned by the pipeline.
+        timeout (float, optional): Represent the timeout of each send. Defaults to None.
+        callback (Callable[[FrameResult], None], optional): Represent the handler called on the pipeline
+            thread for each sent or failed frame, not necessarily in sequence order. Defaults to None.
+        stats_window (int, optional): Represent the number of recent frames of the latency statistics.
+            Defaults to 1000.
+    """
+
+    def __init__(self, engine: EngineAbstract,
+                 encode: Optional[Callable[[Any], Any]] = None,
+                 max_in_flight: int = 2,
+                 max_queue_size: int = 2,
+                 executor: Optional[Executor] = None,
+                 timeout: Optional[float] = None,
+                 callback: Optional[Callable[[FrameResult], None]] = None,
+                 stats_window: int = 1000):
+        if max_in_flight <= 0 or max_queue_size <= 0:
+            raise ValueError(f"max_in_flight and max_queue_size should be positive numbers: "
+                             f"{max_in_flight}, {max_queue_size}")
+        self.engine = engine
+        self.encode = encode
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self.timeout = timeout
+        self.callback = callback
+        self.stats = FrameStats(window=stats_window)
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: Deque[_Frame] = deque()
+        self._lock = threading.Lock()
+        # signaled whenever no frame is queued or in flight
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._sequence = 0
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._stub: Optional[UGrpcPipeStub] = None
+
+    def __enter__(self) -> FramePipeline:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(wait=exc_type is None)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def pending(self) -> int:
+        """Represent the number of frames queued or in flight"""
+        with self._lock:
+            return len(self._queue) + self._in_flight
+
+    def start(self) -> FramePipeline:
+        """Start the pipeline thread.
+
+        Raises:
+            ValueError: Raise if the engine's channel is invalid
+            Exception: Raise the error of the pipeline thread failing to start
+
+        Returns:
+            FramePipeline: Represent the started pipeline
+        """
+        # resolve the endpoint like the engine calls, on the caller's thread to raise the config errors here
+        endpoint = base_channel(engine=self.engine)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='frame-encode')
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, args=(endpoint,), name='frame-pipeline', daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            self._closed = True
+            if self._owns_executor:
+                self._executor.shutdown(wait=False)
+            raise self._start_error
+        return self
+
+    def submit(self, frame: Any, captured_at: Optional[float] = None) -> int:
+        """Queue a frame without blocking, dropping the oldest waiting frame if the queue is full.
+
+        Args:
+            frame (Any): Represent the captured frame passed to the encoder
+            captured_at (float, optional): Represent the time.perf_counter() at the capture start,
+                to report the capture stage. Defaults to None.
+
+        Raises:
+            RuntimeError: Raise if the pipeline is not started or closed
+
+        Returns:
+            int: Represent the sequence number of the frame
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The frame pipeline is closed")
+            if self._loop is None:
+                raise RuntimeError("The frame pipeline is not started")
+            self._sequence += 1
+            self._queue.append(_Frame(sequence=self._sequence, data=frame, submitted=now, captured_at=captured_at))
+            dropped = len(self._queue) > self.max_queue_size
+            if dropped:
+                self._queue.popleft()
+            self.stats.add_submitted(now, dropped=dropped)
+            sequence = self._sequence
+        try:
+            self._loop.call_soon_threadsafe(self._pump)
+        except RuntimeError:
+            # closed meanwhile: the frame was dropped with the queue
+            raise RuntimeError("The frame pipeline is closed") from None
+        return sequence
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queued and in-flight frames are sent, False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def close(self, wait: bool = True, timeout: float = 5.0):
+        """Stop the pipeline, after sending the pending frames if `wait`, otherwise dropping the queued ones"""
+        if self._closed:
+            return
+        if wait:
+            self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self.stats.dropped += len(self._queue)
+            self._queue.clear()
+            self._idle.notify_all()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _open_channel(endpoint: base_channel) -> Channel:
+        # the channel belongs to the pipeline thread
+        if endpoint.path is not None:
+            return Channel(path=endpoint.path, config=endpoint.cfg)
+        return Channel(host=endpoint.host, port=endpoint.port, config=endpoint.cfg)
+
+    def _run(self, endpoint: base_channel):
+        try:
+            asyncio.set_event_loop(self._loop)
+            channel = self._open_channel(endpoint)
+            self._stub = UGrpcPipeStub(channel)
+        except BaseException as e:
+            self._start_error = e
+            self._loop.close()
+            return
+        finally:
+            self._started.set()
+
+        try:
+            self._loop.run_forever()
+            # stopped by close: cancel the frames still in flight
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            channel.close()
+            self._loop.close()
+
+    def _pump(self):
+        # start the queued frames, oldest first, while a slot is free
+        while True:
+            with self._lock:
+                if not self._queue or self._in_flight >= self.max_in_flight:
+                    return
+                frame = self._queue.popleft()
+                self._in_flight += 1
+            self._loop.create_task(self._process(frame))
+
+    async def _process(self, frame: _Frame):
+        latencies = {'queue': time.perf_counter() - frame.submitted}
+        if frame.captured_at is not None:
+            latencies['capture'] = frame.submitted - frame.captured_at
+        resp, error = None, None
+        try:
+            try:
+                started = time.perf_counter()
+                reply = (await self._loop.run_in_executor(self._executor, self.encode, frame.data)
+                         if self.encode is not None else frame.data)
+                reply = as_render_bytes_reply(reply)
+                latencies['encode'] = time.perf_counter() - started
+
+                started = time.perf_counter()
+                resp = await self._stub.route_image_bytes(
+                    reply, timeout=self.timeout, metadata={FRAME_SEQUENCE_METADATA: str(frame.sequence)})
+                latencies['send'] = time.perf_counter() - started
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+                logger.error(f"Failed to stream the frame {frame.sequence}: {e}")
+
+            latencies['total'] = time.perf_counter() - frame.submitted
+            self.stats.add(latencies, failed=error is not None or resp.status.code != 0)
+            if self.callback is not None:
+                try:
+                    self.callback(FrameResult(sequence=frame.sequence, resp=resp, error=error, latencies=latencies))
+                except Exception as e:
+                    logger.error(f"Frame callback failed on the frame {frame.sequence}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._idle.notify_all()
+        self._pump()
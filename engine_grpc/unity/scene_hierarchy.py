@@ -0,0 +1,210 @@
+"""Versioned scene hierarchy exchanged as deltas instead of full snapshots.
+
+The engine keeps a `VersionedSceneHierarchy`: every node change bumps the version, so
+a client sending the version of its copy receives the added, changed and removed nodes
+since then (see `delta`). The client applies the deltas to a `SceneHierarchyMirror`.
+
+Nodes are dicts identified by their 'id' (i.e., the instance id) and referencing their
+'parent' id (None for the scene roots); the other fields are engine-defined.
+
+Delta payload (a Struct):
+
+    {'epoch': str, 'version': int, 'full': bool,
+     'nodes': [...]                                    # full: the whole hierarchy
+     'added': [...], 'changed': [...], 'removed': [id]} # otherwise
+"""
+from __future__ import annotations
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+NODE_ID_KEY = 'id'
+NODE_PARENT_KEY = 'parent'
+
+
+def _node_id(value: Any) -> Any:
+    # Struct numbers are doubles, restore the integer ids
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+class VersionedSceneHierarchy:
+    """Track the changes of a scene hierarchy to answer the delta requests (engine side).
+
+    Args:
+        max_tombstones (int, optional): Represent the number of remembered removals. Clients
+            older than the forgotten removals receive the full hierarchy. Defaults to 100000.
+    """
+
+    def __init__(self, max_tombstones: int = 100000):
+        # changes on every restart of the engine, the versions of another epoch are meaningless
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.max_tombstones = max_tombstones
+        self._nodes: Dict[Any, dict] = {}
+        # version of the node creation / last change, `_modified` is kept in version order
+        # so a delta only visits the nodes changed since the client's version
+        self._created: Dict[Any, int] = {}
+        self._modified: Dict[Any, int] = {}
+        # removed id -> (removal version, creation version), in removal order
+        self._tombstones: Dict[Any, tuple] = {}
+        # oldest version the deltas can be computed from
+        self._min_version = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def set_node(self, node: dict) -> bool:
+        """Add or change a node, return False if it is unchanged"""
+        node_id = node[NODE_ID_KEY]
+        if self._nodes.get(node_id) == node:
+            return False
+        self.version += 1
+        if node_id not in self._nodes:
+            self._created[node_id] = self.version
+            self._tombstones.pop(node_id, None)
+        self._nodes[node_id] = dict(node)
+        self._modified.pop(node_id, None)
+        self._modified[node_id] = self.version
+        return True
+
+    def remove_node(self, node_id: Any) -> bool:
+        if node_id not in self._nodes:
+            return False
+        self.version += 1
+        del self._nodes[node_id]
+        del self._modified[node_id]
+        self._tombstones[node_id] = (self.version, self._created.pop(node_id))
+        if len(self._tombstones) > self.max_tombstones:
+            # forget the oldest removal, older clients are resynchronized
+            forgotten = next(iter(self._tombstones))
+            self._min_version = max(self._min_version, self._tombstones.pop(forgotten)[0])
+        return True
+
+    def update(self, nodes: Iterable[dict]) -> int:
+        """Replace the hierarchy by a snapshot, only the differences bump the version.
+
+        Returns:
+            int: Represent the number of added, changed and removed nodes
+        """
+        snapshot = {node[NODE_ID_KEY]: node for node in nodes}
+        changes = sum(self.remove_node(node_id) for node_id in [node_id for node_id in self._nodes
+                                                                  if node_id not in snapshot])
+        return changes + sum(self.set_node(node) for node in snapshot.values())
+
+    def delta(self, since_version: Optional[int] = None, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """Build the payload bringing a client copy at `since_version` up to date.
+
+        The full hierarchy is returned to new clients, clients of another epoch and clients
+        older than the remembered removals.
+        """
+        payload = {'epoch': self.epoch, 'version': self.version}
+        if (since_version is None or epoch != self.epoch
+                or not self._min_version <= since_version <= self.version):
+            payload.update(full=True, nodes=list(self._nodes.values()))
+            return payload
+
+        added, changed, removed = [], [], []
+        for node_id, modified in reversed(self._modified.items()):
+            if modified <= since_version:
+                break
+            (added if self._created[node_id] > since_version else changed).append(self._nodes[node_id])
+        for node_id, (removed_version, created) in reversed(self._tombstones.items()):
+            if removed_version <= since_version:
+                break
+            # nodes created and removed since then were never seen by the client
+            if created <= since_version:
+                removed.append(node_id)
+        payload.update(full=False, added=added[::-1], changed=changed[::-1], removed=removed[::-1])
+        return payload
+
+
+@dataclass
+class HierarchyDelta:
+    """Represent the changes applied to a mirror by one synchronization"""
+    version: int
+    full: bool = False
+    added: List[dict] = field(default_factory=list)
+    changed: List[dict] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.full or self.added or self.changed or self.removed)
+
+
+class SceneHierarchyMirror:
+    """Local copy of the engine's scene hierarchy kept up to date by applying deltas (client side)"""
+
+    def __init__(self):
+        self.epoch: Optional[str] = None
+        self.version: Optional[int] = None
+        self.nodes: Dict[Any, dict] = {}
+        # parent id (None for the roots) -> child ids in arrival order
+        self._children: Dict[Any, Dict[Any, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: Any) -> bool:
+        return node_id in self.nodes
+
+    def __getitem__(self, node_id: Any) -> dict:
+        return self.nodes[node_id]
+
+    @property
+    def roots(self) -> List[dict]:
+        return self.children(None)
+
+    def children(self, node_id: Any) -> List[dict]:
+        return [self.nodes[child] for child in self._children.get(node_id, ())]
+
+    def parent(self, node_id: Any) -> Optional[dict]:
+        return self.nodes.get(self.nodes[node_id].get(NODE_PARENT_KEY))
+
+    def path(self, node_id: Any, name_key: str = 'name') -> str:
+        """Represent the hierarchy path of the node, i.e., Root/Child/Node"""
+        names = []
+        node = self.nodes.get(node_id)
+        while node is not None:
+            names.append(str(node.get(name_key, node[NODE_ID_KEY])))
+            node = self.nodes.get(node.get(NODE_PARENT_KEY))
+        return '/'.join(reversed(names))
+
+    def apply(self, payload: Dict[str, Any]) -> HierarchyDelta:
+        """Apply a delta payload of `VersionedSceneHierarchy.delta`"""
+        delta = HierarchyDelta(version=int(payload['version']), full=bool(payload.get('full')),
+                               removed=[_node_id(node_id) for node_id in payload.get('removed', ())])
+        if delta.full:
+            self.nodes.clear()
+            self._children.clear()
+            delta.added = [self._normalize(node) for node in payload.get('nodes', ())]
+        else:
+            delta.added = [self._normalize(node) for node in payload.get('added', ())]
+            delta.changed = [self._normalize(node) for node in payload.get('changed', ())]
+
+        for node_id in delta.removed:
+            if (node := self.nodes.pop(node_id, None)) is not None:
+                self._unlink(node)
+        for node in delta.added + delta.changed:
+            if (previous := self.nodes.get(node[NODE_ID_KEY])) is not None:
+                self._unlink(previous)
+            self.nodes[node[NODE_ID_KEY]] = node
+            self._children.setdefault(node.get(NODE_PARENT_KEY), {})[node[NODE_ID_KEY]] = None
+
+        self.epoch = payload.get('epoch')
+        self.version = delta.version
+        return delta
+
+    @staticmethod
+    def _normalize(node: Any) -> dict:
+        node = dict(node)
+        node[NODE_ID_KEY] = _node_id(node[NODE_ID_KEY])
+        node[NODE_PARENT_KEY] = _node_id(node.get(NODE_PARENT_KEY))
+        return node
+
+    def _unlink(self, node: dict):
+        siblings = self._children.get(node.get(NODE_PARENT_KEY))
+        if siblings is not None:
+            siblings.pop(node[NODE_ID_KEY], None)
+            if not siblings:
+                del self._children[node.get(NODE_PARENT_KEY)]
@@ -0,0 +1,159 @@
+"""Binary transport of numeric arrays next to the CommandParser json envelope.
+
+Array parameters (numpy arrays or buffer-protocol objects, e.g., array.array) are never
+converted to text. Their raw bytes travel as length-delimited fields numbered
+ARRAY_FIELD_NUMBER appended to the serialized CommandParserReq. The field is not declared
+by the proto, every protobuf runtime keeps it as an unknown field. The json envelope
+references them:
+
+    'parameters': ['Cube', '%@array:0'],
+    'arrays': [{'dtype': '<f4', 'shape': [1024, 3], 'nbytes': 12288}]
+
+Buffers written into a same-host shared memory ring carry the handle ('shm') instead of
+being appended to the request.
+"""
+from __future__ import annotations
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# field number of the array buffers appended to CommandParserReq (wire type: length-delimited)
+ARRAY_FIELD_NUMBER = 1000
+# parameter placeholder referencing the array of the given index
+ARRAY_PARAMETER_PREFIX = '%@array:'
+
+_BYTE_ORDER = '<' if sys.byteorder == 'little' else '>'
+
+# memoryview (struct) formats of the buffer-protocol objects and their numpy dtype strings
+_FORMAT_DTYPES = {
+    'b': '|i1', 'B': '|u1', '?': '|b1',
+    'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4',
+    'l': f"i{struct.calcsize('l')}", 'L': f"u{struct.calcsize('L')}", 'q': 'i8', 'Q': 'u8',
+    'e': 'f2', 'f': 'f4', 'd': 'f8',
+}
+_DTYPE_FORMATS = {'|i1': 'b', '|u1': 'B', '|b1': '?', 'i2': 'h', 'u2': 'H', 'i4': 'i', 'u4': 'I',
+                  'i8': 'q', 'u8': 'Q', 'f2': 'e', 'f4': 'f', 'f8': 'd'}
+
+
+@dataclass(frozen=True)
+class ArrayDescriptor:
+    dtype: str
+    shape: Tuple[int, ...]
+    nbytes: int
+    # encoded SharedMemoryHandle when the buffer was passed through the shared memory
+    shm: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        value = {'dtype': self.dtype, 'shape': list(self.shape), 'nbytes': self.nbytes}
+        if self.shm is not None:
+            value['shm'] = self.shm
+        return value
+
+    @classmethod
+    def from_json(cls, value: Dict[str, Any]) -> ArrayDescriptor:
+        return cls(dtype=value['dtype'], shape=tuple(value['shape']), nbytes=value['nbytes'], shm=value.get('shm'))
+
+
+def is_array_parameter(value: Any) -> bool:
+    """Check whether the command parameter should travel as binary array"""
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return True
+    if isinstance(value, (str, list, tuple, dict, int, float, bool)) or value is None:
+        return False
+    try:
+        memoryview(value).release()
+        return True
+    except TypeError:
+        return False
+
+
+def array_buffer(value: Any) -> Tuple[memoryview, ArrayDescriptor]:
+    """Retrieve the raw bytes of an array parameter (without copy if C-contiguous) and its descriptor"""
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        array = numpy.ascontiguousarray(value)
+        view = memoryview(array.reshape(-1).view(numpy.uint8)) if array.size else memoryview(b'')
+        return view, ArrayDescriptor(dtype=array.dtype.str, shape=tuple(array.shape), nbytes=array.nbytes)
+
+    view = memoryview(value)
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes()).cast(view.format, view.shape)
+    if (dtype := _FORMAT_DTYPES.get(view.format.lstrip('@=<>!'))) is None:
+        raise TypeError(f"Unsupported buffer format of array parameter: {view.format}")
+    if not dtype.startswith('|'):
+        dtype = f"{_BYTE_ORDER}{dtype}"
+    return view.cast('B'), ArrayDescriptor(dtype=dtype, shape=tuple(view.shape), nbytes=view.nbytes)
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _decode_varint(data, position: int) -> Tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+# key of the length-delimited array fields
+_ARRAY_FIELD_TAG = _encode_varint((ARRAY_FIELD_NUMBER << 3) | 2)
+
+
+def encode_array_fields(buffers: Sequence[memoryview]) -> List[Any]:
+    """Represent the buffers as the chunks of their length-delimited fields (to be joined once)"""
+    chunks = []
+    for buffer in buffers:
+        chunks.extend([_ARRAY_FIELD_TAG, _encode_varint(buffer.nbytes), buffer])
+    return chunks
+
+
+def decode_array_fields(data: bytes) -> List[memoryview]:
+    """Retrieve the array fields of a serialized message as zero-copy views, skipping the other fields"""
+    view = memoryview(data)
+    buffers = []
+    position = 0
+    while position < len(view):
+        key, position = _decode_varint(view, position)
+        field_number, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            _, position = _decode_varint(view, position)
+        elif wire_type == 1:
+            position += 8
+        elif wire_type == 5:
+            position += 4
+        elif wire_type == 2:
+            length, position = _decode_varint(view, position)
+            if field_number == ARRAY_FIELD_NUMBER:
+                buffers.append(view[position:position + length])
+            position += length
+        else:
+            raise ValueError(f"Unsupported protobuf wire type: {wire_type}")
+    return buffers
+
+
+def as_array(buffer: memoryview, descriptor: ArrayDescriptor) -> Any:
+    """Represent the raw bytes as numpy array (if installed) or typed memoryview, without copy"""
+    if numpy is not None:
+        return numpy.frombuffer(buffer, dtype=numpy.dtype(descriptor.dtype)).reshape(descriptor.shape)
+
+    dtype = descriptor.dtype[1:] if descriptor.dtype[0] in '<>=' else descriptor.dtype
+    if descriptor.dtype[0] in '<>' and descriptor.dtype[0] != _BYTE_ORDER:
+        raise ValueError(f"Non-native byte order requires numpy: {descriptor.dtype}")
+    if (format_char := _DTYPE_FORMATS.get(dtype)) is None:
+        raise ValueError(f"Unsupported array dtype without numpy: {descriptor.dtype}")
+    return buffer.cast('B').cast(format_char, descriptor.shape) if descriptor.shape else buffer.cast(format_char)
@@ -0,0 +1,106 @@
+"""Content-addressed transport of binary assets (textures, meshes) reused across commands.
+
+The client hashes each buffer (sha256), asks the engine which hashes it is missing and
+uploads only those. Commands then reference the buffers by hash with '%@blob:<sha256>'
+parameters, resolved by the engine from its blob store:
+
+    albedo, normal = editor.upload_blobs([albedo_bytes, normal_bytes])
+    editor.command_parser(cmd=GRPCInterface.method_material_update_textures,
+                          params=[material_path, albedo, normal])
+
+The hashes known to be stored by the engine are memoized in a `BlobDigestCache`, repeated
+uploads of the same content skip the round trip entirely. A command referencing a blob the
+engine evicted since is answered with BLOB_NOT_FOUND_CODE and the missing hashes: the client
+drops them from its memo, uploads the buffers kept by the `BlobParameter`s again and resends.
+"""
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List
+
+# parameter placeholder referencing a blob of the engine's store by its sha256 digest
+BLOB_PARAMETER_PREFIX = '%@blob:'
+
+# status code of the commands referencing blobs missing from the engine's store (grpc's NOT_FOUND),
+# the payload lists the missing digests
+BLOB_NOT_FOUND_CODE = 5
+
+
+class BlobNotFoundError(KeyError):
+    """Raise if the parameters reference blobs missing from the store, i.e., evicted"""
+
+    def __init__(self, digests: List[str]):
+        super().__init__(f"Not found the blobs: {digests}")
+        self.digests = digests
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+def blob_digest(data: Any) -> str:
+    """Hash the bytes of a buffer-protocol object (bytes, numpy array, memoryview) without copy"""
+    view = memoryview(data)
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes())
+    return hashlib.sha256(view.cast('B')).hexdigest()
+
+
+def blob_parameter(digest: str) -> str:
+    return f"{BLOB_PARAMETER_PREFIX}{digest}"
+
+
+class BlobParameter(str):
+    """Represent the '%@blob:<sha256>' parameter of a buffer, keeping the buffer to upload it again once evicted"""
+
+    def __new__(cls, digest: str, data: Any = None):
+        parameter = super().__new__(cls, blob_parameter(digest))
+        parameter.digest = digest
+        parameter.data = data
+        return parameter
+
+
+def is_blob_parameter(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_PARAMETER_PREFIX)
+
+
+class BlobDigestCache:
+    """LRU set of the digests stored by an engine, bounded by the number of entries"""
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError(f"The capacity should be a positive number: {capacity}")
+        self.capacity = capacity
+        self._digests: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            if digest in self._digests:
+                self._digests.move_to_end(digest)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, digests: Iterable[str]):
+        with self._lock:
+            for digest in digests:
+                self._digests[digest] = None
+                self._digests.move_to_end(digest)
+            while len(self._digests) > self.capacity:
+                self._digests.popitem(last=False)
+
+    def discard(self, digests: Iterable[str]):
+        with self._lock:
+            for digest in digests:
+                self._digests.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._digests.clear()
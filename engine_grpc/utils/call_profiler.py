@@ -0,0 +1,151 @@
+"""Opt-in breakdown of the client calls into phases.
+
+A `CallProfile` measures one decorated call with `perf_counter_ns` marks: each mark
+charges the time elapsed since the previous mark to a phase
+
+    channel      event loop setup and channel / stub acquisition
+    retry        back-off of the calls rejected by an overloaded server
+    resolve      command name resolution
+    serialize    json envelope and binary array encoding
+    rpc          round trip, including the protobuf (de)serialization of grpclib
+    deserialize  payload decompression / casting into the return type
+    unpack       conversion of the payload into Python objects
+    other        remaining time of the call (logging, status checks)
+
+The `CallProfiler` aggregates the phases per command (GRPCInterface name, or the
+decorated method name) and exports them in the folded stack format read by
+flamegraph.pl and speedscope. Nested decorated calls (i.e., get_project_info calling
+command_parser) are folded under their caller and excluded from the caller's phases.
+
+Enable it with `SimulationEngineImpl.enable_profiling()` or the ENGINE_GRPC_PROFILE
+environment variable.
+"""
+from __future__ import annotations
+import os
+import threading
+from collections import defaultdict
+from time import perf_counter_ns
+from typing import Dict, Optional, Tuple
+
+PROFILE_ENV = 'ENGINE_GRPC_PROFILE'
+
+PHASES = ('channel', 'retry', 'resolve', 'serialize', 'rpc', 'deserialize', 'unpack', 'other')
+
+
+class CallProfile:
+    """Represent the phases of a single call"""
+
+    __slots__ = ('profiler', 'stack', 'phases', '_last')
+
+    def __init__(self, profiler: CallProfiler, stack: Tuple[str, ...]):
+        self.profiler = profiler
+        self.stack = stack
+        self.phases: Dict[str, int] = {}
+        self._last = perf_counter_ns()
+
+    def mark(self, phase: str):
+        """Charge the time since the previous mark to the phase"""
+        now = perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self._last
+        self._last = now
+
+    def skip(self):
+        """Exclude the time since the previous mark, i.e., recorded by a nested call"""
+        self._last = perf_counter_ns()
+
+    def finish(self):
+        self.mark('other')
+        self.profiler.add(self)
+
+
+class _NullCallProfile:
+    """Ignore the marks while profiling is disabled"""
+
+    __slots__ = ()
+
+    def mark(self, phase: str):
+        pass
+
+    def skip(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_CALL_PROFILE = _NullCallProfile()
+
+
+class CallProfiler:
+    """Aggregate the phases of the profiled calls per command"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # stack -> phase -> [calls, total ns]
+        self._totals: Dict[Tuple[str, ...], Dict[str, list]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+
+    def begin(self, command: str, parent: Optional[CallProfile] = None) -> CallProfile:
+        return CallProfile(self, (*parent.stack, command) if parent is not None else (command,))
+
+    def add(self, profile: CallProfile):
+        with self._lock:
+            totals = self._totals[profile.stack]
+            for phase, elapsed in profile.phases.items():
+                total = totals[phase]
+                total[0] += 1
+                total[1] += elapsed
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+    def summary(self) -> Dict[str, Dict[str, dict]]:
+        """Represent the calls, total and mean time of each phase per command, i.e.,
+
+            {'method_system_get_service_status': {'rpc': {'calls': 3, 'total_ms': 1.2, 'mean_us': 400.0}}}
+        """
+        with self._lock:
+            summary = defaultdict(dict)
+            for stack, totals in self._totals.items():
+                for phase, (calls, total_ns) in totals.items():
+                    summary[';'.join(stack)][phase] = {'calls': calls, 'total_ms': total_ns / 1e6,
+                                                       'mean_us': total_ns / calls / 1e3}
+            return dict(summary)
+
+    def export_folded(self, path: str = None) -> str:
+        """Export the totals (microseconds) in the folded stack format, i.e.,
+
+            get_project_info;method_system_get_projectinfo;rpc 1234
+
+        Args:
+            path (str, optional): Represent the output file. Defaults to None.
+
+        Returns:
+            str: Represent the folded stacks
+        """
+        with self._lock:
+            lines = [f"{';'.join((*stack, phase))} {total_ns // 1000}"
+                     for stack, totals in self._totals.items()
+                     for phase, (_, total_ns) in totals.items() if total_ns >= 1000]
+        folded = '\n'.join(sorted(lines))
+        if path is not None:
+            with open(path, 'w') as file:
+                file.write(folded + '\n')
+        return folded
+
+
+_default_profiler: Optional[CallProfiler] = None
+_default_profiler_resolved = False
+_default_profiler_lock = threading.Lock()
+
+
+def default_profiler() -> Optional[CallProfiler]:
+    """Retrieve the process-wide profiler, created on first use if ENGINE_GRPC_PROFILE is set"""
+    global _default_profiler, _default_profiler_resolved
+    if not _default_profiler_resolved:
+        with _default_profiler_lock:
+            if not _default_profiler_resolved:
+                if os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes', 'on'):
+                    _default_profiler = CallProfiler()
+                _default_profiler_resolved = True
+    return _default_profiler
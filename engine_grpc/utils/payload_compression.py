@@ -0,0 +1,153 @@
+"""Payload-level compression of GenericResp.payload (google.protobuf.Any).
+
+grpclib does not implement gRPC message compression, so large payloads are compressed
+inside the Any envelope instead. The client advertises the accepted codecs through the
+request metadata, the server compresses payloads above a size threshold and rewrites
+the type_url to `<COMPRESSED_TYPE_URL_PREFIX><codec>/<original type_url>`. Peers without
+compression support never advertise a codec and keep receiving plain payloads.
+"""
+import gzip
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# request metadata advertising the codecs accepted by the client, e.g., 'zstd,gzip'
+ACCEPT_ENCODING_METADATA = 'x-payload-accept-encoding'
+# request metadata overriding the server's compression threshold (bytes)
+COMPRESSION_THRESHOLD_METADATA = 'x-payload-compression-threshold'
+
+COMPRESSED_TYPE_URL_PREFIX = 'type.engine-grpc/compressed/'
+
+# payloads smaller than this are not worth the compression cost
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024
+
+
+@dataclass
+class PayloadCodec:
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _register_codecs() -> Dict[str, PayloadCodec]:
+    # ordered by preference: faster / better ratio first
+    codecs = []
+    if zstandard is not None:
+        codecs.append(PayloadCodec(name='zstd',
+                                   compress=lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+                                   decompress=lambda data: zstandard.ZstdDecompressor().decompress(data)))
+    if lz4_frame is not None:
+        codecs.append(PayloadCodec(name='lz4',
+                                   compress=lz4_frame.compress,
+                                   decompress=lz4_frame.decompress))
+    codecs.append(PayloadCodec(name='gzip',
+                               compress=lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+                               decompress=gzip.decompress))
+    return {codec.name: codec for codec in codecs}
+
+
+CODECS: Dict[str, PayloadCodec] = _register_codecs()
+
+
+def available_codecs() -> List[str]:
+    """Retrieve the codecs supported by the installed packages, ordered by preference"""
+    return list(CODECS.keys())
+
+
+def parse_codecs(value) -> List[str]:
+    """Normalize the codec setting: True (all available), False/None (disabled), 'zstd,gzip' or list"""
+    if value is None or value is False:
+        return []
+    if value is True:
+        return available_codecs()
+    if isinstance(value, str):
+        value = value.split(',')
+    return [name.strip() for name in value if name.strip()]
+
+
+def negotiate_codec(accepted: Iterable[str], supported: Iterable[str] = None) -> Optional[str]:
+    """Pick the first codec of the (preference ordered) supported list accepted by the peer"""
+    accepted = set(accepted)
+    for name in (supported if supported is not None else CODECS.keys()):
+        if name in accepted and name in CODECS:
+            return name
+    return None
+
+
+class CompressionStats:
+    """Thread-safe counters of the compressed payloads per codec"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, codec: str, raw_size: int, compressed_size: int):
+        with self._lock:
+            stats = self._stats.setdefault(codec, {'count': 0, 'raw_bytes': 0, 'compressed_bytes': 0})
+            stats['count'] += 1
+            stats['raw_bytes'] += raw_size
+            stats['compressed_bytes'] += compressed_size
+
+    def ratio(self, codec: str) -> Optional[float]:
+        """Represent raw_bytes / compressed_bytes of the specified codec"""
+        with self._lock:
+            if (stats := self._stats.get(codec)) is None or not stats['compressed_bytes']:
+                return None
+            return stats['raw_bytes'] / stats['compressed_bytes']
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {codec: dict(stats, ratio=(stats['raw_bytes'] / stats['compressed_bytes']
+                                              if stats['compressed_bytes'] else None))
+                    for codec, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# process wide statistics of the payloads compressed by the server
+COMPRESSION_STATS = CompressionStats()
+# process wide statistics of the payloads decompressed by the client
+DECOMPRESSION_STATS = CompressionStats()
+
+
+def is_compressed_type_url(type_url: str) -> bool:
+    return type_url.startswith(COMPRESSED_TYPE_URL_PREFIX)
+
+
+def compress_payload(type_url: str, value: bytes, codec: str) -> Tuple[str, bytes]:
+    """Compress the serialized Any value and encode the codec into the returned type_url"""
+    compressed = CODECS[codec].compress(value)
+    COMPRESSION_STATS.record(codec, len(value), len(compressed))
+    return f"{COMPRESSED_TYPE_URL_PREFIX}{codec}/{type_url}", compressed
+
+
+def decompress_payload(type_url: str, value: bytes) -> Tuple[str, bytes]:
+    """Restore the original type_url and value of a compressed Any payload"""
+    codec, _, original_type_url = type_url[len(COMPRESSED_TYPE_URL_PREFIX):].partition('/')
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported payload compression codec: {codec}")
+    decompressed = CODECS[codec].decompress(value)
+    DECOMPRESSION_STATS.record(codec, len(decompressed), len(value))
+    return original_type_url, decompressed
+
+
+def compression_metadata(codecs: List[str], threshold: Optional[int] = None) -> Dict[str, str]:
+    """Build the request metadata advertising the accepted codecs"""
+    if not codecs:
+        return {}
+    metadata = {ACCEPT_ENCODING_METADATA: ','.join(codecs)}
+    if threshold is not None:
+        metadata[COMPRESSION_THRESHOLD_METADATA] = str(threshold)
+    return metadata
@@ -0,0 +1,265 @@
+"""Same-host shared-memory transport for large binary buffers.
+
+Instead of framing large buffers into gRPC messages, the sender writes them into a
+`multiprocessing.shared_memory` ring and only sends a handle (ring name, position and
+length). The receiver attaches the ring once and copies the buffer out of it: a single
+memcpy instead of the message framing, and the buffer stays valid whatever the writer
+produces next.
+
+Handles travel as request metadata (`x-shm-<field>: <handle>`, client to server) or as
+an Any payload with SHARED_MEMORY_TYPE_URL (server to client).
+
+The client only offloads once the server advertised the support: it writes a random token
+into its ring and sends the handle with a probe command (SHARED_MEMORY_PROBE_METADATA). The
+servers attaching the ring echo the token (see engine_pipe_server.SharedMemoryProbeInterceptor),
+the others (i.e., in a container behind a forwarded loopback port) do not, and the buffers
+keep travelling inline.
+
+The writer holds the buffers of its calls in flight (`write(data, hold=True)`) until it
+releases them once answered: a write wrapping around onto a held buffer raises
+SharedMemoryFullError and the sender falls back to inline bytes. The other buffers (i.e.,
+the server's responses) are overwritten once the ring wrapped around; reading an
+overwritten handle raises ValueError.
+"""
+from __future__ import annotations
+import atexit
+import struct
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional, Tuple
+
+SHARED_MEMORY_TYPE_URL = 'type.engine-grpc/shared-memory'
+SHARED_MEMORY_METADATA_PREFIX = 'x-shm-'
+# request metadata of the capability probe: the handle of the token written into the client's ring
+SHARED_MEMORY_PROBE_METADATA = 'x-shm-probe'
+# command envelope of the probe, answered by the servers supporting the shared memory
+SHARED_MEMORY_PROBE_PAYLOAD = '{"type": "UGrpc.SharedMemory", "isMethod": true, "method": "Probe", "parameters": []}'
+
+# hosts considered to share the memory with the local process
+LOCAL_HOSTS = frozenset(['127.0.0.1', 'localhost', '::1'])
+
+# the ring header stores the total number of bytes written (uint64)
+_HEADER = struct.Struct('<Q')
+
+# rings created (owned) and attached by this process
+_owned_rings: Dict[str, SharedMemoryRing] = {}
+_attached_rings: Dict[str, SharedMemoryRing] = {}
+_rings_lock = threading.Lock()
+
+
+class SharedMemoryFullError(BufferError):
+    """Raise if a write would overwrite the buffers held for the calls in flight"""
+
+
+@dataclass(frozen=True)
+class SharedMemoryHandle:
+    name: str
+    # absolute write position, the offset in the ring is derived from the ring capacity
+    position: int
+    length: int
+
+    def encode(self) -> str:
+        return f"{self.name}:{self.position}:{self.length}"
+
+    @classmethod
+    def decode(cls, value: str) -> SharedMemoryHandle:
+        name, position, length = value.rsplit(':', 2)
+        return cls(name=name, position=int(position), length=int(length))
+
+
+class SharedMemoryRing:
+    """Represent a ring buffer in a named shared memory block"""
+
+    def __init__(self, size: int = None, name: str = None, create: bool = True):
+        if create:
+            if not size or size <= 0:
+                raise ValueError(f"The shared memory size should be a positive number: {size}")
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER.size + size)
+            _HEADER.pack_into(self._shm.buf, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name, create=False)
+            _untrack(self._shm)
+
+        self._is_owner = create
+        self._lock = threading.Lock()
+        # positions of the buffers held until released, see write
+        self._held: Counter = Counter()
+        self.capacity = self._shm.size - _HEADER.size
+
+        if create:
+            with _rings_lock:
+                _owned_rings[self.name] = self
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def written(self) -> int:
+        return _HEADER.unpack_from(self._shm.buf, 0)[0]
+
+    def write(self, data, hold: bool = False) -> SharedMemoryHandle:
+        """Copy the buffer into the ring and return its handle.
+
+        Args:
+            data (Any): Represent the buffer-protocol object to copy
+            hold (bool, optional): Represent whether the buffer is protected from the later writes
+                until `release`, i.e., until the receiver answered. Defaults to False.
+
+        Raises:
+            SharedMemoryFullError: the buffer would overwrite a held buffer
+        """
+        view = memoryview(data).cast('B')
+        length = view.nbytes
+        if length > self.capacity:
+            raise ValueError(
+                f"The buffer ({length} bytes) exceeds the shared memory capacity ({self.capacity} bytes)")
+
+        with self._lock:
+            position = self.written
+            offset = position % self.capacity
+            if offset + length > self.capacity:
+                # keep buffers contiguous: skip the tail and continue at the ring start
+                position += self.capacity - offset
+                offset = 0
+            # the write overwrites the bytes written one capacity before
+            if self._held and min(self._held) < position + length - self.capacity:
+                raise SharedMemoryFullError(
+                    f"The buffer ({length} bytes) would overwrite the buffers in use: {self.name}")
+            # publish the new end first, the readers of the overwritten buffers notice it (see read)
+            _HEADER.pack_into(self._shm.buf, 0, position + length)
+            self._shm.buf[_HEADER.size + offset:_HEADER.size + offset + length] = view
+            if hold:
+                self._held[position] += 1
+
+        return SharedMemoryHandle(name=self.name, position=position, length=length)
+
+    def release(self, handle: SharedMemoryHandle):
+        """Let the later writes overwrite a held buffer"""
+        with self._lock:
+            if self._held[handle.position] > 1:
+                self._held[handle.position] -= 1
+            else:
+                self._held.pop(handle.position, None)
+
+    def is_valid(self, handle: SharedMemoryHandle) -> bool:
+        """Check whether the buffer was not overwritten by later writes"""
+        return handle.position + handle.length <= self.written <= handle.position + self.capacity
+
+    def read(self, handle: SharedMemoryHandle) -> bytes:
+        """Copy the buffer out of the ring"""
+        if handle.name != self.name:
+            raise ValueError(f"The handle belongs to another shared memory: {handle.name}")
+        offset = _HEADER.size + handle.position % self.capacity
+        data = bytes(self._shm.buf[offset:offset + handle.length])
+        # checked after the copy: a write overlapping the copy has already published its end
+        if not self.is_valid(handle):
+            raise ValueError(f"The shared memory buffer was overwritten: {handle.encode()}")
+        return data
+
+    def close(self):
+        with _rings_lock:
+            if self._is_owner:
+                _owned_rings.pop(self.name, None)
+            elif _attached_rings.get(self.name) is self:
+                del _attached_rings[self.name]
+        try:
+            self._shm.close()
+        except BufferError:
+            # views of the ring are still alive, the mapping is released once they are
+            # garbage collected
+            pass
+        if self._is_owner:
+            self._shm.unlink()
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """Prevent the resource tracker from unlinking a block owned by another process on exit"""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def attach_ring(name: str) -> SharedMemoryRing:
+    """Retrieve the ring of the given name, attaching it once if created by another process"""
+    with _rings_lock:
+        ring = _owned_rings.get(name) or _attached_rings.get(name)
+    if ring is None:
+        ring = SharedMemoryRing(name=name, create=False)
+        with _rings_lock:
+            ring = _attached_rings.setdefault(name, ring)
+    return ring
+
+
+def read_shared_memory(handle: SharedMemoryHandle) -> bytes:
+    """Copy the buffer of a handle of any (attached or owned) ring"""
+    return attach_ring(handle.name).read(handle)
+
+
+def _close_all():
+    with _rings_lock:
+        rings = list(_owned_rings.values()) + list(_attached_rings.values())
+    for ring in rings:
+        ring.close()
+
+
+atexit.register(_close_all)
+
+
+def offload_fields(message, fields: Iterable[str], ring: SharedMemoryRing, threshold: int = 0) -> Dict[str, str]:
+    """Move the large bytes fields of a message into the ring.
+
+    The offloaded fields are cleared on the message and their handles are returned as
+    request metadata. The buffers are held until `release_fields`; the fields not fitting
+    next to the held buffers stay in the message.
+
+    Args:
+        message: Represent the (betterproto or protobuf) message
+        fields (Iterable[str]): Represent the names of the bytes fields to offload
+        ring (SharedMemoryRing): Represent the ring owned by the sender
+        threshold (int, optional): Represent the minimum field size to offload. Defaults to 0.
+
+    Returns:
+        Dict[str, str]: Represent the metadata carrying the handles
+    """
+    metadata = {}
+    for field_name in fields:
+        data = getattr(message, field_name)
+        if data and len(data) >= threshold:
+            try:
+                metadata[f"{SHARED_MEMORY_METADATA_PREFIX}{field_name}"] = ring.write(data, hold=True).encode()
+            except SharedMemoryFullError:
+                continue
+            setattr(message, field_name, b'')
+    return metadata
+
+
+def release_fields(ring: SharedMemoryRing, metadata: Optional[Dict[str, str]]):
+    """Release the buffers of the fields offloaded by `offload_fields` once the call was answered"""
+    for key, value in (metadata or {}).items():
+        if key.startswith(SHARED_MEMORY_METADATA_PREFIX):
+            ring.release(SharedMemoryHandle.decode(value))
+
+
+def restore_fields(metadata: Iterable[Tuple[str, str]]) -> Dict[str, bytes]:
+    """Copy the offloaded fields of the request metadata out of the sender's ring"""
+    return {key[len(SHARED_MEMORY_METADATA_PREFIX):]: read_shared_memory(SharedMemoryHandle.decode(value))
+            for key, value in (metadata or ())
+            if key.startswith(SHARED_MEMORY_METADATA_PREFIX) and key != SHARED_MEMORY_PROBE_METADATA}
+
+
+def is_shared_memory_type_url(type_url: str) -> bool:
+    return type_url == SHARED_MEMORY_TYPE_URL
+
+
+def pack_handle(handle: SharedMemoryHandle) -> Tuple[str, bytes]:
+    """Represent the handle as (type_url, value) of an Any payload"""
+    return SHARED_MEMORY_TYPE_URL, handle.encode().encode('utf-8')
+
+
+def unpack_handle(value: bytes) -> bytes:
+    return read_shared_memory(SharedMemoryHandle.decode(bytes(value).decode('utf-8')))
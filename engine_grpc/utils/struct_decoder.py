@@ -0,0 +1,168 @@
+"""Decode serialized google.protobuf.Struct / ListValue payloads into Python objects.
+
+The decoder reads the protobuf wire format directly instead of parsing the message
+and walking it node by node (one WhichOneof per Value), which avoids building the
+intermediate message objects. Struct, Value and ListValue only use field numbers
+below 16, so the tags are single bytes:
+
+    Struct:    fields (map entry)      0x0A
+    map entry: key 0x0A, value 0x12
+    Value:     null 0x08, number 0x11, string 0x1A, bool 0x20, struct 0x2A, list 0x32
+    ListValue: values                  0x0A
+
+Unknown fields are skipped, the last kind of a Value wins (protobuf merge semantics).
+"""
+import struct
+from typing import Any, Dict, List, Tuple
+
+_unpack_double = struct.Struct('<d').unpack_from
+
+_STRUCT_FIELDS_TAG = 0x0A
+_ENTRY_KEY_TAG = 0x0A
+_ENTRY_VALUE_TAG = 0x12
+_LIST_VALUES_TAG = 0x0A
+
+_NULL_TAG = 0x08
+_NUMBER_TAG = 0x11
+_STRING_TAG = 0x1A
+_BOOL_TAG = 0x20
+_STRUCT_TAG = 0x2A
+_LIST_TAG = 0x32
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _skip_field(buf: bytes, pos: int, tag: int) -> int:
+    """Skip the field of an unexpected tag, pos follows the first tag byte"""
+    if tag >= 0x80:
+        tag, pos = _read_varint(buf, pos - 1)
+    wire_type = tag & 0x07
+    if wire_type == 0:
+        return _read_varint(buf, pos)[1]
+    if wire_type == 1:
+        return pos + 8
+    if wire_type == 2:
+        length, pos = _read_varint(buf, pos)
+        return pos + length
+    if wire_type == 5:
+        return pos + 4
+    raise ValueError(f"Unsupported protobuf wire type: {wire_type}")
+
+
+def _decode_struct(buf: bytes, pos: int, end: int) -> Dict[str, Any]:
+    result = {}
+    while pos < end:
+        tag = buf[pos]
+        if tag != _STRUCT_FIELDS_TAG:
+            pos = _skip_field(buf, pos + 1, tag)
+            continue
+
+        # single byte lengths are the common case, avoid the varint call
+        length = buf[pos + 1]
+        pos += 2
+        if length >= 0x80:
+            length, pos = _read_varint(buf, pos - 1)
+        entry_end = pos + length
+
+        key = ''
+        value = None
+        while pos < entry_end:
+            tag = buf[pos]
+            if tag != _ENTRY_KEY_TAG and tag != _ENTRY_VALUE_TAG:
+                pos = _skip_field(buf, pos + 1, tag)
+                continue
+            length = buf[pos + 1]
+            pos += 2
+            if length >= 0x80:
+                length, pos = _read_varint(buf, pos - 1)
+            if tag == _ENTRY_KEY_TAG:
+                key = buf[pos:pos + length].decode('utf-8')
+            else:
+                value = _decode_value(buf, pos, pos + length)
+            pos += length
+        result[key] = value
+    return result
+
+
+def _decode_list(buf: bytes, pos: int, end: int) -> List[Any]:
+    result = []
+    append = result.append
+    while pos < end:
+        tag = buf[pos]
+        if tag != _LIST_VALUES_TAG:
+            pos = _skip_field(buf, pos + 1, tag)
+            continue
+        length = buf[pos + 1]
+        pos += 2
+        if length >= 0x80:
+            length, pos = _read_varint(buf, pos - 1)
+        # numeric lists are frequent (transforms, positions), decode them inline
+        if length == 9 and buf[pos] == _NUMBER_TAG:
+            append(_unpack_double(buf, pos + 1)[0])
+        else:
+            append(_decode_value(buf, pos, pos + length))
+        pos += length
+    return result
+
+
+def _decode_value(buf: bytes, pos: int, end: int) -> Any:
+    value = None
+    while pos < end:
+        tag = buf[pos]
+        if tag == _NUMBER_TAG:
+            value = _unpack_double(buf, pos + 1)[0]
+            pos += 9
+        elif tag == _BOOL_TAG:
+            flag, pos = _read_varint(buf, pos + 1)
+            value = flag != 0
+        elif tag == _NULL_TAG:
+            pos = _read_varint(buf, pos + 1)[1]
+            value = None
+        elif tag == _STRING_TAG or tag == _STRUCT_TAG or tag == _LIST_TAG:
+            length = buf[pos + 1]
+            pos += 2
+            if length >= 0x80:
+                length, pos = _read_varint(buf, pos - 1)
+            if tag == _STRING_TAG:
+                value = buf[pos:pos + length].decode('utf-8')
+            elif tag == _STRUCT_TAG:
+                value = _decode_struct(buf, pos, pos + length)
+            else:
+                value = _decode_list(buf, pos, pos + length)
+            pos += length
+        else:
+            pos = _skip_field(buf, pos + 1, tag)
+    return value
+
+
+def _as_bytes(data) -> bytes:
+    # slicing + decode requires bytes, e.g., not a memoryview of the shared memory
+    return data if isinstance(data, bytes) else bytes(data)
+
+
+def decode_struct(data: bytes) -> Dict[str, Any]:
+    """Convert a serialized google.protobuf.Struct into a dict"""
+    data = _as_bytes(data)
+    return _decode_struct(data, 0, len(data))
+
+
+def decode_list_value(data: bytes) -> List[Any]:
+    """Convert a serialized google.protobuf.ListValue into a list"""
+    data = _as_bytes(data)
+    return _decode_list(data, 0, len(data))
+
+
+def decode_value(data: bytes) -> Any:
+    """Convert a serialized google.protobuf.Value into a Python object"""
+    data = _as_bytes(data)
+    return _decode_value(data, 0, len(data))
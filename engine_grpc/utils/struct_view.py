@@ -0,0 +1,118 @@
+"""Lazy, read-only views over parsed google.protobuf.Struct / ListValue messages.
+
+Parsing the serialized message is done in C (upb), the conversion into Python objects is
+not. The views only convert the nodes actually accessed and cache them, so reading a few
+keys of a large response does not pay for the whole tree. They behave like the dict / list
+returned by the eager conversion (indexing, `get`, `in`, iteration, `len`, equality).
+Call `materialize` when a real dict / list is needed, e.g., for json.dumps.
+"""
+from __future__ import annotations
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List
+
+from google.protobuf import struct_pb2
+
+_MISSING = object()
+
+
+def _view_value(value: struct_pb2.Value) -> Any:
+    kind = value.WhichOneof('kind')
+    if kind == 'struct_value':
+        return StructView(value.struct_value)
+    if kind == 'list_value':
+        return ListValueView(value.list_value)
+    if kind is None or kind == 'null_value':
+        return None
+    return getattr(value, kind)
+
+
+def materialize(value: Any) -> Any:
+    """Convert the (nested) views into dicts and lists"""
+    if isinstance(value, StructView):
+        return {key: materialize(item) for key, item in value.items()}
+    if isinstance(value, ListValueView):
+        return [materialize(item) for item in value]
+    return value
+
+
+class StructView(Mapping):
+    """Represent a Struct as a read-only mapping converting its values on access"""
+
+    __slots__ = ('_struct', '_cache')
+
+    def __init__(self, struct: struct_pb2.Struct):
+        self._struct = struct
+        self._cache: Dict[str, Any] = {}
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> StructView:
+        struct = struct_pb2.Struct()
+        struct.ParseFromString(data)
+        return cls(struct)
+
+    def __getitem__(self, key: str) -> Any:
+        if (value := self._cache.get(key, _MISSING)) is not _MISSING:
+            return value
+        # reading a missing key of a protobuf map would insert it
+        if key not in self:
+            raise KeyError(key)
+        value = self._cache[key] = _view_value(self._struct.fields[key])
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key in self._struct.fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._struct.fields)
+
+    def __len__(self) -> int:
+        return len(self._struct.fields)
+
+    def __repr__(self) -> str:
+        return repr(materialize(self))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return materialize(self)
+
+
+class ListValueView(Sequence):
+    """Represent a ListValue as a read-only sequence converting its items on access"""
+
+    __slots__ = ('_values', '_cache')
+
+    def __init__(self, list_value: struct_pb2.ListValue):
+        self._values = list_value.values
+        self._cache: List[Any] = [_MISSING] * len(self._values)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> ListValueView:
+        list_value = struct_pb2.ListValue()
+        list_value.ParseFromString(data)
+        return cls(list_value)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('list index out of range')
+        if (value := self._cache[index]) is _MISSING:
+            value = self._cache[index] = _view_value(self._values[index])
+        return value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, tuple, ListValueView)):
+            return NotImplemented
+        return len(self) == len(other) and all(item == other_item for item, other_item in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(materialize(self))
+
+    def to_list(self) -> List[Any]:
+        return materialize(self)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import psutil
 
 
@@ -20,3 +22,57 @@ def kill_process_by_name(process_name):
                 proc.kill()
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
             pass
+
+
+def kill_process_tree(pid: int, timeout: float = 10.0):
+    """Kill the process and its children (i.e., the editor's worker processes) by PID"""
+    try:
+        process = psutil.Process(pid)
+        processes = process.children(recursive=True) + [process]
+    except psutil.NoSuchProcess:
+        return
+    for proc in processes:
+        try:
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    psutil.wait_procs(processes, timeout=timeout)
+
+
+def process_tree_memory(pid: int) -> int:
+    """Retrieve the resident memory (bytes) of the process and its children, 0 if it exited"""
+    try:
+        process = psutil.Process(pid)
+        processes = [process] + process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0
+    memory = 0
+    for proc in processes:
+        try:
+            memory += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return memory
+
+
+def wait_process_exit(pid: int, timeout: float) -> bool:
+    """Wait until the process exited, return False on timeout"""
+    try:
+        psutil.Process(pid).wait(timeout=timeout)
+    except psutil.NoSuchProcess:
+        pass
+    except psutil.TimeoutExpired:
+        return False
+    return True
+
+
+def find_listening_pid(port: int) -> Optional[int]:
+    """Find the process listening on the local TCP port, None if not found or not permitted"""
+    try:
+        for connection in psutil.net_connections(kind='tcp'):
+            if (connection.status == psutil.CONN_LISTEN and connection.laddr
+                    and connection.laddr.port == port and connection.pid):
+                return connection.pid
+    except psutil.AccessDenied:
+        pass
+    return None
@@ -0,0 +1,200 @@
+"""Compact append-only binary log of the gRPC traffic of a client.
+
+The recorder wraps the stub used by the decorated calls and appends one record per
+stub call: the route, the request metadata, the serialized request and response, the
+wall-clock start time, the duration and the grpc status code. Client-side failures,
+i.e., a lost connection, are recorded with the closest code (see `status_of`). Messages
+are stored as their wire bytes, so the log can be replayed (see engine_pipe_replay)
+without re-encoding and without the editor that produced it.
+
+Layout: the file starts with MAGIC followed by records of
+
+    header (_RECORD_HEADER) | route | metadata (json) | request | response
+
+Recording is enabled with `start_recording(path)` or the ENGINE_GRPC_RECORD environment
+variable. Requests passing their buffers through shared memory only carry the handles,
+which are not valid anymore when replayed.
+"""
+from __future__ import annotations
+import asyncio
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Iterator, NamedTuple, Optional
+
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+
+RECORD_PATH_ENV = 'ENGINE_GRPC_RECORD'
+
+MAGIC = b'EGTL\x01'
+
+# started (wall clock), duration (seconds), status code, lengths of route, metadata, request and response
+_RECORD_HEADER = struct.Struct('<ddBHIII')
+
+_SERVICE_NAME = 'ugrpc_pipe.UGrpcPipe'
+
+
+class TrafficRecord(NamedTuple):
+    route: str
+    metadata: dict
+    request: bytes
+    response: bytes
+    started: float
+    duration: float
+    status: int
+
+
+def route_of(stub_method: str) -> str:
+    """Resolve the gRPC route of the stub method, i.e., command_parser -> /ugrpc_pipe.UGrpcPipe/CommandParser"""
+    return f"/{_SERVICE_NAME}/{''.join(part.capitalize() for part in stub_method.split('_'))}"
+
+
+def status_of(error: BaseException) -> int:
+    """Resolve the grpc status code recorded for the error raised by a stub call"""
+    if isinstance(error, GRPCError):
+        return error.status.value
+    if isinstance(error, asyncio.CancelledError):
+        return Status.CANCELLED.value
+    # asyncio.TimeoutError is a subclass of OSError
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return Status.DEADLINE_EXCEEDED.value
+    if isinstance(error, (StreamTerminatedError, OSError)):
+        return Status.UNAVAILABLE.value
+    return Status.UNKNOWN.value
+
+
+class TrafficRecorder:
+    """Append the traffic of the wrapped stubs to the log file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: BinaryIO = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, record: TrafficRecord):
+        route = record.route.encode('utf-8')
+        metadata = json.dumps(record.metadata, separators=(',', ':')).encode('utf-8') if record.metadata else b''
+        header = _RECORD_HEADER.pack(record.started, record.duration, record.status,
+                                     len(route), len(metadata), len(record.request), len(record.response))
+        data = b''.join([header, route, metadata, record.request, record.response])
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(data)
+
+    def wrap(self, stub: Any) -> Any:
+        """Wrap the stub to record its calls, stubs are only wrapped once"""
+        if stub is None or isinstance(stub, RecordingStub):
+            return stub
+        return RecordingStub(stub, self)
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RecordingStub:
+    """Forward the calls to the stub and record them"""
+
+    def __init__(self, stub: Any, recorder: TrafficRecorder):
+        self._stub = stub
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._stub, name)
+        if name.startswith('_') or not callable(method):
+            return method
+        route = route_of(name)
+        recorder = self._recorder
+
+        async def recorded_call(request, *args, metadata: Optional[dict] = None, **kwargs):
+            started, counter = time.time(), time.perf_counter()
+            status, response = 0, None
+            try:
+                response = await method(request, *args, metadata=metadata, **kwargs)
+                return response
+            except BaseException as e:
+                status = status_of(e)
+                raise
+            finally:
+                recorder.write(TrafficRecord(route=route, metadata=dict(metadata or {}), request=bytes(request),
+                                             response=bytes(response) if response is not None else b'',
+                                             started=started, duration=time.perf_counter() - counter,
+                                             status=status))
+
+        return recorded_call
+
+
+def read_traffic_log(path: str) -> Iterator[TrafficRecord]:
+    """Iterate the records of the log, a truncated last record (i.e., of a killed process) is skipped"""
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a traffic log: {path}")
+        while len(header := file.read(_RECORD_HEADER.size)) == _RECORD_HEADER.size:
+            started, duration, status, *lengths = _RECORD_HEADER.unpack(header)
+            body = file.read(sum(lengths))
+            if len(body) < sum(lengths):
+                return
+            route_end = lengths[0]
+            metadata_end = route_end + lengths[1]
+            request_end = metadata_end + lengths[2]
+            metadata = body[route_end:metadata_end]
+            yield TrafficRecord(route=body[:route_end].decode('utf-8'),
+                                metadata=json.loads(metadata) if metadata else {},
+                                request=body[metadata_end:request_end], response=body[request_end:],
+                                started=started, duration=duration, status=status)
+
+
+_recorder: Optional[TrafficRecorder] = None
+_recorder_resolved = False
+_recorder_lock = threading.Lock()
+
+
+def start_recording(path: str) -> TrafficRecorder:
+    """Record the traffic of the decorated calls into the log file (replacing the active recorder)"""
+    global _recorder, _recorder_resolved
+    with _recorder_lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder, _recorder_resolved = TrafficRecorder(path), True
+        return _recorder
+
+
+def stop_recording():
+    global _recorder, _recorder_resolved
+    with _recorder_lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder, _recorder_resolved = None, True
+
+
+def active_recorder() -> Optional[TrafficRecorder]:
+    """Retrieve the active recorder, started from ENGINE_GRPC_RECORD on first use"""
+    global _recorder, _recorder_resolved
+    if not _recorder_resolved:
+        with _recorder_lock:
+            if not _recorder_resolved:
+                if path := os.environ.get(RECORD_PATH_ENV):
+                    _recorder = TrafficRecorder(path)
+                _recorder_resolved = True
+    return _recorder
+
+
+@atexit.register
+def _close_recorder():
+    if _recorder is not None:
+        _recorder.close()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the server-side admission control and the client-side back-off.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import grpc
+from grpclib.client import Channel
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError
+from ugrpc_pipe import CommandParserReq, UGrpcPipeStub, ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_decorator import is_overload_rejection, retry_after_seconds
+from engine_grpc.engine_pipe_server import run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+HANDLER_SECONDS = 0.3
+
+
+class SlowServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    def CommandParser(self, request, context):
+        if json.loads(request.payload).get('method') == 'Sleep':
+            time.sleep(HANDLER_SECONDS)
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"))
+
+
+def _start_server(**kwargs) -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server,
+                     kwargs=dict(service_impl=SlowServicer, port=port, **kwargs),
+                     daemon=True).start()
+
+    # wait for the port to accept connections
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _sleep_request() -> CommandParserReq:
+    return CommandParserReq(payload=json.dumps({'type': 'Test', 'isMethod': True, 'method': 'Sleep', 'parameters': []}))
+
+
+def test_fast_rejection():
+    """Test that the overflow is rejected quickly with a retry-after hint"""
+    print("🧪 Testing fast rejection...")
+    port = _start_server(max_workers=1, max_queue_size=1)
+
+    async def burst():
+        channel = Channel(host='127.0.0.1', port=port)
+        stub = UGrpcPipeStub(channel)
+
+        async def call():
+            started = time.perf_counter()
+            try:
+                await stub.command_parser(_sleep_request(), timeout=10)
+                return None, time.perf_counter() - started
+            except GRPCError as e:
+                return e, time.perf_counter() - started
+
+        try:
+            return await asyncio.gather(*[call() for _ in range(6)])
+        finally:
+            channel.close()
+
+    results = asyncio.run(burst())
+    rejected = [(error, elapsed) for error, elapsed in results if error is not None]
+    succeeded = [elapsed for error, elapsed in results if error is None]
+
+    assert len(succeeded) == 2, f"expected executing + queued to succeed: {results}"
+    assert len(rejected) == 4, f"expected the overflow to be rejected: {results}"
+    for error, elapsed in rejected:
+        assert error.status == Status.RESOURCE_EXHAUSTED
+        assert 'retry-after-ms=' in error.message
+        assert elapsed < HANDLER_SECONDS, f"rejection waited for the busy worker: {elapsed}"
+    print("✅ Fast rejection ✓")
+
+
+def test_client_backoff():
+    """Test that grpc_call_general retries a rejected call after backing off"""
+    print("🧪 Testing client back-off...")
+    port = _start_server(max_workers=1, max_queue_size=0)
+
+    # keep the only worker busy from another client
+    def occupy():
+        with grpc.insecure_channel(f'127.0.0.1:{port}') as channel:
+            stub = ugrpc_pipe_pb2_grpc.UGrpcPipeStub(channel)
+            stub.CommandParser(ugrpc_pipe_pb2.CommandParserReq(payload=_sleep_request().payload))
+
+    occupier = threading.Thread(target=occupy)
+    occupier.start()
+    time.sleep(0.1)
+
+    resp = UnityEditorImpl(channel=f"127.0.0.1:{port}").command_parser(
+        cmd=GRPCInterface.method_system_get_service_status)
+    occupier.join()
+
+    assert resp.status.code == 0
+    print("✅ Client back-off ✓")
+
+
+def test_retry_after_parsing():
+    """Test the back-off delay resolution"""
+    print("🧪 Testing retry-after parsing...")
+    hinted = GRPCError(Status.RESOURCE_EXHAUSTED, "Server overloaded: retry-after-ms=250")
+    assert 0.25 <= retry_after_seconds(hinted, attempt=0) <= 0.25 * 1.2
+
+    plain = GRPCError(Status.RESOURCE_EXHAUSTED, "Concurrent RPC limit exceeded!")
+    assert 0.4 <= retry_after_seconds(plain, attempt=2) <= 0.4 * 1.2
+
+    # oversized messages share the status code but are not retried
+    oversized = GRPCError(Status.RESOURCE_EXHAUSTED, "Received message larger than max (4194309 vs. 4194304)")
+    assert is_overload_rejection(hinted) and is_overload_rejection(plain)
+    assert not is_overload_rejection(oversized)
+    print("✅ Retry-after parsing ✓")
+
+
+if __name__ == "__main__":
+    test_fast_rejection()
+    test_client_backoff()
+    test_retry_after_parsing()
+    print("🎉 All admission control tests passed!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the binary array parameters of the CommandParser interface.
+"""
+
+import array
+import json
+import socket
+import threading
+import time
+
+import numpy
+from ugrpc_pipe import ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import resolve_command_parameters, run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+from engine_grpc.utils.array_payload import ArrayDescriptor, array_buffer, as_array
+
+VERTEX_COUNT = 100_000
+
+
+class ArrayServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    """Describe the received parameters: name, then dtype/shape/sum of each array"""
+
+    def CommandParser(self, request, context):
+        name, vertices, indices = resolve_command_parameters(request)
+        message = json.dumps([name,
+                              [str(vertices.dtype), list(vertices.shape), float(vertices.sum())],
+                              [str(indices.dtype), list(indices.shape), int(indices.sum())]])
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message=message))
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=ArrayServicer, port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def test_buffer_descriptors():
+    """Test dtype / shape detection and the zero-copy views of the raw bytes"""
+    print("🧪 Testing array descriptors...")
+    vertices = numpy.arange(12, dtype=numpy.float32).reshape(4, 3)
+    buffer, descriptor = array_buffer(vertices)
+    assert descriptor == ArrayDescriptor(dtype='<f4', shape=(4, 3), nbytes=48)
+    assert numpy.shares_memory(as_array(buffer, descriptor), vertices)
+
+    # buffer-protocol objects without numpy metadata
+    buffer, descriptor = array_buffer(array.array('i', [1, 2, 3]))
+    assert descriptor.dtype == '<i4' and descriptor.shape == (3,)
+
+    # non-contiguous arrays are packed once
+    buffer, descriptor = array_buffer(vertices[:, 0])
+    assert descriptor.shape == (4,) and list(as_array(buffer, descriptor)) == [0, 3, 6, 9]
+    print("✅ Array descriptors ✓")
+
+
+def test_request_is_binary():
+    """Test that the arrays are not converted to text"""
+    print("🧪 Testing binary request encoding...")
+    vertices = numpy.random.rand(VERTEX_COUNT, 3).astype(numpy.float32)
+    editor = UnityEditorImpl()
+
+    req = editor.build_command_parser_req(GRPCInterface.method_system_get_service_status, ['Mesh', vertices])
+    text = editor.build_command_parser_req(GRPCInterface.method_system_get_service_status,
+                                           ['Mesh', vertices.ravel().tolist()])
+    binary_size, text_size = len(bytes(req)), len(bytes(text))
+
+    assert len(req.payload) < 512, "the envelope should only carry the descriptors"
+    assert binary_size < vertices.nbytes + 512
+    print(f"📊 {VERTEX_COUNT} vertices: binary {binary_size} bytes, text {text_size} bytes "
+          f"({text_size / binary_size:.1f}x)")
+    print("✅ Binary request encoding ✓")
+
+
+def test_array_roundtrip():
+    """Test that the server resolves the arrays with their dtype and shape"""
+    print("🧪 Testing array round trip...")
+    port = _start_server()
+    vertices = numpy.random.rand(VERTEX_COUNT, 3).astype(numpy.float32)
+    indices = numpy.arange(VERTEX_COUNT, dtype=numpy.uint32)
+
+    resp = UnityEditorImpl(channel=f"127.0.0.1:{port}").command_parser(
+        cmd=GRPCInterface.method_system_get_service_status, params=['Mesh', vertices, indices])
+
+    name, vertex_info, index_info = json.loads(resp.status.message)
+    assert name == 'Mesh'
+    assert vertex_info[:2] == ['float32', [VERTEX_COUNT, 3]]
+    assert abs(vertex_info[2] - float(vertices.sum())) < 1e-3 * VERTEX_COUNT
+    assert index_info == ['uint32', [VERTEX_COUNT], int(indices.sum())]
+    print("✅ Array round trip ✓")
+
+
+if __name__ == "__main__":
+    test_buffer_descriptors()
+    test_request_is_binary()
+    test_array_roundtrip()
+    print("🎉 All array payload tests passed!")
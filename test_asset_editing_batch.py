@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test script for the scoped asset editing batch of the editor.
+"""
+
+import json
+import socket
+import threading
+import time
+from concurrent.futures import CancelledError
+
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError
+from ugrpc_pipe import ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+MOVE_COUNT = 50
+
+
+class RecordingServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    """Record the methods in the order of arrival"""
+    methods = []
+
+    def CommandParser(self, request, context):
+        payload = json.loads(request.payload)
+        RecordingServicer.methods.append(payload['method'])
+        if payload['method'] == 'CopyAsset':
+            time.sleep(0.5)
+        return build_response()
+
+
+class RefusingServicer(RecordingServicer):
+    """Refuse to enter the asset editing mode, i.e., while the editor compiles"""
+
+    def CommandParser(self, request, context):
+        if json.loads(request.payload)['method'] == 'StartAssetEditing':
+            RecordingServicer.methods.append('StartAssetEditing')
+            return build_response(code=1, message='Compiling scripts')
+        return super().CommandParser(request, context)
+
+
+def _start_server(service_impl=RecordingServicer) -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=service_impl, port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _move(editor: UnityEditorImpl, index: int):
+    return editor.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_move_asset,
+                                 params=[f"Assets/a_{index}.prefab", f"Assets/b_{index}.prefab"])
+
+
+def test_asset_editing_batch():
+    """Test that the mutations are sent in order within one asset editing window and one refresh"""
+    print("🧪 Testing asset editing batch...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    RecordingServicer.methods.clear()
+
+    # every command of the batch leases a connection of its lane
+    lease_stub, leased = editor.lease_stub, []
+
+    def _lease_stub(cmd=None, params=None):
+        leased.append(cmd)
+        return lease_stub(cmd=cmd, params=params)
+
+    editor.lease_stub = _lease_stub
+    with editor.asset_editing_batch():
+        futures = [_move(editor, index) for index in range(MOVE_COUNT)]
+        assert RecordingServicer.methods == []
+        # nested batches join the outer one
+        with editor.asset_editing_batch():
+            futures.append(editor.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_import_assets,
+                                                 params=["Assets"]))
+        assert not any(future.done() for future in futures)
+
+    assert RecordingServicer.methods == (['StartAssetEditing'] + ['MoveAsset'] * MOVE_COUNT
+                                         + ['ImportAsset', 'StopAssetEditing', 'Refresh'])
+    assert all(future.result().status.code == 0 for future in futures)
+    assert leased[1:-1] == [GRPCInterface.method_editor_assetdatabase_move_asset] * MOVE_COUNT + [
+        GRPCInterface.method_editor_assetdatabase_import_assets]
+    del editor.lease_stub
+    print(f"📊 {len(futures)} mutations sent with {len(RecordingServicer.methods) - len(futures)} bracketing commands")
+    print("✅ Asset editing batch ✓")
+
+
+def test_reads_flush_the_batch():
+    """Test that other commands observe the queued mutations"""
+    print("🧪 Testing reads within the batch...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    RecordingServicer.methods.clear()
+
+    with editor.asset_editing_batch():
+        moved = _move(editor, 0)
+        editor.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_guid_to_path, params=['guid'])
+        assert moved.done()
+        _move(editor, 1)
+
+    assert RecordingServicer.methods == ['StartAssetEditing', 'MoveAsset', 'StopAssetEditing', 'GUIDToAssetPath',
+                                         'StartAssetEditing', 'MoveAsset', 'StopAssetEditing', 'Refresh']
+    print("✅ Reads within the batch ✓")
+
+
+def test_failed_block_discards_the_batch():
+    """Test that the queued mutations are discarded if the block raises"""
+    print("🧪 Testing failed batch...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    RecordingServicer.methods.clear()
+
+    try:
+        with editor.asset_editing_batch():
+            moved = _move(editor, 0)
+            raise KeyError('job failed')
+    except KeyError:
+        pass
+    assert RecordingServicer.methods == []
+    try:
+        moved.result()
+        raise AssertionError("the discarded command should be cancelled")
+    except CancelledError:
+        pass
+
+    # the editor leaves the batch mode
+    assert _move(editor, 1).status.code == 0
+    assert RecordingServicer.methods == ['MoveAsset']
+    print("✅ Failed batch ✓")
+
+
+def test_deferred_call_options():
+    """Test that the options of the deferred commands are applied and every future is settled"""
+    print("🧪 Testing deferred call options...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    RecordingServicer.methods.clear()
+
+    try:
+        with editor.asset_editing_batch():
+            moved = _move(editor, 0)
+            copied = editor.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_copy_asset,
+                                           params=["Assets/a.prefab", "Assets/c.prefab"], timeout=0.1,
+                                           compression=False, verbose=True)
+            skipped = _move(editor, 1)
+        raise AssertionError("the timeout of the deferred command should be applied")
+    except GRPCError as e:
+        assert e.status == Status.DEADLINE_EXCEEDED
+    assert moved.result().status.code == 0
+    assert isinstance(copied.exception(), GRPCError) and skipped.exception() is copied.exception()
+    assert RecordingServicer.methods == ['StartAssetEditing', 'MoveAsset', 'CopyAsset', 'StopAssetEditing']
+
+    # a response failing to parse does not leave the next futures pending
+    parse = editor.parse_command_parser_resp
+    parsed = []
+
+    def _parse_failing_first(**kwargs):
+        parsed.append(kwargs['resp'])
+        if len(parsed) == 1:
+            raise ValueError('unexpected payload')
+        return parse(**kwargs)
+
+    editor.parse_command_parser_resp = _parse_failing_first
+    try:
+        with editor.asset_editing_batch():
+            futures = [_move(editor, index) for index in range(3)]
+    finally:
+        del editor.parse_command_parser_resp
+    assert isinstance(futures[0].exception(), ValueError)
+    assert all(future.result().status.code == 0 for future in futures[1:])
+    print("✅ Deferred call options ✓")
+
+
+def test_refused_asset_editing():
+    """Test that the batch fails without sending the mutations if the editor refuses the asset editing mode"""
+    print("🧪 Testing refused asset editing...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server(RefusingServicer)}")
+    RecordingServicer.methods.clear()
+
+    try:
+        with editor.asset_editing_batch():
+            futures = [_move(editor, index) for index in range(3)]
+        raise AssertionError("the refused batch should fail")
+    except RuntimeError as e:
+        assert 'Compiling scripts' in str(e)
+    assert all(isinstance(future.exception(), RuntimeError) for future in futures)
+    assert RecordingServicer.methods == ['StartAssetEditing']
+    print("✅ Refused asset editing ✓")
+
+
+if __name__ == "__main__":
+    test_asset_editing_batch()
+    test_reads_flush_the_batch()
+    test_failed_block_discards_the_batch()
+    test_deferred_call_options()
+    test_refused_asset_editing()
+    print("🎉 All asset editing batch tests passed!")
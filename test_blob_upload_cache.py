@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed upload of textures and binary assets.
+"""
+
+import hashlib
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy
+
+from engine_grpc.engine_pipe_server import (BlobStore, UGrpcPipeImpl, blob_not_found_response, build_response,
+                                            resolve_command_parameters, run_grpc_server)
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+from engine_grpc.utils.blob_cache import BLOB_NOT_FOUND_CODE, BlobDigestCache, BlobNotFoundError, blob_digest, blob_parameter
+
+TEXTURE_SIZE = 1024
+
+
+class MaterialServicer(UGrpcPipeImpl):
+    """Store the blobs and answer the texture updates with the digests of the referenced textures"""
+    uploads = []
+
+    def CommandParser(self, request, context):
+        if (resp := self.blobs.handle_command(request)) is not None:
+            if json.loads(request.payload)['method'] == 'Upload':
+                MaterialServicer.uploads.append(len(request.SerializeToString()))
+            return resp
+        try:
+            material, *textures = resolve_command_parameters(request, self.blobs)
+        except BlobNotFoundError as e:
+            return blob_not_found_response(e)
+        return build_response([material] + [hashlib.sha256(texture).hexdigest() for texture in textures])
+
+
+class SmallStoreServicer(MaterialServicer):
+    """Keep two textures at most, the least recently used ones are evicted"""
+
+    def __init__(self):
+        super().__init__()
+        self.blobs = BlobStore(max_bytes=2 * TEXTURE_SIZE * TEXTURE_SIZE * 4)
+
+
+# editor stand-in serving the blob store of the reference servicer
+SERVER_CODE = """
+import sys
+from engine_grpc.engine_pipe_server import UGrpcPipeImpl, run_grpc_server
+run_grpc_server(service_impl=UGrpcPipeImpl, port=int(sys.argv[1]))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_listening(port: int):
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _start_server(service_impl=MaterialServicer) -> int:
+    port = _free_port()
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=service_impl, port=port),
+                     daemon=True).start()
+    _wait_listening(port)
+    return port
+
+
+def _textures(count: int, seed: int):
+    rng = numpy.random.default_rng(seed)
+    return [rng.integers(0, 255, (TEXTURE_SIZE, TEXTURE_SIZE, 4), dtype=numpy.uint8) for _ in range(count)]
+
+
+def test_digest_cache():
+    """Test the digests and the LRU eviction of the client memo"""
+    print("🧪 Testing blob digest cache...")
+    texture = _textures(1, 0)[0]
+    assert blob_digest(texture) == hashlib.sha256(texture.tobytes()).hexdigest()
+    assert blob_digest(texture[:, :, 0]) == hashlib.sha256(texture[:, :, 0].tobytes()).hexdigest()
+
+    cache = BlobDigestCache(capacity=2)
+    cache.add(['a', 'b'])
+    assert 'a' in cache
+    cache.add(['c'])
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+
+    store = BlobStore(max_bytes=10)
+    store.put(blob_digest(b'12345678'), b'12345678')
+    try:
+        store.put(blob_digest(b'other'), b'corrupted')
+        raise AssertionError("a blob not matching its digest should be rejected")
+    except ValueError:
+        pass
+    store.put(blob_digest(b'abcdef'), b'abcdef')
+    assert len(store) == 1 and store.nbytes == 6
+    assert bytes(store.resolve(blob_parameter(blob_digest(b'abcdef')))) == b'abcdef'
+    print("✅ Blob digest cache ✓")
+
+
+def test_upload_only_missing_blobs():
+    """Test that repeated material builds skip the texture transfer"""
+    print("🧪 Testing blob upload...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    textures = _textures(4, 1)
+    digests = [blob_digest(texture) for texture in textures]
+
+    def build_material(name: str, maps):
+        started = time.perf_counter()
+        params = editor.upload_blobs(buffers=maps)
+        resp = editor.command_parser(cmd=GRPCInterface.method_material_update_textures, params=[name] + params)
+        return resp.payload, (time.perf_counter() - started) * 1000
+
+    payload, first_ms = build_material('Assets/a.mat', textures[:2])
+    assert payload == ['Assets/a.mat'] + digests[:2]
+    assert len(MaterialServicer.uploads) == 2
+    assert min(MaterialServicer.uploads) > TEXTURE_SIZE * TEXTURE_SIZE * 4
+
+    # same textures: memoized, neither asked nor uploaded
+    payload, repeated_ms = build_material('Assets/b.mat', textures[:2])
+    assert payload == ['Assets/b.mat'] + digests[:2]
+    assert len(MaterialServicer.uploads) == 2
+    assert editor.blob_cache.hits == 2
+
+    # only the new texture is uploaded, the duplicate once
+    payload, _ = build_material('Assets/c.mat', [textures[1], textures[2], textures[2].copy()])
+    assert payload == ['Assets/c.mat', digests[1], digests[2], digests[2]]
+    assert len(MaterialServicer.uploads) == 3
+
+    # another client of the same engine finds the stored blobs
+    other = UnityEditorImpl(channel=editor.channel)
+    assert other.upload_blobs(buffers=textures[:3]) == [blob_parameter(digest) for digest in digests[:3]]
+    assert len(MaterialServicer.uploads) == 3
+    print(f"📊 Material with 2 x {TEXTURE_SIZE}² RGBA textures: first build {first_ms:.1f}ms, "
+          f"repeated build {repeated_ms:.1f}ms")
+    print("✅ Blob upload ✓")
+
+
+def test_evicted_blobs():
+    """Test that the commands referencing evicted blobs upload them again instead of failing"""
+    print("🧪 Testing evicted blobs...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server(SmallStoreServicer)}")
+    textures = _textures(3, 3)
+    digests = [blob_digest(texture) for texture in textures]
+    MaterialServicer.uploads.clear()
+
+    # the store keeps the last two textures, the memo all three
+    params = editor.upload_blobs(buffers=textures)
+    assert len(MaterialServicer.uploads) == 3 and len(editor.blob_cache) == 3
+
+    resp = editor.command_parser(cmd=GRPCInterface.method_material_update_textures, params=['Assets/a.mat', params[0]])
+    assert resp.status.code == 0 and resp.payload == ['Assets/a.mat', digests[0]]
+    assert len(MaterialServicer.uploads) == 4
+
+    # texture 1 was evicted by the upload above
+    resps = editor.command_parser_batch(cmd=GRPCInterface.method_material_update_textures,
+                                        params_list=[['Assets/b.mat', params[1]], ['Assets/c.mat', params[0]]])
+    assert [resp.payload for resp in resps] == [['Assets/b.mat', digests[1]], ['Assets/c.mat', digests[0]]]
+    assert len(MaterialServicer.uploads) == 5
+
+    # a bare placeholder keeps no buffer to upload: the status names the missing digest
+    resp = editor.command_parser(cmd=GRPCInterface.method_material_update_textures,
+                                 params=['Assets/d.mat', blob_parameter(digests[2])])
+    assert resp.status.code == BLOB_NOT_FOUND_CODE and resp.payload == [digests[2]]
+    assert digests[2] not in editor.blob_cache
+    print("✅ Evicted blobs ✓")
+
+
+def test_restarted_engine():
+    """Test that the memo is dropped when the engine restarted with an empty store"""
+    print("🧪 Testing restarted engine...")
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, '-c', SERVER_CODE, str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_listening(port)
+        editor = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+        textures = _textures(2, 2)
+        editor.upload_blobs(buffers=textures)
+        assert len(editor.blob_cache) == 2
+
+        server.terminate()
+        server.wait(timeout=10)
+        server = subprocess.Popen([sys.executable, '-c', SERVER_CODE, str(port)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _wait_listening(port)
+
+        # the first call notices the lost connection, the next one uploads again
+        for _ in range(2):
+            try:
+                editor.upload_blobs(buffers=textures)
+                break
+            except Exception:
+                pass
+        assert editor.blob_cache.misses >= 2
+        digests = [blob_digest(texture) for texture in textures]
+        assert editor.command_parser(cmd=GRPCInterface.method_blob_find_missing, params=[digests]).payload == []
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Restarted engine ✓")
+
+
+if __name__ == "__main__":
+    test_digest_cache()
+    test_upload_only_missing_blobs()
+    test_evicted_blobs()
+    test_restarted_engine()
+    print("🎉 All blob upload cache tests passed!")
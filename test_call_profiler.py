@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-phase profiling of the client calls.
+"""
+
+import socket
+import threading
+import time
+
+import numpy
+
+from engine_grpc.engine_pipe_server import run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+from engine_grpc.utils.call_profiler import PHASES, CallProfiler
+
+PROFILED_CALLS = 50
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(port=port), daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def test_profile_marks():
+    """Test that the marks charge the elapsed time to the phases"""
+    print("🧪 Testing profile marks...")
+    profiler = CallProfiler()
+    profile = profiler.begin('command')
+    time.sleep(0.01)
+    profile.mark('rpc')
+    time.sleep(0.01)
+    profile.skip()
+    profile.mark('unpack')
+    profile.finish()
+
+    phases = profiler.summary()['command']
+    assert phases['rpc']['calls'] == 1 and phases['rpc']['total_ms'] >= 9
+    assert phases['unpack']['total_ms'] < 5, "skipped time should not be charged"
+    assert set(phases) <= set(PHASES)
+
+    nested = profiler.begin('child', parent=profile)
+    assert nested.stack == ('command', 'child')
+    print("✅ Profile marks ✓")
+
+
+def test_profile_commands():
+    """Test the phase breakdown of real calls and the folded stack export"""
+    print("🧪 Testing call profiling...")
+    port = _start_server()
+    client = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+    assert client.profiler is None
+
+    profiler = client.enable_profiling()
+    vertices = numpy.random.rand(10000, 3).astype(numpy.float32)
+    for _ in range(PROFILED_CALLS):
+        client.command_parser(cmd=GRPCInterface.method_system_get_service_status, params=['Mesh', vertices])
+    assert client.get_service_status()
+
+    summary = profiler.summary()
+    phases = summary['method_system_get_service_status']
+    for phase in ('channel', 'resolve', 'serialize', 'rpc', 'deserialize', 'unpack'):
+        assert phases[phase]['calls'] == PROFILED_CALLS, phase
+    # nested decorated calls are folded under the caller
+    assert 'get_service_status;method_system_get_service_status' in summary
+    assert 'rpc' not in summary['get_service_status']
+
+    folded = profiler.export_folded()
+    for line in folded.splitlines():
+        stack, value = line.rsplit(' ', 1)
+        assert stack.split(';')[-1] in PHASES and int(value) > 0
+    breakdown = ', '.join(f"{phase} {values['mean_us']:.0f}us" for phase, values in phases.items())
+    print(f"📊 Mean phases over {PROFILED_CALLS} calls: {breakdown}")
+
+    client.disable_profiling()
+    client.get_service_status()
+    assert profiler.summary()['get_service_status']['channel']['calls'] == 1
+    print("✅ Call profiling ✓")
+
+
+if __name__ == "__main__":
+    test_profile_marks()
+    test_profile_commands()
+    print("🎉 All call profiler tests passed!")
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Test script for the multiple connections per endpoint and the dedicated bulk connections.
+"""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from compipe.runtime_env import Environment
+from grpclib.client import Channel
+
+from engine_grpc.engine_pipe_channel import ChannelGroup, GrpcChannelPool, general_channel, is_bulk_call
+from engine_grpc.engine_pipe_decorator import grpc_call_general
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+from engine_grpc.utils.blob_cache import blob_digest
+
+# emulated bandwidth of the link to a remote editor, per connection and direction
+LINK_RATE = 32 * 1024 * 1024
+UPLOAD_SIZE = 8 * 1024 * 1024
+UPLOAD_COUNT = 3
+
+SERVER_CODE = """
+import sys
+from engine_grpc.engine_pipe_server import UGrpcPipeImpl, run_grpc_server
+run_grpc_server(service_impl=UGrpcPipeImpl, port=int(sys.argv[1]))
+"""
+
+
+class ThrottledLink:
+    """TCP proxy forwarding every connection at a limited rate, the bytes of a connection stay in order"""
+
+    def __init__(self, target_port: int, rate: int = LINK_RATE):
+        self.target_port = target_port
+        self.rate = rate
+        self._listener = socket.socket()
+        self._listener.bind(('127.0.0.1', 0))
+        self._listener.listen()
+        self.port = self._listener.getsockname()[1]
+        self.connections = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            upstream = socket.create_connection(('127.0.0.1', self.target_port))
+            for source, target in ((client, upstream), (upstream, client)):
+                threading.Thread(target=self._pump, args=(source, target), daemon=True).start()
+
+    def _pump(self, source: socket.socket, target: socket.socket):
+        try:
+            while data := source.recv(65536):
+                target.sendall(data)
+                time.sleep(len(data) / self.rate)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, target):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def close(self):
+        self._listener.close()
+
+
+class NestingEditor(UnityEditorImpl):
+    @grpc_call_general()
+    def nested_status(self):
+        outer = self.stub
+        assert self.get_service_status()
+        return outer, self.stub
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server() -> (subprocess.Popen, int):
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, '-c', SERVER_CODE, str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return server, port
+        time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("Test server did not start")
+
+
+def _configure_connections(connections: int, bulk_connections: int):
+    grpc_cfg = dict(Environment().param.get('grpc', {}))
+    grpc_cfg['unity_editor'] = {"description": "message_length = 100*1024*1024",
+                                "max_msg_length": 104857600,
+                                "connections": connections,
+                                "bulk_connections": bulk_connections}
+    Environment.append_server_config(payload={'grpc': grpc_cfg})
+
+
+def _status_latencies_during_uploads(editor: UnityEditorImpl) -> list:
+    """Send status calls one after another while blobs are uploaded on the same event loop"""
+    blob = bytes(UPLOAD_SIZE)
+    upload = editor.build_command_parser_req(cmd=GRPCInterface.method_blob_upload, params=[blob_digest(blob), blob])
+    status = editor.build_command_parser_req(cmd=GRPCInterface.method_system_get_service_status)
+
+    async def _upload():
+        with editor.lease_stub(cmd=GRPCInterface.method_blob_upload) as stub:
+            return await stub.command_parser(upload)
+
+    async def _scenario():
+        latencies = []
+        for _ in range(UPLOAD_COUNT):
+            task = asyncio.ensure_future(_upload())
+            await asyncio.sleep(0)
+            while not task.done():
+                started = time.perf_counter()
+                with editor.lease_stub(cmd=GRPCInterface.method_system_get_service_status) as stub:
+                    await stub.command_parser(status)
+                latencies.append(time.perf_counter() - started)
+            assert (await task).status.code == 0
+        return latencies
+
+    # the channel manager leases the connections of the engine's endpoint on its event loop
+    with general_channel(engine=editor):
+        return sorted(editor.event_loop.run_until_complete(_scenario()))
+
+
+def test_channel_group_leases():
+    """Test that the connections are opened on demand and leased least-loaded first"""
+    print("🧪 Testing channel group leases...")
+    loop = asyncio.new_event_loop()
+    try:
+        group = ChannelGroup(lambda index: Channel(host='127.0.0.1', port=1, loop=loop), size=2)
+        first, _ = group.acquire()
+        assert len(group) == 1 and first is group.primary
+        # the first connection is busy: open the second one
+        second, _ = group.acquire()
+        assert len(group) == 2 and second is not first
+        # at the limit: share the least-loaded connection
+        group.release(second)
+        third, _ = group.acquire()
+        assert third is second and group.in_flight == [1, 1]
+        fourth, _ = group.acquire()
+        assert len(group) == 2 and group.in_flight == [2, 1] and fourth is first
+        for channel in (first, second, fourth):
+            group.release(channel)
+        # idle calls stay on the first connection
+        with group.lease():
+            assert group.in_flight == [1, 0]
+        assert group.in_flight == [0, 0]
+        for channel in group.channels:
+            channel.close()
+    finally:
+        loop.close()
+
+    assert is_bulk_call('RouteImageBytes', {})
+    assert is_bulk_call('command_parser', {'cmd': GRPCInterface.method_blob_upload})
+    assert not is_bulk_call('command_parser', {'cmd': GRPCInterface.method_system_get_service_status})
+    assert is_bulk_call('command_parser', {'cmd': GRPCInterface.method_object_set_value,
+                                           'params': ['mesh', bytes(2048)]}, threshold=1024)
+    assert not is_bulk_call('command_parser', {'cmd': GRPCInterface.method_object_set_value,
+                                               'params': ['mesh', bytes(512)]}, threshold=1024)
+    print("✅ Channel group leases ✓")
+
+
+def test_bulk_connections():
+    """Test that the status calls keep a low latency during bulk uploads on a dedicated connection"""
+    print("🧪 Testing bulk connections...")
+    original = dict(Environment().param.get('grpc', {}))
+    server, port = _start_server()
+    try:
+        results = {}
+        for connections, bulk_connections in ((1, 0), (1, 1)):
+            _configure_connections(connections, bulk_connections)
+            # a new endpoint per configuration: the connections are pooled per endpoint
+            link = ThrottledLink(port)
+            editor = UnityEditorImpl(channel=f"127.0.0.1:{link.port}")
+            assert editor.get_service_status()
+            latencies = _status_latencies_during_uploads(editor)
+            results[bulk_connections] = (latencies, link.connections)
+            link.close()
+
+        (shared, shared_connections), (dedicated, dedicated_connections) = results[0], results[1]
+        assert shared_connections == 1 and dedicated_connections == 2
+
+        def p99(latencies):
+            return latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+
+        print(f"📊 Status calls during {UPLOAD_COUNT} x {UPLOAD_SIZE // 1024 // 1024}MiB uploads at "
+              f"{LINK_RATE // 1024 // 1024}MiB/s: shared connection {len(shared)} calls, p99 {p99(shared):.1f}ms, "
+              f"dedicated bulk connection {len(dedicated)} calls, p99 {p99(dedicated):.1f}ms")
+        assert len(dedicated) > len(shared) * 2
+        assert p99(dedicated) * 2 < p99(shared)
+    finally:
+        Environment.append_server_config(payload={'grpc': original})
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Bulk connections ✓")
+
+
+def test_batch_spread_over_connections():
+    """Test that the requests of a batch are spread over the connections of the endpoint"""
+    print("🧪 Testing batch over several connections...")
+    original = dict(Environment().param.get('grpc', {}))
+    server, port = _start_server()
+    try:
+        _configure_connections(connections=4, bulk_connections=0)
+        link = ThrottledLink(port)
+        editor = UnityEditorImpl(channel=f"127.0.0.1:{link.port}")
+        resps = editor.command_parser_batch(cmd=GRPCInterface.method_system_get_service_status,
+                                            params_list=[[] for _ in range(8)])
+        assert all(resp.status.code == 0 for resp in resps)
+        assert len(editor.channel_lanes.control) == 4 and link.connections == 4
+        assert editor.channel_lanes.control.in_flight == [0, 0, 0, 0]
+
+        # sequential calls stay on the first connection, which also tracks the reconnects
+        for _ in range(3):
+            assert editor.get_service_status()
+        assert link.connections == 4
+        assert editor.grpc_channel is editor.channel_lanes.control.primary
+        link.close()
+    finally:
+        Environment.append_server_config(payload={'grpc': original})
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Batch over several connections ✓")
+
+
+def test_nested_calls_share_the_lease():
+    """Test that the nested calls reuse the connection of the running call"""
+    print("🧪 Testing nested calls...")
+    original = dict(Environment().param.get('grpc', {}))
+    server, port = _start_server()
+    try:
+        _configure_connections(connections=4, bulk_connections=0)
+        link = ThrottledLink(port)
+        editor = NestingEditor(channel=f"127.0.0.1:{link.port}")
+        # get_service_status -> command_parser -> nested_status: all on the first connection
+        outer, restored = editor.nested_status()
+        assert restored is outer and editor.stub is outer
+        assert link.connections == 1 and len(editor.channel_lanes.control) == 1
+        assert editor.channel_lanes.control.in_flight == [0] and editor.channel_lease is None
+        link.close()
+    finally:
+        Environment.append_server_config(payload={'grpc': original})
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Nested calls ✓")
+
+
+def test_stale_loops_dropped():
+    """Test that the connections of the finished threads are dropped from the pool"""
+    print("🧪 Testing stale event loops...")
+    server, port = _start_server()
+    try:
+        endpoint = f"127.0.0.1:{port}"
+        editor = UnityEditorImpl(channel=endpoint)
+
+        def _call():
+            assert editor.get_service_status()
+
+        for _ in range(3):
+            thread = threading.Thread(target=_call)
+            thread.start()
+            thread.join()
+
+        # each new thread dropped the groups of the previous ones, the last one stays until the next new loop
+        pool = GrpcChannelPool()
+        thread_loop = editor.event_loop
+        assert [key[1] for key in pool._groups if key[0] == endpoint] == [thread_loop]
+        _call()
+        assert editor.event_loop is not thread_loop
+        assert [key[1] for key in pool._groups if key[0] == endpoint] == [editor.event_loop]
+        assert all(key[1] is editor.event_loop for key in pool._channels if key[0] == endpoint)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Stale event loops ✓")
+
+
+if __name__ == "__main__":
+    test_channel_group_leases()
+    test_bulk_connections()
+    test_batch_spread_over_connections()
+    test_nested_calls_share_the_lease()
+    test_stale_loops_dropped()
+    print("🎉 All channel lane tests passed!")
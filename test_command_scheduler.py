@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the dependency-aware scheduling of command graphs.
+"""
+
+import json
+import socket
+import threading
+import time
+
+from ugrpc_pipe import ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_scheduler import CommandGraph
+from engine_grpc.engine_pipe_server import build_response, resolve_command_parameters, run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+COMMAND_DELAY = 0.05
+CHAIN_COUNT = 6
+
+
+class PrefabServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    """Create objects and components with a fixed editor delay, failing the prefabs named 'broken'"""
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    calls = []
+
+    def CommandParser(self, request, context):
+        method = json.loads(request.payload)['method']
+        params = resolve_command_parameters(request)
+        with self.lock:
+            PrefabServicer.in_flight += 1
+            PrefabServicer.peak = max(PrefabServicer.peak, PrefabServicer.in_flight)
+            PrefabServicer.calls.append((method, params))
+        try:
+            time.sleep(COMMAND_DELAY)
+            if 'broken' in params:
+                return build_response(code=1, message='Failed to create the prefab')
+            return build_response({'id': f"{method}:{'/'.join(map(str, params))}"})
+        finally:
+            with self.lock:
+                PrefabServicer.in_flight -= 1
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=PrefabServicer, port=port, max_workers=16),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _prefab_graph(names):
+    """create -> add component -> set reference -> set value, for every prefab"""
+    graph = CommandGraph()
+    for name in names:
+        prefab = graph.add(f"{name}.create", GRPCInterface.method_object_create, params=[name])
+        body = graph.add(f"{name}.body", GRPCInterface.method_object_add_component,
+                         params=[prefab.ref('id'), 'Rigidbody'])
+        reference = graph.add(f"{name}.reference", GRPCInterface.method_object_set_reference_value,
+                              params=[body.ref('id'), 'target', prefab.ref('id')])
+        graph.add(f"{name}.mass", GRPCInterface.method_object_set_value,
+                  params=[body.ref('id'), 'mass', 2.0], after=[reference.name])
+    return graph
+
+
+def test_graph_validation():
+    """Test the dependencies declared by the references and the invalid graphs"""
+    print("🧪 Testing command graph validation...")
+    graph = _prefab_graph(['a'])
+    assert graph['a.reference'].dependencies == ['a.body', 'a.create']
+    assert graph['a.mass'].dependencies == ['a.reference', 'a.body']
+    assert graph.topological_order() == ['a.create', 'a.body', 'a.reference', 'a.mass']
+    assert graph.heights() == {'a.create': 4, 'a.body': 3, 'a.reference': 2, 'a.mass': 1}
+
+    try:
+        graph.add('a.create', GRPCInterface.method_object_create)
+        raise AssertionError("duplicated names should be rejected")
+    except ValueError:
+        pass
+
+    graph.add('orphan', GRPCInterface.method_object_set_value, after=['missing'])
+    try:
+        graph.validate()
+        raise AssertionError("unknown dependencies should be rejected")
+    except ValueError:
+        pass
+
+    cyclic = CommandGraph()
+    first = cyclic.add('first', GRPCInterface.method_object_create, after=['second'])
+    cyclic.add('second', GRPCInterface.method_object_create, params=[first.ref()])
+    try:
+        cyclic.validate()
+        raise AssertionError("cycles should be rejected")
+    except ValueError as e:
+        assert 'first' in str(e) and 'second' in str(e)
+    print("✅ Command graph validation ✓")
+
+
+def test_run_command_graph():
+    """Test that the independent chains run concurrently and the results flow into the later commands"""
+    print("🧪 Testing command graph run...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    names = [f"prefab_{index}" for index in range(CHAIN_COUNT)]
+    graph = _prefab_graph(names)
+
+    PrefabServicer.calls.clear()
+    started = time.perf_counter()
+    for name in names:
+        created = editor.command_parser(cmd=GRPCInterface.method_object_create, params=[name]).payload['id']
+        body = editor.command_parser(cmd=GRPCInterface.method_object_add_component,
+                                     params=[created, 'Rigidbody']).payload['id']
+        editor.command_parser(cmd=GRPCInterface.method_object_set_reference_value, params=[body, 'target', created])
+        editor.command_parser(cmd=GRPCInterface.method_object_set_value, params=[body, 'mass', 2.0])
+    sequential_ms = (time.perf_counter() - started) * 1000
+    sequential_calls = list(PrefabServicer.calls)
+
+    PrefabServicer.calls.clear()
+    PrefabServicer.peak = 0
+    report = editor.run_command_graph(graph=graph, max_concurrency=CHAIN_COUNT)
+    assert report.succeeded and len(report.results) == len(graph)
+    # the same commands with the same resolved parameters
+    assert sorted(PrefabServicer.calls) == sorted(sequential_calls)
+    assert report.results['prefab_0.body'].payload['id'] == 'AddComponent:CreateModelAsset:prefab_0/Rigidbody'
+    assert ['SetReferenceValue', ['AddComponent:CreateModelAsset:prefab_0/Rigidbody', 'target',
+                                  'CreateModelAsset:prefab_0']] in [list(call) for call in PrefabServicer.calls]
+
+    assert PrefabServicer.peak == report.max_concurrency == CHAIN_COUNT
+    assert [name.split('.')[1] for name in report.critical_path] == ['create', 'body', 'reference', 'mass']
+    assert report.critical_path_time <= report.elapsed < report.sequential_time
+    assert report.elapsed * 1000 * 2 < sequential_ms
+    print(f"📊 {CHAIN_COUNT} prefab chains x 4 commands: sequential {sequential_ms:.0f}ms, "
+          f"graph {report.elapsed * 1000:.0f}ms (critical path {report.critical_path_time * 1000:.0f}ms)")
+
+    # the limit is respected
+    PrefabServicer.peak = 0
+    report = editor.run_command_graph(graph=graph, max_concurrency=2)
+    assert report.succeeded and report.max_concurrency == 2 and PrefabServicer.peak <= 2
+    print("✅ Command graph run ✓")
+
+
+def test_failed_branch():
+    """Test that the dependents of a failed command are skipped while the other branches complete"""
+    print("🧪 Testing failed command branch...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    report = editor.run_command_graph(graph=_prefab_graph(['good', 'broken']))
+
+    assert not report.succeeded
+    assert list(report.errors) == ['broken.create']
+    assert report.skipped == ['broken.body', 'broken.reference', 'broken.mass']
+    assert all(f"good.{step}" in report.results for step in ('create', 'body', 'reference', 'mass'))
+    assert report.results['broken.create'].status.code == 1
+    print("✅ Failed command branch ✓")
+
+
+if __name__ == "__main__":
+    test_graph_validation()
+    test_run_command_graph()
+    test_failed_branch()
+    print("🎉 All command scheduler tests passed!")
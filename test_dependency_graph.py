@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched dependency graph traversal with memoized nodes.
+"""
+
+import socket
+import threading
+import time
+
+from engine_grpc.engine_pipe_server import UGrpcPipeImpl, build_response, resolve_command_parameters, run_grpc_server
+from engine_grpc.unity.asset_dependency_graph import build_dependency_graph
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+# direct dependencies as returned by AssetDatabase.GetDependencies(path, false)
+ASSET_DEPENDENCIES = {
+    "Assets/A.prefab": ["Assets/A.prefab", "Assets/M.mat", "Assets/Mesh.fbx"],
+    "Assets/B.prefab": ["Assets/B.prefab", "Assets/M.mat"],
+    "Assets/M.mat": ["Assets/M.mat", "Assets/T.png", "Assets/S.shader"],
+    "Assets/Mesh.fbx": ["Assets/Mesh.fbx"],
+    "Assets/T.png": ["Assets/T.png"],
+    "Assets/S.shader": ["Assets/S.shader"],
+}
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.requested = []
+        self.batches = 0
+
+    def __call__(self, paths):
+        self.batches += 1
+        self.requested.extend(paths)
+        return {path: ASSET_DEPENDENCIES.get(path, []) for path in paths}
+
+
+class DependencyServicer(UGrpcPipeImpl):
+    """Answer AssetDatabase.GetDependencies(path, false) from ASSET_DEPENDENCIES"""
+    requested = []
+    # paths answered with an error status
+    failing = set()
+
+    def CommandParser(self, request, context):
+        path, recursive = resolve_command_parameters(request)
+        DependencyServicer.requested.append(path)
+        if path in DependencyServicer.failing:
+            return build_response(code=1, message=f"Failed to load {path}")
+        return build_response(ASSET_DEPENDENCIES.get(path, []))
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=DependencyServicer, port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def test_shared_graph():
+    """Test that overlapping roots share nodes and every node is fetched once"""
+    print("🧪 Testing shared dependency graph...")
+
+    fetcher = FakeFetcher()
+    graph = build_dependency_graph(roots=["Assets/A.prefab", "Assets/B.prefab"],
+                                   fetch_direct_dependencies=fetcher)
+
+    assert sorted(fetcher.requested) == sorted(ASSET_DEPENDENCIES.keys())
+    assert fetcher.batches == 3, f"expected one batch per BFS level, got {fetcher.batches}"
+    assert graph.dependencies("Assets/B.prefab") == ["Assets/M.mat"]
+    assert set(graph.dependencies("Assets/A.prefab", recursive=True)) == {
+        "Assets/M.mat", "Assets/Mesh.fbx", "Assets/T.png", "Assets/S.shader"}
+    print("✅ Shared dependency graph ✓")
+
+
+def test_topological_order():
+    """Test that dependencies are ordered before their dependents"""
+    print("🧪 Testing topological order...")
+
+    graph = build_dependency_graph(roots=["Assets/A.prefab", "Assets/B.prefab"],
+                                   fetch_direct_dependencies=FakeFetcher())
+    order = graph.topological_order()
+    position = {path: index for index, path in enumerate(order)}
+
+    assert len(order) == len(ASSET_DEPENDENCIES)
+    for path, deps in graph.edges.items():
+        for dep in deps:
+            assert position[dep] < position[path], f"{dep} should come before {path}"
+    print("✅ Topological order ✓")
+
+
+def test_memoized_session():
+    """Test that a shared cache skips the already resolved nodes"""
+    print("🧪 Testing memoized session cache...")
+
+    cache = {}
+    build_dependency_graph(roots=["Assets/B.prefab"],
+                           fetch_direct_dependencies=FakeFetcher(), cache=cache)
+
+    fetcher = FakeFetcher()
+    build_dependency_graph(roots=["Assets/A.prefab"],
+                           fetch_direct_dependencies=fetcher, cache=cache, batch_size=1)
+
+    assert sorted(fetcher.requested) == ["Assets/A.prefab", "Assets/Mesh.fbx"]
+    print("✅ Memoized session cache ✓")
+
+
+def test_cyclic_dependencies():
+    """Test that cycles do not break the ordering"""
+    print("🧪 Testing cyclic dependencies...")
+
+    def fetch(paths):
+        return {"a": ["b"], "b": ["a"]}
+
+    order = build_dependency_graph(roots=["a"], fetch_direct_dependencies=fetch).topological_order()
+    assert sorted(order) == ["a", "b"]
+    print("✅ Cyclic dependencies ✓")
+
+
+def test_editor_dependency_graph():
+    """Test the batched traversal through the editor against the reference server"""
+    print("🧪 Testing editor dependency graph...")
+
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server()}")
+    DependencyServicer.requested.clear()
+    assert editor.get_direct_dependencies(paths=["Assets/A.prefab", "Assets/Unknown.png"]) == {
+        "Assets/A.prefab": ASSET_DEPENDENCIES["Assets/A.prefab"], "Assets/Unknown.png": []}
+
+    DependencyServicer.requested.clear()
+    graph = editor.get_dependency_graph(roots=["Assets/A.prefab", "Assets/B.prefab"])
+    assert sorted(DependencyServicer.requested) == sorted(ASSET_DEPENDENCIES.keys())
+    assert set(graph.dependencies("Assets/A.prefab", recursive=True)) == {
+        "Assets/M.mat", "Assets/Mesh.fbx", "Assets/T.png", "Assets/S.shader"}
+
+    # memoized on the editor: nothing is requested again until reloaded
+    DependencyServicer.requested.clear()
+    editor.get_dependency_graph(roots=["Assets/B.prefab"])
+    assert DependencyServicer.requested == []
+    editor.get_dependency_graph(roots=["Assets/B.prefab"], is_reload=True)
+    assert sorted(DependencyServicer.requested) == ["Assets/B.prefab", "Assets/M.mat", "Assets/S.shader", "Assets/T.png"]
+
+    # a failed lookup is reported and not memoized as an asset without dependencies
+    DependencyServicer.failing.add("Assets/M.mat")
+    try:
+        editor.get_dependency_graph(roots=["Assets/B.prefab"], is_reload=True)
+        raise AssertionError("a failed lookup should be reported")
+    except RuntimeError as e:
+        assert "Assets/M.mat" in str(e)
+    finally:
+        DependencyServicer.failing.clear()
+    graph = editor.get_dependency_graph(roots=["Assets/B.prefab"])
+    assert set(graph.dependencies("Assets/B.prefab", recursive=True)) == {
+        "Assets/M.mat", "Assets/T.png", "Assets/S.shader"}
+    print("✅ Editor dependency graph ✓")
+
+
+if __name__ == "__main__":
+    test_shared_graph()
+    test_topological_order()
+    test_memoized_session()
+    test_cyclic_dependencies()
+    test_editor_dependency_graph()
+    print("🎉 All dependency graph tests passed!")
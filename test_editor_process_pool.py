@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the pool of pre-launched editor processes, with stand-in editors serving the gRPC interface.
+"""
+
+import socket
+import sys
+import threading
+import time
+
+from engine_grpc.engine_pipe_process_pool import EditorProcessPool, EditorState
+from engine_grpc.utils.sys_process import kill_process_tree
+
+# editor stand-in answering the project info of its port
+EDITOR_CODE = """
+import sys
+from ugrpc_pipe import ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+
+class EditorServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    def CommandParser(self, request, context):
+        return build_response(ugrpc_pipe_pb2.ProjectInfoResp(
+            status=ugrpc_pipe_pb2.Status(code=0, message="OK"), projectRoot=f"/projects/{sys.argv[1]}"))
+
+run_grpc_server(service_impl=EditorServicer, port=int(sys.argv[1]))
+"""
+
+# editor stand-in answering the service status only
+BROKEN_EDITOR_CODE = """
+import sys
+from ugrpc_pipe import ugrpc_pipe_pb2_grpc
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+
+class EditorServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    def CommandParser(self, request, context):
+        if 'GetProjectInfo' in request.payload:
+            raise RuntimeError('project not loaded')
+        return build_response()
+
+run_grpc_server(service_impl=EditorServicer, port=int(sys.argv[1]))
+"""
+
+
+def _free_ports(count: int):
+    sockets = [socket.socket() for _ in range(count)]
+    for sock in sockets:
+        sock.bind(('127.0.0.1', 0))
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+
+def _wait_for(predicate, timeout: float = 30.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def test_editor_pool():
+    """Test leasing pre-warmed editors and recycling crashed or bloated ones"""
+    print("🧪 Testing editor process pool...")
+    ports = _free_ports(2)
+    pool = EditorProcessPool(command=[sys.executable, '-c', EDITOR_CODE, '{port}'], ports=ports,
+                             ready_timeout=30, check_interval=0.1)
+
+    started = time.perf_counter()
+    with pool:
+        boot_ms = (time.perf_counter() - started) * 1000
+        assert [editor['state'] for editor in pool.status()] == ['idle', 'idle']
+
+        # jobs lease warm editors from their own threads
+        results, lease_ms = [], []
+
+        def job():
+            leased = time.perf_counter()
+            with pool.lease(timeout=10) as editor:
+                lease_ms.append((time.perf_counter() - leased) * 1000)
+                results.append(editor.fetch_full_path('Assets/scene.unity'))
+
+        threads = [threading.Thread(target=job) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(set(results)) == sorted(f"/projects/{port}/Assets/scene.unity" for port in ports)
+        print(f"📊 Boot of {len(ports)} editors {boot_ms:.0f}ms, lease {max(lease_ms):.1f}ms at most")
+
+        # all editors leased
+        first, second = pool.acquire(), pool.acquire()
+        try:
+            pool.acquire(timeout=0.2)
+            raise AssertionError("the pool should be exhausted")
+        except TimeoutError:
+            pass
+        pool.release(first)
+        pool.release(second)
+
+        # a crashed idle editor is relaunched on its port, the other one keeps serving
+        crashed = pool.editors[0]
+        crashed_pid = crashed.pid
+        kill_process_tree(crashed_pid)
+        with pool.lease(timeout=10) as editor:
+            assert editor is pool.editors[1].engine
+        assert _wait_for(lambda: crashed.state == EditorState.idle and crashed.launches == 2)
+        assert crashed.pid != crashed_pid
+        with pool.lease(timeout=10) as editor:
+            assert editor.fetch_full_path('Assets/a.prefab').startswith(f"/projects/{crashed.port}")
+
+        # editors beyond the memory budget are recycled on release
+        pool.max_memory = 1
+        with pool.lease(timeout=10):
+            pass
+        assert _wait_for(lambda: sum(editor.launches for editor in pool.editors) == 4
+                         and all(editor.state == EditorState.idle for editor in pool.editors))
+
+    assert all(not editor.is_alive for editor in pool.editors)
+    print("✅ Editor process pool ✓")
+
+
+def test_failed_editors():
+    """Test that the editors failing to launch or to warm up are reported instead of leased"""
+    print("🧪 Testing failed editors...")
+    errors = []
+
+    def acquire(pool: EditorProcessPool):
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            errors.append(e)
+
+    # a missing binary fails the launch, the jobs are not left waiting
+    pool = EditorProcessPool(command=['/nonexistent/editor', '{port}'], ports=_free_ports(1), check_interval=0.1)
+    with pool:
+        assert [editor['state'] for editor in pool.status()] == ['failed']
+        thread = threading.Thread(target=acquire, args=(pool,), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive() and len(errors) == 1
+
+    # an editor never answering the project info is not ready
+    pool = EditorProcessPool(command=[sys.executable, '-c', BROKEN_EDITOR_CODE, '{port}'], ports=_free_ports(1),
+                             ready_timeout=5, check_interval=0.1)
+    with pool:
+        assert [editor['state'] for editor in pool.status()] == ['failed']
+    print("✅ Failed editors ✓")
+
+
+def test_closed_during_launch():
+    """Test that an editor launched once the pool was closed does not outlive it"""
+    print("🧪 Testing launch of a closed pool...")
+    pool = EditorProcessPool(command=[sys.executable, '-c', EDITOR_CODE, '{port}'], ports=_free_ports(1),
+                             ready_timeout=30, check_interval=0.1)
+    pool.start()
+    pool.close()
+    # i.e., a relaunch which passed its closed check right before close()
+    editor = pool.editors[0]
+    launches = pool.status()[0]['launches']
+    pool._launch(editor)
+    assert pool.status()[0]['launches'] == launches
+    assert _wait_for(lambda: not editor.is_alive, timeout=10)
+    print("✅ Launch of a closed pool ✓")
+
+
+if __name__ == "__main__":
+    test_editor_pool()
+    test_failed_editors()
+    test_closed_during_launch()
+    print("🎉 All editor process pool tests passed!")
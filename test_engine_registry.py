@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for per-instance engine state and the registry of engines keyed by endpoint.
+"""
+
+import socket
+import threading
+import time
+
+from ugrpc_pipe import ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+
+from engine_grpc import get_engine
+from engine_grpc.engine_pipe_registry import clear_engines, registered_engines, release_engine
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl, UnityEngineImpl
+
+
+def _project_servicer(name: str):
+    class ProjectServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+        """Answer the project info of a named editor"""
+
+        def CommandParser(self, request, context):
+            return build_response(ugrpc_pipe_pb2.ProjectInfoResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"),
+                                                                 projectRoot=f"/projects/{name}"))
+
+    return ProjectServicer
+
+
+def _start_server(name: str) -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=_project_servicer(name), port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def test_engines_keep_their_own_state():
+    """Test that editors on different endpoints do not share their stubs"""
+    print("🧪 Testing per-instance engine state...")
+    first = UnityEditorImpl(channel=f"127.0.0.1:{_start_server('first')}")
+    second = UnityEditorImpl(channel=f"127.0.0.1:{_start_server('second')}")
+
+    for _ in range(3):
+        assert first.get_project_info().project_root == '/projects/first'
+        assert second.get_project_info().project_root == '/projects/second'
+    assert first.stub is not second.stub
+    print("✅ Per-instance engine state ✓")
+
+
+def test_registry_by_endpoint():
+    """Test that the registry shares one engine per engine type and endpoint"""
+    print("🧪 Testing engine registry...")
+    clear_engines()
+    editor = get_engine(UnityEditorImpl, '127.0.0.1:50071')
+    assert get_engine(UnityEditorImpl, '127.0.0.1:50071') is editor
+    assert get_engine(UnityEditorImpl, '127.0.0.1:50072') is not editor
+    assert get_engine(UnityEngineImpl, '127.0.0.1:50071') is not editor
+    assert editor.channel == '127.0.0.1:50071'
+    assert len(registered_engines()) == 3
+
+    assert release_engine(UnityEditorImpl, '127.0.0.1:50071')
+    assert not release_engine(UnityEditorImpl, '127.0.0.1:50071')
+    assert get_engine(UnityEditorImpl, '127.0.0.1:50071') is not editor
+    clear_engines()
+    print("✅ Engine registry ✓")
+
+
+if __name__ == "__main__":
+    test_engines_keep_their_own_state()
+    test_registry_by_endpoint()
+    print("🎉 All engine registry tests passed!")
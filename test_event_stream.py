@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for the engine-to-client event stream served next to CommandParser.
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from ugrpc_pipe import ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import UGrpcPipeImpl, build_response, run_grpc_server
+from engine_grpc.engine_stub_interface import EngineEventType, GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+EVENT_COUNT = 200
+
+
+class EditorEventServicer(UGrpcPipeImpl):
+    """Publish an event for every imported asset and a compile event after a refresh"""
+    instances = []
+
+    def __init__(self):
+        super().__init__()
+        EditorEventServicer.instances.append(self)
+
+    def CommandParser(self, request, context):
+        payload = json.loads(request.payload)
+        if payload['method'] == 'ImportAsset':
+            self.events.publish(EngineEventType.asset_imported, path=payload['parameters'][0])
+        elif payload['method'] == 'Refresh':
+            self.events.publish(EngineEventType.scene_saved, path='Assets/main.unity')
+            self.events.publish(EngineEventType.compile_finished, succeeded=True)
+        return build_response()
+
+
+# async editor stand-in publishing an event for every command
+ASYNC_SERVER_CODE = """
+import sys
+from engine_grpc.engine_pipe_server import AsyncUGrpcPipeImpl, build_response, run_grpc_server
+
+class AsyncEventServicer(AsyncUGrpcPipeImpl):
+    async def CommandParser(self, request, context):
+        self.events.publish('play_mode_changed', editor=sys.argv[2])
+        return build_response()
+
+run_grpc_server(service_impl=AsyncEventServicer, port=int(sys.argv[1]), use_async=True)
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_listening(port: int):
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _start_server(service_impl) -> int:
+    port = _free_port()
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=service_impl, port=port),
+                     daemon=True).start()
+    _wait_listening(port)
+    return port
+
+
+def _start_async_server(port: int, name: str) -> subprocess.Popen:
+    server = subprocess.Popen([sys.executable, '-c', ASYNC_SERVER_CODE, str(port), name],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_listening(port)
+    except RuntimeError:
+        server.kill()
+        raise
+    return server
+
+
+def test_event_stream():
+    """Test that the subscribed events are pushed in order and the other ones are filtered out"""
+    print("🧪 Testing event stream...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server(EditorEventServicer)}")
+    servicer = EditorEventServicer.instances[-1]
+
+    with editor.subscribe_events([EngineEventType.asset_imported, EngineEventType.compile_finished]) as events:
+        assert events.wait_connected(timeout=10)
+        assert servicer.events.subscribers == 1
+
+        for index in range(3):
+            editor.command_parser(cmd=GRPCInterface.method_editor_assetdatabase_import_assets,
+                                  params=[f"Assets/mesh_{index}.fbx"])
+        editor.refresh_asset_database()
+
+        received = [events.get(timeout=5) for _ in range(4)]
+        assert [event.event for event in received] == [EngineEventType.asset_imported] * 3 + [
+            EngineEventType.compile_finished]
+        assert [event.data for event in received[:3]] == [{'path': f"Assets/mesh_{index}.fbx"} for index in range(3)]
+        assert received[-1].data == {'succeeded': True}
+        # scene_saved was not subscribed
+        assert [event.sequence for event in received] == [1, 2, 3, 5]
+        assert events.get(timeout=0.2) is None
+
+        # latency between the publish on the server and the delivery to the client
+        latencies = []
+        for _ in range(EVENT_COUNT):
+            servicer.events.publish(EngineEventType.asset_imported, path='Assets/a.prefab')
+            latencies.append(time.time() - events.get(timeout=5).timestamp)
+        latencies.sort()
+        print(f"📊 Event delivery latency: median {latencies[len(latencies) // 2] * 1000:.2f}ms, "
+              f"max {latencies[-1] * 1000:.2f}ms (polling interval of wait_for_grpc_ready: 15s)")
+
+    assert events.closed and not events.connected
+    deadline = time.time() + 5
+    while servicer.events.subscribers and time.time() < deadline:
+        time.sleep(0.05)
+    assert servicer.events.subscribers == 0
+    print("✅ Event stream ✓")
+
+
+def test_callback_and_wait():
+    """Test the event callback and waiting for a specific event"""
+    print("🧪 Testing event callback...")
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server(EditorEventServicer)}")
+
+    received = []
+    with editor.subscribe_events(callback=received.append) as events:
+        assert events.wait_connected(timeout=10)
+        editor.refresh_asset_database()
+        deadline = time.time() + 5
+        while len(received) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    assert [event.event for event in received] == [EngineEventType.scene_saved, EngineEventType.compile_finished]
+
+    with editor.subscribe_events() as events:
+        assert events.wait_connected(timeout=10)
+        editor.refresh_asset_database()
+        compiled = events.wait(EngineEventType.compile_finished, timeout=5)
+        assert compiled is not None and compiled.data['succeeded']
+        assert events.wait(EngineEventType.play_mode_changed, timeout=0.2) is None
+    print("✅ Event callback ✓")
+
+
+def test_reconnect_after_restart():
+    """Test that the subscription of the async server survives an editor restart"""
+    print("🧪 Testing event stream reconnect...")
+    port = _free_port()
+    server = _start_async_server(port, 'first')
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+    try:
+        with editor.subscribe_events([EngineEventType.play_mode_changed], reconnect_interval=0.1) as events:
+            assert events.wait_connected(timeout=10)
+            editor.get_service_status()
+            assert events.get(timeout=5).data == {'editor': 'first'}
+
+            server.terminate()
+            server.wait(timeout=10)
+            server = _start_async_server(port, 'second')
+
+            assert events.wait_connected(timeout=10)
+            # the first call of the engine's own channel notices the lost connection
+            assert editor.get_service_status() or editor.get_service_status()
+            assert events.get(timeout=5).data == {'editor': 'second'}
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Event stream reconnect ✓")
+
+
+def test_unsupported_engine():
+    """Test that the subscription ends on an engine without event stream"""
+    print("🧪 Testing unsupported engine...")
+
+    class PlainServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+        def CommandParser(self, request, context):
+            return build_response()
+
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{_start_server(PlainServicer)}")
+    events = editor.subscribe_events()
+    assert list(events) == []
+    assert events.error is not None and not events.connected
+    events.close()
+    print("✅ Unsupported engine ✓")
+
+
+if __name__ == "__main__":
+    test_event_stream()
+    test_callback_and_wait()
+    test_reconnect_after_restart()
+    test_unsupported_engine()
+    print("🎉 All event stream tests passed!")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Test script for the pipelined frame streaming through RouteImageBytes.
+"""
+
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ugrpc_pipe import RenderBytesReply, ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import resolve_frame_sequence, run_grpc_server
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEngineImpl
+from engine_grpc.unity.frame_pipeline import FramePipeline
+
+CAPTURE_TIME = 0.01
+ENCODE_TIME = 0.015
+ROUND_TRIP_TIME = 0.02
+FRAME_COUNT = 40
+FRAME_SIZE = 256 * 1024
+
+
+class FrameServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    """Record the received frames after a fixed display delay, rejecting the empty ones"""
+    received = []
+    sequences = []
+    delay = ROUND_TRIP_TIME
+
+    def RouteImageBytes(self, request, context):
+        time.sleep(FrameServicer.delay)
+        if not request.main_image_data:
+            return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=1, message='Empty frame'))
+        FrameServicer.received.append(request.main_image_data[:8])
+        FrameServicer.sequences.append(resolve_frame_sequence(context))
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message='OK'))
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=FrameServicer, port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _capture(index: int) -> bytes:
+    time.sleep(CAPTURE_TIME)
+    return index.to_bytes(8, 'big') * (FRAME_SIZE // 8)
+
+
+def encode_frame(frame: bytes) -> RenderBytesReply:
+    time.sleep(ENCODE_TIME)
+    return RenderBytesReply(main_image_data=frame)
+
+
+def encode_frame_fields(frame: bytes) -> dict:
+    time.sleep(ENCODE_TIME)
+    return {'main_image_data': frame}
+
+
+def _frame_index(data: bytes) -> int:
+    return int.from_bytes(data[:8], 'big')
+
+
+def test_pipelined_streaming():
+    """Test that the pipeline overlaps capture, encoding and sending"""
+    print("🧪 Testing pipelined frame streaming...")
+    engine = UnityEngineImpl(channel=f"127.0.0.1:{_start_server()}")
+
+    FrameServicer.received.clear()
+    started = time.perf_counter()
+    for index in range(FRAME_COUNT):
+        resp = engine.RouteImageBytes(render_bytes_reply=encode_frame(_capture(index)))
+        assert resp.status.code == 0
+    sequential_fps = FRAME_COUNT / (time.perf_counter() - started)
+
+    FrameServicer.received.clear()
+    FrameServicer.sequences.clear()
+    results = []
+    with engine.frame_pipeline(encode=encode_frame, max_in_flight=2, callback=results.append) as frames:
+        for index in range(FRAME_COUNT):
+            captured_at = time.perf_counter()
+            frames.submit(_capture(index), captured_at=captured_at)
+        assert frames.flush(timeout=10) and frames.pending == 0
+
+    stats = frames.stats
+    assert frames.closed and stats.submitted == FRAME_COUNT
+    assert stats.completed + stats.dropped == FRAME_COUNT and stats.failed == 0
+    assert len(FrameServicer.received) == stats.completed == len(results)
+    # the last captured frame is never dropped
+    assert max(map(_frame_index, FrameServicer.received)) == FRAME_COUNT - 1
+    # the frames in flight can arrive out of order, their sequence numbers travel along
+    assert [index + 1 for index in map(_frame_index, FrameServicer.received)] == FrameServicer.sequences
+    assert sorted(FrameServicer.sequences) == sorted(result.sequence for result in results)
+
+    summary = stats.summary()
+    assert set(summary) == {'capture', 'queue', 'encode', 'send', 'total'}
+    assert summary['encode']['p50_ms'] >= ENCODE_TIME * 1000 and summary['send']['p50_ms'] >= ROUND_TRIP_TIME * 1000
+    assert stats.fps > sequential_fps * 1.5
+    print(f"📊 Sequential {sequential_fps:.1f} fps, pipelined {stats.fps:.1f} fps ({stats.dropped} dropped), "
+          + ", ".join(f"{stage} p50 {values['p50_ms']:.1f}ms" for stage, values in summary.items()))
+    print("✅ Pipelined frame streaming ✓")
+
+
+def test_drop_oldest():
+    """Test that the waiting frames are replaced by the newer ones under backpressure"""
+    print("🧪 Testing drop-oldest backpressure...")
+    engine = UnityEngineImpl(channel=f"127.0.0.1:{_start_server()}")
+
+    FrameServicer.received.clear()
+    frames = engine.frame_pipeline(max_in_flight=1, max_queue_size=2)
+    try:
+        sequences = [frames.submit(_capture(index)[:64]) for index in range(10)]
+        assert sequences == list(range(1, 11))
+        assert frames.flush(timeout=10)
+    finally:
+        frames.close()
+
+    received = [_frame_index(data) for data in FrameServicer.received]
+    # the first frames started right away, the latest two waited for their turn
+    assert received == sorted(received) and received[-2:] == [8, 9]
+    assert frames.stats.dropped == 10 - len(received) > 0
+
+    try:
+        frames.submit(b'frame')
+        raise AssertionError("a closed pipeline should reject the frames")
+    except RuntimeError:
+        pass
+    print("✅ Drop-oldest backpressure ✓")
+
+
+def test_submit_outside_the_running_pipeline():
+    """Test that the frames submitted before the start or during the close are rejected clearly"""
+    print("🧪 Testing submit outside the running pipeline...")
+    engine = UnityEngineImpl(channel=f"127.0.0.1:{_start_server()}")
+    try:
+        FramePipeline(engine).submit(b'frame')
+        raise AssertionError("a pipeline not started should reject the frames")
+    except RuntimeError as e:
+        assert 'not started' in str(e)
+
+    frames = engine.frame_pipeline()
+    frames.close()
+    # i.e., a submit passing the closed check right before close() stopped the loop
+    frames._closed = False
+    try:
+        frames.submit(b'frame')
+        raise AssertionError("a closed pipeline should reject the frames")
+    except RuntimeError as e:
+        assert 'closed' in str(e) and 'Event loop' not in str(e)
+    print("✅ Submit outside the running pipeline ✓")
+
+
+def test_failed_frames():
+    """Test that rejected and unsent frames are reported without stopping the stream"""
+    print("🧪 Testing failed frames...")
+    engine = UnityEngineImpl(channel=f"127.0.0.1:{_start_server()}")
+    results = []
+    with engine.frame_pipeline(callback=results.append, max_queue_size=8) as frames:
+        for data in (b'first', b'', b'last'):
+            frames.submit(data)
+    assert frames.stats.failed == 1 and frames.stats.completed == 2
+    assert sorted(result.resp.status.code for result in results) == [0, 0, 1]
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        unused_port = sock.getsockname()[1]
+    results.clear()
+    with UnityEngineImpl(channel=f"127.0.0.1:{unused_port}").frame_pipeline(callback=results.append) as frames:
+        frames.submit(b'frame')
+    assert len(results) == 1 and results[0].error is not None and results[0].resp is None
+    assert frames.stats.failed == 1
+
+    # an invalid channel is reported by the start instead of blocking it
+    errors = []
+
+    def _start_invalid():
+        try:
+            UnityEngineImpl(channel='localhost').frame_pipeline()
+        except ValueError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=_start_invalid, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive() and len(errors) == 1
+    print("✅ Failed frames ✓")
+
+
+def test_process_pool_encoder():
+    """Test the encoding in a process pool"""
+    print("🧪 Testing process pool encoder...")
+    engine = UnityEngineImpl(channel=f"127.0.0.1:{_start_server()}")
+    FrameServicer.received.clear()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        with engine.frame_pipeline(encode=encode_frame_fields, executor=executor, max_queue_size=8) as frames:
+            for index in range(6):
+                frames.submit(_capture(index)[:64])
+    assert sorted(map(_frame_index, FrameServicer.received)) == list(range(6))
+    print("✅ Process pool encoder ✓")
+
+
+if __name__ == "__main__":
+    test_pipelined_streaming()
+    test_drop_oldest()
+    test_submit_outside_the_running_pipeline()
+    test_failed_frames()
+    test_process_pool_encoder()
+    print("🎉 All frame pipeline tests passed!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark guarding the lazy attribute loading of engine_grpc.
+Every measurement runs in a fresh interpreter so nothing is cached in sys.modules.
+"""
+
+import subprocess
+import sys
+
+# modules which should only be loaded once the client or server is really used
+HEAVY_CLIENT_MODULES = ['grpclib', 'betterproto', 'ugrpc_pipe', 'google.protobuf', 'compipe', 'wrapt']
+HEAVY_SERVER_MODULES = ['grpc']
+
+# generous upper bound of the bare package import (microseconds)
+MAX_PACKAGE_IMPORT_US = 50000
+
+
+def _loaded_modules(statement: str, modules: list) -> list:
+    code = f"import sys\n{statement}\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    output = subprocess.check_output([sys.executable, '-c', code], text=True).strip()
+    return [m for m in output.split(',') if m]
+
+
+def _cumulative_import_us(module: str) -> int:
+    """Retrieve the cumulative import time reported by `-X importtime`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split(':', 1)[-1].split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"Not found import time of {module}")
+
+
+def test_package_import_is_lazy():
+    """Test that importing the package does not pull in the gRPC stacks"""
+    print("🧪 Testing lazy package import...")
+
+    loaded = _loaded_modules('import engine_grpc', HEAVY_CLIENT_MODULES + HEAVY_SERVER_MODULES)
+    assert not loaded, f"engine_grpc eagerly imported: {loaded}"
+
+    # the resolved attributes are cached in the globals, listed once by dir()
+    code = ("import engine_grpc\nengine_grpc.GI\nnames = dir(engine_grpc)\n"
+            "print(len(names) == len(set(names)) and set(engine_grpc.__all__) <= set(names))")
+    assert subprocess.check_output([sys.executable, '-c', code], text=True).strip() == 'True'
+    print("✅ Package import is lazy ✓")
+
+
+def test_interface_import_is_lazy():
+    """Test that the command enum can be used without loading the client stack"""
+    print("🧪 Testing GI import...")
+
+    loaded = _loaded_modules('from engine_grpc import GI\nGI.method_system_get_projectinfo',
+                             HEAVY_CLIENT_MODULES + HEAVY_SERVER_MODULES)
+    assert not loaded, f"GI eagerly imported: {loaded}"
+    print("✅ GI import is lazy ✓")
+
+
+def test_client_server_paths_apart():
+    """Test that the client does not load grpcio and the server does not load the client engines"""
+    print("🧪 Testing client/server import separation...")
+
+    loaded = _loaded_modules('from engine_grpc import UEI', HEAVY_SERVER_MODULES)
+    assert not loaded, f"client path imported server modules: {loaded}"
+
+    loaded = _loaded_modules('import engine_grpc.engine_pipe_server',
+                             ['engine_grpc.engine_pipe_impl', 'engine_grpc.engine_pipe_channel', 'engine_grpc.unity'])
+    assert not loaded, f"server path imported unused modules: {loaded}"
+    print("✅ Client and server import paths are apart ✓")
+
+
+def test_package_import_time():
+    """Benchmark the bare package import against the full client import"""
+    print("🧪 Benchmarking import time...")
+
+    package_us = _cumulative_import_us('engine_grpc')
+    client_us = _cumulative_import_us('engine_grpc.unity.engine_pipe_unity_impl')
+    print(f"📊 import engine_grpc: {package_us} us")
+    print(f"📊 import engine_grpc.unity.engine_pipe_unity_impl: {client_us} us")
+
+    assert package_us < MAX_PACKAGE_IMPORT_US, f"import engine_grpc took {package_us} us"
+    print("✅ Import time ✓")
+
+
+if __name__ == "__main__":
+    test_package_import_is_lazy()
+    test_interface_import_is_lazy()
+    test_client_server_paths_apart()
+    test_package_import_time()
+    print("🎉 All import tests passed!")
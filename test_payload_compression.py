@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the payload compression negotiation between client and server.
+"""
+
+import socket
+import threading
+import time
+
+from google.protobuf import any_pb2, struct_pb2
+from ugrpc_pipe import ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+from engine_grpc.utils.payload_compression import (COMPRESSION_STATS, DECOMPRESSION_STATS,
+                                                   available_codecs, compress_payload,
+                                                   decompress_payload, negotiate_codec)
+
+# a scene hierarchy like payload with many repeated keys
+HIERARCHY = {
+    "nodes": [{"name": f"GameObject_{index}", "path": f"Root/Group_{index // 10}/GameObject_{index}",
+               "active": True, "components": ["Transform", "MeshRenderer", "MeshFilter"]}
+              for index in range(2000)]
+}
+
+
+class HierarchyServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    def CommandParser(self, request, context):
+        struct_pb = struct_pb2.Struct()
+        struct_pb.update(HIERARCHY)
+        payload_any = any_pb2.Any()
+        payload_any.Pack(struct_pb)
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"), payload=payload_any)
+
+
+def _start_server(**kwargs) -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server,
+                     kwargs=dict(service_impl=HierarchyServicer, port=port, **kwargs),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def test_codec_roundtrip():
+    """Test that every available codec restores the payload"""
+    print("🧪 Testing codec roundtrip...")
+    value = b'{"name": "GameObject"}' * 1000
+    for codec in available_codecs():
+        type_url, compressed = compress_payload('type.googleapis.com/google.protobuf.Struct', value, codec)
+        assert len(compressed) < len(value)
+        assert decompress_payload(type_url, compressed) == ('type.googleapis.com/google.protobuf.Struct', value)
+    assert negotiate_codec(['gzip', 'unknown']) == 'gzip'
+    assert negotiate_codec(['unknown']) is None
+    print("✅ Codec roundtrip ✓")
+
+
+def test_negotiated_compression():
+    """Test that large payloads are compressed for clients accepting a codec"""
+    print("🧪 Testing negotiated compression...")
+    port = _start_server(compression='gzip', compression_threshold=1024)
+    client = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+    COMPRESSION_STATS.reset()
+    DECOMPRESSION_STATS.reset()
+
+    resp = client.command_parser(cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy)
+    assert resp.payload["nodes"][1999]["name"] == "GameObject_1999"
+    assert len(resp.payload["nodes"]) == 2000
+
+    ratio = DECOMPRESSION_STATS.ratio('gzip')
+    print(f"📊 gzip ratio: {ratio:.1f}x, server stats: {COMPRESSION_STATS.snapshot()}")
+    assert ratio is not None and ratio > 5
+
+    # per-command opt-out keeps the payload uncompressed
+    resp = client.command_parser(cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy, compression=False)
+    assert len(resp.payload["nodes"]) == 2000
+    assert DECOMPRESSION_STATS.snapshot()['gzip']['count'] == 1
+    print("✅ Negotiated compression ✓")
+
+
+def test_threshold():
+    """Test that payloads below the threshold are not compressed"""
+    print("🧪 Testing compression threshold...")
+    port = _start_server(compression=True, compression_threshold=64 * 1024 * 1024)
+    DECOMPRESSION_STATS.reset()
+
+    resp = UnityEditorImpl(channel=f"127.0.0.1:{port}").command_parser(
+        cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy)
+    assert len(resp.payload["nodes"]) == 2000
+    assert DECOMPRESSION_STATS.snapshot() == {}
+    print("✅ Compression threshold ✓")
+
+
+if __name__ == "__main__":
+    test_codec_roundtrip()
+    test_negotiated_compression()
+    test_threshold()
+    print("🎉 All payload compression tests passed!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached project info of the editor and the bulk path resolution.
+"""
+
+import socket
+import subprocess
+import sys
+import time
+
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+PATH_COUNT = 2000
+
+# editor stand-in answering the project info of the project named by argv[2]
+SERVER_CODE = """
+import sys
+from ugrpc_pipe import ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+
+class ProjectServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    def CommandParser(self, request, context):
+        return build_response(ugrpc_pipe_pb2.ProjectInfoResp(
+            status=ugrpc_pipe_pb2.Status(code=0, message="OK"), projectRoot=f"/projects/{sys.argv[2]}"))
+
+run_grpc_server(service_impl=ProjectServicer, port=int(sys.argv[1]))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, project: str) -> subprocess.Popen:
+    server = subprocess.Popen([sys.executable, '-c', SERVER_CODE, str(port), project],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return server
+        time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("Test server did not start")
+
+
+def _project_info_rpcs(editor: UnityEditorImpl) -> int:
+    phases = editor.profiler.summary().get('get_project_info;method_system_get_projectinfo', {})
+    return phases.get('rpc', {}).get('calls', 0)
+
+
+def test_project_info_cache():
+    """Test that path resolution retrieves the project info once per connection"""
+    print("🧪 Testing project info cache...")
+    port = _free_port()
+    paths = [f"Assets/Models/mesh_{index}.fbx" for index in range(PATH_COUNT)]
+    server = _start_server(port, 'first')
+    try:
+        editor = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+        editor.enable_profiling()
+
+        started = time.perf_counter()
+        full_paths = [editor.fetch_full_path(path) for path in paths]
+        single_ms = (time.perf_counter() - started) * 1000
+        assert full_paths[0] == '/projects/first/Assets/Models/mesh_0.fbx'
+        assert _project_info_rpcs(editor) == 1
+
+        started = time.perf_counter()
+        assert editor.fetch_full_paths(paths) == full_paths
+        bulk_ms = (time.perf_counter() - started) * 1000
+        assert _project_info_rpcs(editor) == 1
+        print(f"📊 {PATH_COUNT} paths: fetch_full_path {single_ms:.1f}ms, fetch_full_paths {bulk_ms:.1f}ms")
+
+        editor.get_project_info(is_reload=True)
+        assert _project_info_rpcs(editor) == 2
+
+        try:
+            editor.fetch_full_paths(paths + ['Packages/package.json'])
+            raise AssertionError("paths outside of the asset root should be rejected")
+        except ValueError:
+            pass
+        first_generation = editor.channel_lanes.control.generation
+        assert first_generation > 0
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    # another editor on the same endpoint invalidates the cache
+    server = _start_server(port, 'second')
+    try:
+        assert editor.fetch_full_paths(paths[:1]) == ['/projects/second/Assets/Models/mesh_0.fbx']
+        assert _project_info_rpcs(editor) == 3
+        # the reconnect is numbered as a new connection generation of the endpoint
+        assert editor.channel_lanes.control.generation > first_generation
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Project info cache ✓")
+
+
+if __name__ == "__main__":
+    test_project_info_cache()
+    print("🎉 All project info cache tests passed!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for quit_without_saving waiting on the editor exit instead of a fixed sleep.
+"""
+
+import socket
+import subprocess
+import sys
+import time
+
+import psutil
+
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+# editor stand-in quitting (after a short delay) or ignoring the quit command
+EDITOR_CODE = """
+import os, sys, threading
+from ugrpc_pipe import ugrpc_pipe_pb2_grpc
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+
+class EditorServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    def CommandParser(self, request, context):
+        if 'QuitWithoutSaving' in request.payload and sys.argv[2] == 'quit':
+            threading.Timer(0.2, os._exit, args=(0,)).start()
+        return build_response()
+
+run_grpc_server(service_impl=EditorServicer, port=int(sys.argv[1]))
+"""
+
+
+def _start_editor(behavior: str):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen([sys.executable, '-c', EDITOR_CODE, str(port), behavior],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return process, port
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Editor stand-in did not start")
+
+
+def test_quit_returns_on_exit():
+    """Test that quitting returns as soon as the editor exited"""
+    print("🧪 Testing quit on editor exit...")
+    for use_pid in (True, False):
+        process, port = _start_editor('quit')
+        editor = UnityEditorImpl(channel=f"127.0.0.1:{port}", pid=process.pid if use_pid else None)
+
+        started = time.perf_counter()
+        assert editor.quit_without_saving(waiting_time=10)
+        elapsed = time.perf_counter() - started
+        assert process.wait(timeout=5) == 0
+        print(f"📊 Quit {'with' if use_pid else 'without'} the editor pid: {elapsed:.2f}s instead of 10s")
+        assert elapsed < 5
+    print("✅ Quit on editor exit ✓")
+
+
+def test_hanging_editor_is_killed():
+    """Test that an editor ignoring the quit command is killed after the waiting time"""
+    print("🧪 Testing hanging editor...")
+    process, port = _start_editor('hang')
+    editor = UnityEditorImpl(channel=f"127.0.0.1:{port}", pid=process.pid)
+
+    started = time.perf_counter()
+    assert not editor.quit_without_saving(waiting_time=1)
+    assert 1 <= time.perf_counter() - started < 5
+    process.wait(timeout=5)
+    assert not psutil.pid_exists(process.pid)
+    print("✅ Hanging editor ✓")
+
+
+if __name__ == "__main__":
+    test_quit_returns_on_exit()
+    test_hanging_editor_is_killed()
+    print("🎉 All quit editor tests passed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the server-side response builder, with benchmarks against hand-rolled responses.
+"""
+
+import array
+import timeit
+
+import numpy
+from betterproto.lib.google import protobuf
+from google.protobuf import any_pb2, struct_pb2, wrappers_pb2
+from ugrpc_pipe import ugrpc_pipe_pb2
+
+from engine_grpc.engine_pipe_impl import BaseEngineImpl
+from engine_grpc.engine_pipe_server import build_response, pack_payload
+
+
+def _unpack(payload: any_pb2.Any):
+    """Unpack the payload the way the client does"""
+    return BaseEngineImpl.unpack(protobuf.Any(type_url=payload.type_url, value=payload.value))
+
+
+def _hand_rolled_struct(data: dict) -> ugrpc_pipe_pb2.GenericResp:
+    """Response building shown in STRUCT_PAYLOAD_USAGE.md"""
+    struct_pb = struct_pb2.Struct()
+    for key, value in data.items():
+        struct_pb[key] = value
+    payload_any = any_pb2.Any()
+    payload_any.Pack(struct_pb)
+    return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"), payload=payload_any)
+
+
+def _hand_rolled_double(value: float) -> ugrpc_pipe_pb2.GenericResp:
+    payload_any = any_pb2.Any()
+    payload_any.Pack(wrappers_pb2.DoubleValue(value=value))
+    return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"), payload=payload_any)
+
+
+def _hand_rolled_float_array(values) -> ugrpc_pipe_pb2.GenericResp:
+    payload_any = any_pb2.Any()
+    payload_any.Pack(ugrpc_pipe_pb2.FloatArrayRep(values=values.tolist()))
+    return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"), payload=payload_any)
+
+
+def _best_us(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def test_payload_roundtrip():
+    """Test that every supported value is unpacked unchanged by the client"""
+    print("🧪 Testing payload packing...")
+    values = ["text", "", b"\x00\x01", True, False, 0, 42, -7, 2 ** 63 + 1, 1.5, 0.0,
+              {"name": "Cube", "position": [1.0, 2.0, 3.0], "parent": None}, [1.0, "a", True]]
+    for value in values:
+        assert _unpack(pack_payload(value)) == value, value
+
+    assert _unpack(pack_payload(numpy.float64(2.5))) == 2.5
+    assert _unpack(pack_payload(numpy.arange(6, dtype=numpy.float32).reshape(2, 3))) == [0, 1, 2, 3, 4, 5]
+    assert _unpack(pack_payload(numpy.array([-1, 2], dtype=numpy.int64))) == [-1, 2]
+    assert _unpack(pack_payload(array.array('f', [0.5, 1.5]))) == [0.5, 1.5]
+    assert _unpack(pack_payload(numpy.array([True, False]))) == [1, 0]
+    # wider than int32: exact ListValue numbers instead of wrapped values
+    assert _unpack(pack_payload(numpy.array([2 ** 40, -1], dtype=numpy.int64))) == [2 ** 40, -1]
+    assert _unpack(pack_payload(numpy.array([2 ** 32 - 1], dtype=numpy.uint32))) == [2 ** 32 - 1]
+    assert _unpack(pack_payload(array.array('q', [2 ** 31]))) == [2 ** 31]
+    for values in (numpy.array([2 ** 62], dtype=numpy.int64), numpy.array([2 ** 64 - 1], dtype=numpy.uint64)):
+        try:
+            pack_payload(values)
+            raise AssertionError("inexact integer arrays should be rejected")
+        except OverflowError:
+            pass
+    assert _unpack(pack_payload(ugrpc_pipe_pb2.StringArrayRep(values=['a', 'b']))) == ['a', 'b']
+
+    # the wire encoding is parsed back by protobuf into the same messages
+    values = numpy.random.rand(1000).astype(numpy.float32)
+    assert pack_payload(values) == _hand_rolled_float_array(values).payload
+    nested = {"a": {"b": [1.0, None, {"c": "ü" * 200}]}, "d": False}
+    parsed = struct_pb2.Struct()
+    parsed.ParseFromString(pack_payload(nested).value)
+    expected = struct_pb2.Struct()
+    _hand_rolled_struct(nested).payload.Unpack(expected)
+    assert parsed == expected
+
+    resp = build_response(code=1, message="failed")
+    assert resp.status.code == 1 and resp.status.message == "failed"
+    print("✅ Payload packing ✓")
+
+
+def test_builder_benchmark():
+    """Benchmark the builder against the hand-rolled responses"""
+    print("🧪 Benchmarking response building...")
+    data = {"name": "Cube", "active": True, "layer": 3.0, "transform": {"position": [1.0, 2.0, 3.0]}}
+    vertices = numpy.random.rand(300000).astype(numpy.float32)
+
+    cases = [("Struct", lambda: _hand_rolled_struct(data), lambda: build_response(data), 5000),
+             ("DoubleValue", lambda: _hand_rolled_double(1.5), lambda: build_response(1.5), 20000),
+             ("FloatArrayRep", lambda: _hand_rolled_float_array(vertices), lambda: build_response(vertices), 5)]
+
+    for name, hand_rolled, builder, number in cases:
+        assert _unpack(hand_rolled().payload) == _unpack(builder().payload)
+        hand_rolled_us, builder_us = _best_us(hand_rolled, number), _best_us(builder, number)
+        print(f"📊 {name}: hand-rolled {hand_rolled_us:.1f}us, builder {builder_us:.1f}us "
+              f"({hand_rolled_us / builder_us:.1f}x)")
+        if name == "FloatArrayRep":
+            assert builder_us * 10 < hand_rolled_us, "packed arrays should skip the per-item conversion"
+    print("✅ Response building benchmark ✓")
+
+
+if __name__ == "__main__":
+    test_payload_roundtrip()
+    test_builder_benchmark()
+    print("🎉 All response builder tests passed!")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for the delta-based scene hierarchy synchronization.
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+
+from ugrpc_pipe import ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import build_response, resolve_command_parameters, run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEngineImpl
+from engine_grpc.unity.scene_hierarchy import SceneHierarchyMirror, VersionedSceneHierarchy
+
+NODE_COUNT = 20000
+
+
+def _scene(count: int):
+    nodes = [{'id': 1, 'parent': None, 'name': 'Root', 'active': True, 'position': [0.0, 0.0, 0.0]}]
+    for index in range(2, count + 1):
+        nodes.append({'id': index, 'parent': (index - 1) // 10 + 1 if index > 10 else 1,
+                      'name': f"GameObject_{index}", 'active': True, 'position': [float(index), 0.0, 0.0]})
+    return nodes
+
+
+class HierarchyServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    """Answer the full and the delta hierarchy requests of a shared scene"""
+    hierarchy = VersionedSceneHierarchy()
+    sent_bytes = []
+
+    def CommandParser(self, request, context):
+        method = json.loads(request.payload)['method']
+        if method == 'FetchSceneHierarchyDelta':
+            resp = build_response(self.hierarchy.delta(*resolve_command_parameters(request)))
+        else:
+            resp = build_response({'nodes': list(self.hierarchy._nodes.values())})
+        HierarchyServicer.sent_bytes.append(resp.ByteSize())
+        return resp
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=HierarchyServicer, port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _assert_mirrored(mirror: SceneHierarchyMirror, hierarchy: VersionedSceneHierarchy):
+    assert mirror.nodes == hierarchy._nodes
+    assert mirror.version == hierarchy.version
+    # every node is linked under its parent, the random edits leave orphans behind
+    parents = {node['parent'] for node in mirror.nodes.values()}
+    assert sum(len(mirror.children(parent)) for parent in parents) == len(mirror)
+
+
+def test_versioned_hierarchy():
+    """Test the deltas of the versioned hierarchy against random edits"""
+    print("🧪 Testing versioned hierarchy...")
+    hierarchy = VersionedSceneHierarchy(max_tombstones=10)
+    hierarchy.update(_scene(200))
+    mirror = SceneHierarchyMirror()
+    assert mirror.apply(hierarchy.delta()).full
+    _assert_mirrored(mirror, hierarchy)
+
+    rng = random.Random(7)
+    next_id = 1000
+    for _ in range(100):
+        for _ in range(rng.randint(0, 5)):
+            operation = rng.random()
+            node_ids = list(hierarchy._nodes)
+            if operation < 0.3:
+                next_id += 1
+                hierarchy.set_node({'id': next_id, 'parent': rng.choice(node_ids), 'name': f"New_{next_id}"})
+            elif operation < 0.5 and len(node_ids) > 1:
+                hierarchy.remove_node(rng.choice(node_ids[1:]))
+            else:
+                node = dict(hierarchy._nodes[rng.choice(node_ids)])
+                node['active'] = not node.get('active', True)
+                hierarchy.set_node(node)
+        delta = mirror.apply(hierarchy.delta(mirror.version, mirror.epoch))
+        assert not delta.full
+        _assert_mirrored(mirror, hierarchy)
+
+    # nothing changed: empty delta
+    assert mirror.apply(hierarchy.delta(mirror.version, mirror.epoch)).is_empty
+    # unchanged snapshot does not bump the version
+    version = hierarchy.version
+    assert hierarchy.update(list(hierarchy._nodes.values())) == 0 and hierarchy.version == version
+
+    # copies older than the remembered removals, of another epoch or newer than the engine are resynchronized
+    assert hierarchy.delta(0, mirror.epoch)['full']
+    assert hierarchy.delta(mirror.version, 'another epoch')['full']
+    assert hierarchy.delta(mirror.version + 1, mirror.epoch)['full']
+    print("✅ Versioned hierarchy ✓")
+
+
+def test_mirror_tree():
+    """Test the tree navigation of the mirror"""
+    print("🧪 Testing hierarchy mirror tree...")
+    hierarchy = VersionedSceneHierarchy()
+    hierarchy.update(_scene(30))
+    mirror = SceneHierarchyMirror()
+    mirror.apply(hierarchy.delta())
+
+    assert [node['name'] for node in mirror.roots] == ['Root']
+    assert [node['id'] for node in mirror.children(1)] == list(range(2, 11))
+    assert mirror.parent(25)['id'] == 3
+    assert mirror.path(25) == 'Root/GameObject_3/GameObject_25'
+
+    # reparenting moves the node and its subtree
+    hierarchy.set_node({**hierarchy._nodes[3], 'parent': 2})
+    delta = mirror.apply(hierarchy.delta(mirror.version, mirror.epoch))
+    assert [node['id'] for node in delta.changed] == [3]
+    assert 3 not in [node['id'] for node in mirror.children(1)]
+    assert mirror.path(25) == 'Root/GameObject_2/GameObject_3/GameObject_25'
+
+    hierarchy.remove_node(25)
+    assert mirror.apply(hierarchy.delta(mirror.version, mirror.epoch)).removed == [25]
+    assert 25 not in mirror and [node['id'] for node in mirror.children(3)] == list(range(21, 25)) + list(range(26, 31))
+    print("✅ Hierarchy mirror tree ✓")
+
+
+def test_sync_scene_hierarchy():
+    """Test that the engine synchronizes its mirror with the deltas"""
+    print("🧪 Testing scene hierarchy sync...")
+    hierarchy = HierarchyServicer.hierarchy
+    hierarchy.update(_scene(NODE_COUNT))
+    engine = UnityEngineImpl(channel=f"127.0.0.1:{_start_server()}")
+
+    started = time.perf_counter()
+    resp = engine.command_parser(cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy, compression=False)
+    full_ms = (time.perf_counter() - started) * 1000
+    assert len(resp.payload['nodes']) == NODE_COUNT
+    full_bytes = HierarchyServicer.sent_bytes[-1]
+
+    mirror = engine.sync_scene_hierarchy()
+    assert len(mirror) == NODE_COUNT and mirror.version == hierarchy.version
+
+    # a monitor tick: a few transforms changed, one object spawned and one destroyed
+    for node_id in (5, 500, 5000):
+        hierarchy.set_node({**hierarchy._nodes[node_id], 'position': [1.0, 2.0, 3.0]})
+    hierarchy.set_node({'id': NODE_COUNT + 1, 'parent': 1, 'name': 'Spawned'})
+    hierarchy.remove_node(NODE_COUNT)
+
+    started = time.perf_counter()
+    assert engine.sync_scene_hierarchy() is mirror
+    delta_ms = (time.perf_counter() - started) * 1000
+    delta_bytes = HierarchyServicer.sent_bytes[-1]
+    assert mirror[500]['position'] == [1.0, 2.0, 3.0]
+    assert mirror[NODE_COUNT + 1]['name'] == 'Spawned' and NODE_COUNT not in mirror
+    assert mirror.nodes == hierarchy._nodes
+
+    print(f"📊 {NODE_COUNT} nodes: full {full_bytes / 1024:.0f}KiB in {full_ms:.1f}ms, "
+          f"delta {delta_bytes}B in {delta_ms:.1f}ms ({full_bytes / delta_bytes:.0f}x smaller)")
+    assert delta_bytes * 100 < full_bytes
+
+    # a restarted engine (new epoch) resynchronizes the whole mirror
+    HierarchyServicer.hierarchy = VersionedSceneHierarchy()
+    HierarchyServicer.hierarchy.update(_scene(10))
+    assert len(engine.sync_scene_hierarchy()) == 10
+    print("✅ Scene hierarchy sync ✓")
+
+
+if __name__ == "__main__":
+    test_versioned_hierarchy()
+    test_mirror_tree()
+    test_sync_scene_hierarchy()
+    print("🎉 All scene hierarchy delta tests passed!")
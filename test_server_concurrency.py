@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the server concurrency models: thread pool, asyncio and multi-process SO_REUSEPORT.
+"""
+
+import socket
+import subprocess
+import sys
+import time
+
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, **kwargs) -> subprocess.Popen:
+    args = ', '.join(f'{key}={value!r}' for key, value in kwargs.items())
+    code = f"from engine_grpc.engine_pipe_server import run_grpc_server\nrun_grpc_server(port={port}, {args})"
+    return subprocess.Popen([sys.executable, '-c', code],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait_until_ready(port: int, timeout: float = 15.0) -> bool:
+    client = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_service_status():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def _check_server(**kwargs):
+    port = _free_port()
+    server = _start_server(port, **kwargs)
+    try:
+        assert _wait_until_ready(port), f"server did not answer: {kwargs}"
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def test_sync_server():
+    """Test the thread pool server with a tuned worker count"""
+    print("🧪 Testing thread pool server...")
+    _check_server(max_workers=2)
+    print("✅ Thread pool server ✓")
+
+
+def test_async_server():
+    """Test that use_async really runs the server instead of returning a coroutine"""
+    print("🧪 Testing asyncio server...")
+    _check_server(use_async=True, max_workers=2)
+    print("✅ Asyncio server ✓")
+
+
+def test_multiprocess_server():
+    """Test several processes sharing the port"""
+    print("🧪 Testing multi-process server...")
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        print("⚠️  SO_REUSEPORT is not supported on this platform, skipped")
+        return
+    _check_server(processes=2, max_workers=2)
+    print("✅ Multi-process server ✓")
+
+
+if __name__ == "__main__":
+    test_sync_server()
+    test_async_server()
+    test_multiprocess_server()
+    print("🎉 All server concurrency tests passed!")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test script for the same-host shared-memory transport of large buffers.
+The server runs in another process to exercise the cross-process path.
+"""
+
+import array
+import hashlib
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from compipe.runtime_env import Environment
+from ugrpc_pipe import RenderBytesReply, ugrpc_pipe_pb2, ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_server import (UGrpcPipeImpl, build_response, pack_shared_memory_payload,
+                                            resolve_command_parameters, resolve_image_buffers)
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEngineImpl
+from engine_grpc.utils.shared_memory import (SharedMemoryFullError, SharedMemoryRing,
+                                             read_shared_memory)
+
+IMAGE_SIZE = 4 * 1024 * 1024
+FLOAT_COUNT = 256 * 1024
+
+
+class SharedMemoryServicer(UGrpcPipeImpl):
+    """Echo the received image / array checksums and answer with a float array in shared memory"""
+
+    def __init__(self):
+        self._ring = SharedMemoryRing(size=16 * 1024 * 1024)
+
+    def CommandParser(self, request, context):
+        if arrays := [value for value in resolve_command_parameters(request) if not isinstance(value, str)]:
+            return build_response([hashlib.sha256(value).hexdigest() for value in arrays])
+        floats = array.array('f', range(FLOAT_COUNT))
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message="OK"),
+                                          payload=pack_shared_memory_payload(self._ring, floats))
+
+    def RouteImageBytes(self, request, context):
+        buffers = resolve_image_buffers(request, context)
+        main = buffers['main_image_data']
+        # the offloaded images are cleared from the message
+        message = f"{len(request.main_image_data)}:{len(main)}:{sum(main[::4096])}"
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message=message))
+
+
+def _start_server(shared_memory: bool = True) -> (subprocess.Popen, int):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    code = ("from engine_grpc.engine_pipe_server import run_grpc_server\n"
+            "from test_shared_memory import SharedMemoryServicer\n"
+            f"run_grpc_server(service_impl=SharedMemoryServicer, port={port}, shared_memory={shared_memory})")
+    server = subprocess.Popen([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return server, port
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Test server did not start")
+
+
+def _configure_channel(port: int, shared_memory: bool, size: int = 64 * 1024 * 1024):
+    grpc_cfg = dict(Environment().param.get('grpc', {}))
+    grpc_cfg['unity'] = {"channel": f"127.0.0.1:{port}",
+                         "shared_memory": shared_memory,
+                         "shared_memory_size": size,
+                         "shared_memory_threshold": 1024}
+    Environment.append_server_config(payload={'grpc': grpc_cfg})
+
+
+def test_ring_wraparound():
+    """Test ring writes, copied reads, held buffers and overwrite detection"""
+    print("🧪 Testing ring buffer...")
+    ring = SharedMemoryRing(size=1000)
+    try:
+        first = ring.write(b'a' * 600)
+        data = read_shared_memory(first)
+        assert data == b'a' * 600
+
+        # does not fit behind the first buffer: wraps to the ring start
+        second = ring.write(b'b' * 600, hold=True)
+        assert second.position == 1000
+        assert not ring.is_valid(first) and ring.is_valid(second)
+        assert data == b'a' * 600, "the buffers read are not overwritten"
+        try:
+            read_shared_memory(first)
+            raise AssertionError("an overwritten buffer should be rejected")
+        except ValueError:
+            pass
+
+        # the held buffer is not overwritten until released
+        third = ring.write(b'c' * 300)
+        try:
+            ring.write(b'd' * 600)
+            raise AssertionError("a write over a held buffer should be rejected")
+        except SharedMemoryFullError:
+            pass
+        assert ring.is_valid(second) and ring.is_valid(third)
+        ring.release(second)
+        assert ring.write(b'd' * 600).position == 2000
+    finally:
+        ring.close()
+    print("✅ Ring buffer ✓")
+
+
+def test_shared_memory_roundtrip():
+    """Test images sent through shared memory and a float array received from it"""
+    print("🧪 Testing shared memory transport...")
+    server, port = _start_server()
+    try:
+        image = bytes(range(256)) * (IMAGE_SIZE // 256)
+        expected = f"0:{IMAGE_SIZE}:{sum(image[::4096])}"
+
+        _configure_channel(port, shared_memory=True)
+        engine = UnityEngineImpl()
+        reply = RenderBytesReply(main_image_data=image)
+        resp = engine.RouteImageBytes(render_bytes_reply=reply)
+        assert resp.status.message == expected, resp.status.message
+        assert reply.main_image_data is image, "the caller's message should be restored"
+
+        resp = engine.command_parser(cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy)
+        floats = memoryview(resp.payload).cast('f')
+        assert len(floats) == FLOAT_COUNT and floats[FLOAT_COUNT - 1] == FLOAT_COUNT - 1
+
+        # without the opt-in the image travels inside the message
+        _configure_channel(port, shared_memory=False)
+        resp = UnityEngineImpl().RouteImageBytes(render_bytes_reply=RenderBytesReply(main_image_data=image))
+        assert resp.status.message == f"{IMAGE_SIZE}:" + expected[2:], resp.status.message
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Shared memory transport ✓")
+
+
+def test_unsupported_server():
+    """Test that the images travel inline when the server does not advertise the shared memory"""
+    print("🧪 Testing shared memory negotiation...")
+    server, port = _start_server(shared_memory=False)
+    try:
+        image = bytes(range(256)) * (IMAGE_SIZE // 256)
+        _configure_channel(port, shared_memory=True)
+        engine = UnityEngineImpl()
+        resp = engine.RouteImageBytes(render_bytes_reply=RenderBytesReply(main_image_data=image))
+        assert resp.status.message == f"{IMAGE_SIZE}:{IMAGE_SIZE}:{sum(image[::4096])}", resp.status.message
+        assert engine.shared_memory_ring is None
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Shared memory negotiation ✓")
+
+
+def test_batch_larger_than_ring():
+    """Test that a batch of arrays exceeding the ring does not overwrite the buffers in flight"""
+    print("🧪 Testing shared memory batch...")
+    server, port = _start_server()
+    try:
+        arrays = [array.array('f', [index]) * FLOAT_COUNT for index in range(4)]
+        _configure_channel(port, shared_memory=True, size=3 * FLOAT_COUNT * 4)
+        engine = UnityEngineImpl()
+        resps = engine.command_parser_batch(cmd=GRPCInterface.method_runtime_fetch_scene_hierarchy,
+                                            params_list=[[values] for values in arrays])
+        assert [resp.status.code for resp in resps] == [0] * 4
+        # the last array did not fit next to the ones in flight: sent inline
+        assert [resp.payload for resp in resps] == [[hashlib.sha256(values).hexdigest()] for values in arrays]
+
+        # the answered requests released their buffers
+        ring = engine.shared_memory_ring
+        ring.release(ring.write(b'x' * ring.capacity, hold=True))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    print("✅ Shared memory batch ✓")
+
+
+if __name__ == "__main__":
+    test_ring_wraparound()
+    test_shared_memory_roundtrip()
+    test_unsupported_server()
+    test_batch_larger_than_ring()
+    print("🎉 All shared memory tests passed!")
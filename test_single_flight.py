@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for the server-side coalescing of identical concurrent read requests.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+from ugrpc_pipe import ugrpc_pipe_pb2
+from engine_grpc.engine_pipe_server import is_read_only_request, resolve_command_parameters, single_flight
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+
+def _request(type_name: str, method: str, parameters: list = []):
+    return ugrpc_pipe_pb2.CommandParserReq(payload=json.dumps({
+        'type': type_name, 'isMethod': True, 'method': method, 'parameters': parameters}))
+
+
+PROJECT_INFO_REQ = _request('UGrpc.SystemUtils', 'GetProjectInfo')
+GUID_REQ = _request('UnityEditor.AssetDatabase', 'GUIDToAssetPath', ['abc'])
+MOVE_REQ = _request('UnityEditor.AssetDatabase', 'MoveAsset', ['a', 'b'])
+
+
+class SlowServicer:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @single_flight()
+    def CommandParser(self, request, context):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message=request.payload))
+
+
+class AsyncSlowServicer:
+    def __init__(self):
+        self.calls = 0
+
+    @single_flight()
+    async def CommandParser(self, request, context):
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        if 'MoveAsset' in request.payload:
+            raise RuntimeError('not coalesced')
+        return ugrpc_pipe_pb2.GenericResp(status=ugrpc_pipe_pb2.Status(code=0, message=request.payload))
+
+
+def test_read_only_detection():
+    """Test that only read-only commands are coalesced"""
+    print("🧪 Testing read-only detection...")
+    assert is_read_only_request(PROJECT_INFO_REQ)
+    assert is_read_only_request(GUID_REQ)
+    assert not is_read_only_request(MOVE_REQ)
+    assert not is_read_only_request(ugrpc_pipe_pb2.CommandParserReq(payload='not json'))
+    print("✅ Read-only detection ✓")
+
+
+def test_sync_coalescing():
+    """Test that identical concurrent reads run the handler once"""
+    print("🧪 Testing sync coalescing...")
+    servicer = SlowServicer()
+    requests = [PROJECT_INFO_REQ] * 8 + [GUID_REQ] * 4 + [MOVE_REQ] * 3
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        resps = list(executor.map(lambda req: servicer.CommandParser(req, None), requests))
+
+    assert servicer.calls == 1 + 1 + 3, f"unexpected handler runs: {servicer.calls}"
+    assert all(resp.status.message == req.payload for resp, req in zip(resps, requests))
+    assert SlowServicer.CommandParser.single_flight.coalesced == 7 + 3
+    print("✅ Sync coalescing ✓")
+
+
+def test_async_coalescing():
+    """Test coalescing on the async servicer, including error fan-out"""
+    print("🧪 Testing async coalescing...")
+    servicer = AsyncSlowServicer()
+
+    async def run():
+        resps = await asyncio.gather(*[servicer.CommandParser(PROJECT_INFO_REQ, None) for _ in range(5)])
+        errors = await asyncio.gather(*[servicer.CommandParser(MOVE_REQ, None) for _ in range(2)],
+                                      return_exceptions=True)
+        return resps, errors
+
+    resps, errors = asyncio.run(run())
+    assert servicer.calls == 1 + 2
+    assert all(resp is resps[0] for resp in resps)
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    print("✅ Async coalescing ✓")
+
+
+def test_array_requests_apart():
+    """Test that requests with the same envelope but different arrays are not merged"""
+    print("🧪 Testing array requests...")
+    editor = UnityEditorImpl(channel='127.0.0.1:1')
+    requests = [ugrpc_pipe_pb2.CommandParserReq.FromString(bytes(editor.build_command_parser_req(
+        cmd=GRPCInterface.method_editor_assetdatabase_guid_to_path, params=[numpy.full(4, value)])))
+        for value in (1, 2)]
+    # the arrays travel next to the payload, only the binary fields differ
+    assert requests[0].payload == requests[1].payload and is_read_only_request(requests[0])
+
+    class ArrayServicer:
+        calls = 0
+
+        @single_flight()
+        def CommandParser(self, request, context):
+            ArrayServicer.calls += 1
+            time.sleep(0.2)
+            return int(resolve_command_parameters(request)[0][0])
+
+    servicer = ArrayServicer()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        values = list(executor.map(lambda req: servicer.CommandParser(req, None), requests * 2))
+    assert values == [1, 2, 1, 2] and ArrayServicer.calls == 2
+    print("✅ Array requests ✓")
+
+
+def test_servicer_instances_apart():
+    """Test that identical requests to two servicer instances are not merged"""
+    print("🧪 Testing servicer instances...")
+
+    class NamedServicer:
+        def __init__(self, name: str):
+            self.name = name
+            self.calls = 0
+
+        @single_flight()
+        def CommandParser(self, request, context):
+            self.calls += 1
+            time.sleep(0.2)
+            return self.name
+
+    servicers = [NamedServicer('first'), NamedServicer('second')]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        names = list(executor.map(lambda servicer: servicer.CommandParser(PROJECT_INFO_REQ, None), servicers * 4))
+    assert names == ['first', 'second'] * 4
+    assert [servicer.calls for servicer in servicers] == [1, 1]
+    print("✅ Servicer instances ✓")
+
+
+if __name__ == "__main__":
+    test_read_only_detection()
+    test_sync_coalescing()
+    test_async_coalescing()
+    test_array_requests_apart()
+    test_servicer_instances_apart()
+    print("🎉 All single-flight tests passed!")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the wire-format Struct decoder, with a micro-benchmark against walking the parsed message.
+"""
+
+import random
+import time
+
+from google.protobuf import json_format, struct_pb2
+
+from engine_grpc.utils.struct_decoder import decode_list_value, decode_struct, decode_value
+
+# leaf payload of test_struct_unpack.py
+LEAF_PAYLOAD = {
+    "string_field": "test_string",
+    "number_field": 42.0,
+    "bool_field": True,
+    "null_field": None,
+    "nested_dict": {"nested_string": "nested_value", "nested_number": 123.456},
+    "list_field": ["item1", 2.0, True, {"nested_in_list": "value"}]
+}
+
+
+def _walk_struct(struct: struct_pb2.Struct) -> dict:
+    """Reference decoder: parse the message and walk it node by node"""
+    return {key: _walk_value(value) for key, value in struct.fields.items()}
+
+
+def _walk_value(value: struct_pb2.Value):
+    kind = value.WhichOneof('kind')
+    if kind == 'struct_value':
+        return _walk_struct(value.struct_value)
+    if kind == 'list_value':
+        return [_walk_value(item) for item in value.list_value.values]
+    if kind is None or kind == 'null_value':
+        return None
+    return getattr(value, kind)
+
+
+def _random_data(rng: random.Random, depth: int):
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice([None, True, False, rng.uniform(-1e6, 1e6), float(rng.randint(0, 300)),
+                           '', 'ascii', 'ünïcödé ✓', 'x' * rng.randint(100, 300)])
+    if rng.random() < 0.5:
+        return [_random_data(rng, depth - 1) for _ in range(rng.randint(0, 6))]
+    return {f"key_{index}_{'k' * rng.randint(0, 150)}": _random_data(rng, depth - 1)
+            for index in range(rng.randint(0, 6))}
+
+
+def _nested_payload(depth: int, width: int) -> dict:
+    """Scale the scene-like payload of test_struct_unpack.py up into a deep and wide tree"""
+    if depth == 0:
+        return dict(LEAF_PAYLOAD)
+    node = {f"child_{index}": _nested_payload(depth - 1, width) for index in range(width)}
+    node['components'] = [_nested_payload(depth - 1, 2) for _ in range(2)]
+    return node
+
+
+def _best_ms(function, repeat: int = 10) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def test_decoder_matches_protobuf():
+    """Test that the decoder matches the protobuf conversion on random payloads"""
+    print("🧪 Testing decoder equivalence...")
+    rng = random.Random(7)
+    for _ in range(200):
+        data = {'root': _random_data(rng, depth=5)}
+        message = struct_pb2.Struct()
+        message.update(data)
+        serialized = message.SerializeToString()
+        assert decode_struct(serialized) == _walk_struct(message) == json_format.MessageToDict(message)
+
+    values = struct_pb2.ListValue()
+    values.extend([1.5, 'a', None, True, {'b': [2.0]}])
+    assert decode_list_value(values.SerializeToString()) == [1.5, 'a', None, True, {'b': [2.0]}]
+    assert decode_value(struct_pb2.Value(string_value='v').SerializeToString()) == 'v'
+    print("✅ Decoder equivalence ✓")
+
+
+def test_unknown_fields_skipped():
+    """Test that fields unknown to Struct / Value do not break the decoding"""
+    print("🧪 Testing unknown fields...")
+    message = struct_pb2.Struct()
+    message.update({'a': 1.0, 'b': {'c': 'd'}})
+    # varint field 15, length-delimited field 200 and fixed32 field 3
+    unknown = bytes([0x78, 0x96, 0x01]) + bytes([0xC2, 0x0C, 0x02]) + b'zz' + bytes([0x1D]) + b'\x00' * 4
+    assert decode_struct(message.SerializeToString() + unknown) == {'a': 1.0, 'b': {'c': 'd'}}
+    print("✅ Unknown fields ✓")
+
+
+def test_decoder_benchmark():
+    """Benchmark the decoder against parsing and walking the message"""
+    print("🧪 Benchmarking Struct decoding...")
+    message = struct_pb2.Struct()
+    message.update(_nested_payload(depth=4, width=6))
+    serialized = message.SerializeToString()
+
+    def walk():
+        parsed = struct_pb2.Struct()
+        parsed.ParseFromString(serialized)
+        return _walk_struct(parsed)
+
+    def json_format_conversion():
+        parsed = struct_pb2.Struct()
+        parsed.ParseFromString(serialized)
+        return json_format.MessageToDict(parsed)
+
+    assert decode_struct(serialized) == walk()
+
+    walk_ms = _best_ms(walk)
+    json_format_ms = _best_ms(json_format_conversion)
+    decoder_ms = _best_ms(lambda: decode_struct(serialized))
+    print(f"📊 {len(serialized)} bytes: message walk {walk_ms:.1f}ms, json_format {json_format_ms:.1f}ms, "
+          f"wire decoder {decoder_ms:.1f}ms ({walk_ms / decoder_ms:.2f}x)")
+    assert decoder_ms < walk_ms, "the wire decoder should be faster than walking the message"
+    print("✅ Struct decoding benchmark ✓")
+
+
+if __name__ == "__main__":
+    test_decoder_matches_protobuf()
+    test_unknown_fields_skipped()
+    test_decoder_benchmark()
+    print("🎉 All Struct decoder tests passed!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy Struct views returned by unpack(lazy=True).
+"""
+
+import time
+
+from betterproto.lib.google import protobuf
+from google.protobuf import any_pb2, struct_pb2
+
+from engine_grpc.engine_pipe_impl import BaseEngineImpl
+from engine_grpc.utils.struct_view import ListValueView, StructView, materialize
+
+TEST_DATA = {
+    "name": "Root",
+    "active": True,
+    "layer": 3.0,
+    "parent": None,
+    "transform": {"position": [1.0, 2.0, 3.0], "rotation": [0.0, 0.0, 0.0, 1.0]},
+    "children": [{"name": "Child", "tags": ["a", "b"]}, "leaf", 5.0]
+}
+
+
+def _pack(data) -> protobuf.Any:
+    message = struct_pb2.Struct()
+    message.update(data)
+    payload = any_pb2.Any()
+    payload.Pack(message)
+    return protobuf.Any(type_url=payload.type_url, value=payload.value)
+
+
+def test_view_behaves_like_dict():
+    """Test that the lazy view supports the access patterns of the eager dict"""
+    print("🧪 Testing lazy view access...")
+    view = BaseEngineImpl.unpack(_pack(TEST_DATA), lazy=True)
+    assert isinstance(view, StructView)
+
+    assert view == TEST_DATA and TEST_DATA == view
+    assert view["name"] == "Root" and view.get("missing") is None and "missing" not in view
+    assert view["transform"]["position"][-1] == 3.0
+    assert view["children"][0]["tags"][:1] == ["a"]
+    assert sorted(view) == sorted(TEST_DATA) and len(view) == len(TEST_DATA)
+    assert isinstance(view["children"], ListValueView)
+    assert materialize(view) == BaseEngineImpl.unpack(_pack(TEST_DATA)) == TEST_DATA
+
+    # accessed nodes are converted once
+    assert view["transform"] is view["transform"]
+    try:
+        view["missing"]
+        raise AssertionError("missing keys should raise KeyError")
+    except KeyError:
+        pass
+    print("✅ Lazy view access ✓")
+
+
+def test_partial_access_is_cheap():
+    """Test that reading a few keys of a large Struct skips converting the rest"""
+    print("🧪 Testing partial access...")
+    data = {"status": "ok",
+            "objects": [{"name": f"GameObject_{index}", "position": [float(index)] * 3, "components": ["Transform"]}
+                        for index in range(20000)]}
+    payload = _pack(data)
+
+    started = time.perf_counter()
+    eager = BaseEngineImpl.unpack(payload)["status"]
+    eager_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    lazy = BaseEngineImpl.unpack(payload, lazy=True)["status"]
+    lazy_ms = (time.perf_counter() - started) * 1000
+
+    assert eager == lazy == "ok"
+    print(f"📊 Read one key of {len(payload.value)} bytes: eager {eager_ms:.1f}ms, lazy {lazy_ms:.1f}ms")
+    assert lazy_ms < eager_ms
+    print("✅ Partial access ✓")
+
+
+if __name__ == "__main__":
+    test_view_behaves_like_dict()
+    test_partial_access_is_cheap()
+    print("🎉 All lazy Struct view tests passed!")
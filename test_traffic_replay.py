@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for recording the client traffic and replaying it against a local server.
+"""
+
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+from ugrpc_pipe import CommandParserReq, ugrpc_pipe_pb2_grpc
+
+from engine_grpc.engine_pipe_replay import replay_traffic
+from engine_grpc.engine_pipe_server import build_response, run_grpc_server
+from engine_grpc.engine_stub_interface import GRPCInterface
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+from engine_grpc.utils.traffic_log import TrafficRecorder, read_traffic_log, route_of, start_recording, stop_recording
+
+RECORDED_CALLS = 20
+CALL_INTERVAL = 0.02
+
+
+class EchoServicer(ugrpc_pipe_pb2_grpc.UGrpcPipeServicer):
+    """Answer the request envelope, so replayed responses can be compared with the recorded ones"""
+
+    def CommandParser(self, request, context):
+        return build_response(request.payload)
+
+
+def _start_server() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    threading.Thread(target=run_grpc_server, kwargs=dict(service_impl=EchoServicer, port=port),
+                     daemon=True).start()
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return port
+        time.sleep(0.05)
+    raise RuntimeError("Test server did not start")
+
+
+def _record_session(port: int, path: str) -> float:
+    """Record a paced session of calls, return its duration"""
+    client = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+    start_recording(path)
+    try:
+        started = time.perf_counter()
+        for index in range(RECORDED_CALLS):
+            client.command_parser(cmd=GRPCInterface.method_system_get_service_status, params=[index])
+            time.sleep(CALL_INTERVAL)
+        return time.perf_counter() - started
+    finally:
+        stop_recording()
+
+
+def test_route_names():
+    """Test the routes resolved from the stub method names"""
+    print("🧪 Testing route names...")
+    assert route_of('command_parser') == '/ugrpc_pipe.UGrpcPipe/CommandParser'
+    assert route_of('route_image_bytes') == '/ugrpc_pipe.UGrpcPipe/RouteImageBytes'
+    assert route_of('converge3_d_registration') == '/ugrpc_pipe.UGrpcPipe/Converge3DRegistration'
+    print("✅ Route names ✓")
+
+
+def test_record_and_replay():
+    """Test that a recorded session is replayed with the same responses at the scaled rate"""
+    print("🧪 Testing record and replay...")
+    port = _start_server()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'traffic.bin')
+        recorded_seconds = _record_session(port, path)
+
+        records = list(read_traffic_log(path))
+        assert len(records) == RECORDED_CALLS
+        assert all(record.route == route_of('command_parser') and record.status == 0 for record in records)
+        assert all(record.response and record.duration > 0 for record in records)
+        assert records == sorted(records, key=lambda record: record.started)
+        print(f"📊 Recorded {len(records)} calls, {os.path.getsize(path)} bytes in {recorded_seconds:.2f}s")
+
+        paced = replay_traffic(path, f"127.0.0.1:{port}", speed=2.0)
+        assert paced.calls == RECORDED_CALLS and paced.errors == 0 and paced.mismatches == 0
+        span = records[-1].started - records[0].started
+        assert paced.elapsed >= span / 2 * 0.9, "the replay should keep the scaled pace"
+
+        flood = replay_traffic(path, f"127.0.0.1:{port}", speed=None)
+        assert flood.errors == 0 and flood.mismatches == 0
+        print(f"📊 Replay x2: {paced.elapsed:.2f}s, p50 {paced.percentile(50) * 1e3:.2f}ms; "
+              f"back-to-back: {flood.elapsed:.3f}s ({flood.throughput:.0f} calls/s)")
+
+        # a truncated last record (i.e., a killed recording process) is skipped
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - 3)
+        assert len(list(read_traffic_log(path))) == RECORDED_CALLS - 1
+    print("✅ Record and replay ✓")
+
+
+def test_failed_call_status():
+    """Test that the failures outside of the grpc status are not recorded as successful calls"""
+    print("🧪 Testing failed call status...")
+
+    class FailingStub:
+        def __init__(self, error: BaseException):
+            self.error = error
+
+        async def command_parser(self, request, metadata=None):
+            raise self.error
+
+    errors = [(GRPCError(Status.NOT_FOUND), Status.NOT_FOUND), (asyncio.CancelledError(), Status.CANCELLED),
+              (asyncio.TimeoutError(), Status.DEADLINE_EXCEEDED), (ConnectionResetError(), Status.UNAVAILABLE),
+              (StreamTerminatedError('Connection lost'), Status.UNAVAILABLE), (ValueError(), Status.UNKNOWN)]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'traffic.bin')
+        recorder = TrafficRecorder(path)
+        for error, _ in errors:
+            try:
+                asyncio.run(recorder.wrap(FailingStub(error)).command_parser(CommandParserReq(payload='{}')))
+            except BaseException as e:
+                assert e is error
+        recorder.close()
+        assert [record.status for record in read_traffic_log(path)] == [status.value for _, status in errors]
+    print("✅ Failed call status ✓")
+
+
+if __name__ == "__main__":
+    test_route_names()
+    test_record_and_replay()
+    test_failed_call_status()
+    print("🎉 All traffic replay tests passed!")
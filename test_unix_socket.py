@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the unix domain socket transport, with a latency benchmark against TCP loopback.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from engine_grpc.engine_pipe_channel import parse_unix_socket_path
+from engine_grpc.unity.engine_pipe_unity_impl import UnityEditorImpl
+
+BENCHMARK_CALLS = 300
+
+
+def _start_server(port: int, unix_socket: str) -> subprocess.Popen:
+    code = ("from engine_grpc.engine_pipe_server import run_grpc_server\n"
+            f"run_grpc_server(port={port}, unix_socket={unix_socket!r})")
+    return subprocess.Popen([sys.executable, '-c', code],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait_until_ready(client: UnityEditorImpl, timeout: float = 15.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_service_status():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def _mean_latency_us(client: UnityEditorImpl, calls: int) -> float:
+    client.get_service_status()  # warm up the pooled channel
+    started = time.perf_counter()
+    for _ in range(calls):
+        assert client.get_service_status()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def test_endpoint_parsing():
+    """Test the recognized unix domain socket endpoints"""
+    print("🧪 Testing endpoint parsing...")
+    assert parse_unix_socket_path('unix:///tmp/unity.sock') == '/tmp/unity.sock'
+    assert parse_unix_socket_path('unix:relative.sock') == 'relative.sock'
+    assert parse_unix_socket_path('127.0.0.1:50061') is None
+    print("✅ Endpoint parsing ✓")
+
+
+def test_unix_socket_vs_tcp():
+    """Test a server listening on both transports and compare their round-trip latency"""
+    print("🧪 Testing unix domain socket transport...")
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'engine_grpc.sock')
+        server = _start_server(port, path)
+        try:
+            uds_client = UnityEditorImpl(channel=f"unix://{path}")
+            tcp_client = UnityEditorImpl(channel=f"127.0.0.1:{port}")
+            assert _wait_until_ready(uds_client), "server did not answer on the unix domain socket"
+            assert _wait_until_ready(tcp_client), "server did not answer on the TCP port"
+
+            tcp_us = _mean_latency_us(tcp_client, BENCHMARK_CALLS)
+            uds_us = _mean_latency_us(uds_client, BENCHMARK_CALLS)
+            print(f"📊 Mean round trip over {BENCHMARK_CALLS} calls: "
+                  f"TCP loopback {tcp_us:.0f}us, unix socket {uds_us:.0f}us ({tcp_us / uds_us:.2f}x)")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+    print("✅ Unix domain socket transport ✓")
+
+
+if __name__ == "__main__":
+    test_endpoint_parsing()
+    test_unix_socket_vs_tcp()
+    print("🎉 All unix domain socket tests passed!")